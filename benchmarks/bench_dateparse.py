@@ -0,0 +1,82 @@
+"""Compare the old strptime loop + dateutil date parsing against DateParser.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dateparse --rows 100000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from dateutil import parser
+
+from dateparse import DateParser
+
+def legacy_parse_date_string(date_string):
+    # The helper this replaced: four strptime attempts, then dateutil
+    try:
+        for fmt in ['%d-%m-%Y', '%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d']:
+            try:
+                return datetime.strptime(date_string, fmt)
+            except ValueError:
+                continue
+        return parser.parse(date_string)
+    except:
+        return None
+
+def legacy_standardize_date(date_input):
+    for fmt in ['%d-%m-%Y', '%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d',
+                '%d-%m-%y', '%y-%m-%d', '%d/%m/%y', '%y/%m/%d']:
+        try:
+            return datetime.strptime(date_input, fmt)
+        except ValueError:
+            continue
+    try:
+        return parser.parse(date_input)
+    except:
+        return None
+
+def dataset(rows, mixed):
+    start = datetime(2020, 1, 1)
+    formats = ['%d-%m-%Y', '%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S', '%d-%m-%Y %H:%M', '%d %B %Y']
+    rng = random.Random(42)
+    values = []
+    for i in range(rows):
+        fmt = rng.choice(formats) if mixed else formats[0]
+        values.append((start + timedelta(days=i % 3650, minutes=i % 1440)).strftime(fmt))
+    return values
+
+def timed(label, parse, values):
+    start = time.perf_counter()
+    parsed = sum(1 for value in values if parse(value) is not None)
+    elapsed = time.perf_counter() - start
+    return {
+        'parser': label,
+        'parsed': parsed,
+        'seconds': round(elapsed, 4),
+        'rows_per_second': round(len(values) / elapsed, 1),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--rows', type=int, default=100000)
+    args = arg_parser.parse_args()
+
+    report = {'rows': args.rows, 'datasets': {}}
+    for name, mixed in (('uniform', False), ('mixed', True)):
+        values = dataset(args.rows, mixed)
+        results = [
+            timed('legacy parse_date_string', legacy_parse_date_string, values),
+            timed('legacy standardize_date', legacy_standardize_date, values),
+            timed('DateParser', DateParser().parse, values),
+        ]
+        report['datasets'][name] = {
+            'results': results,
+            'speedup': round(results[0]['seconds'] / results[2]['seconds'], 2),
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Measure concurrent read and write throughput against the reminder database.
+
+Readers run the scheduler's due-set query and the listing's keyset page;
+writers mark batches of reminders sent, like a dispatch tick. For SQLite
+the stock connection settings are compared with the tuned ones (WAL,
+synchronous=NORMAL, busy_timeout, mmap); any other URL, such as a
+throwaway Postgres, is measured with the tuned pool only.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_db_concurrency --readers 8 --writers 2 --seconds 5
+    python -m benchmarks.bench_db_concurrency --url postgresql://localhost/reminder_bench
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import (Column, DateTime, Integer, MetaData, String, Table, create_engine,
+                        insert, select, update)
+
+from database import configure_sqlite, engine_options
+
+metadata = MetaData()
+reminders = Table(
+    'bench_reminder', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('description', String(500), nullable=False),
+    Column('email', String(120), nullable=False),
+    Column('next_fire_at', DateTime, index=True),
+    Column('last_sent', DateTime),
+)
+
+def make_engine(url, tuned, threads):
+    if not tuned:
+        return create_engine(url)
+    engine = create_engine(url, **engine_options(url, pool_size=threads, max_overflow=0))
+    configure_sqlite(engine)
+    return engine
+
+def seed(engine, rows):
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(reminders), [{
+            'description': f"Reminder {i}",
+            'email': f"user{i % 1000}@example.com",
+            'next_fire_at': start + timedelta(minutes=i),
+        } for i in range(rows)])
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct))] * 1000, 2)
+
+def worker(engine, operation, deadline, latencies, errors, rows):
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                operation(conn, rng, rows)
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(type(e).__name__)
+
+def read(conn, rng, rows):
+    cutoff = datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(rows))
+    conn.execute(
+        select(reminders.c.id, reminders.c.email)
+        .where(reminders.c.next_fire_at <= cutoff)
+        .order_by(reminders.c.next_fire_at.desc())
+        .limit(100)
+    ).all()
+    conn.execute(
+        select(reminders).where(reminders.c.id > rng.randrange(rows)).order_by(reminders.c.id).limit(50)
+    ).all()
+
+def write(conn, rng, rows):
+    first = rng.randrange(rows - 50)
+    conn.execute(
+        update(reminders)
+        .where(reminders.c.id.between(first, first + 50))
+        .values(last_sent=datetime.utcnow())
+    )
+
+def run(label, url, tuned, args):
+    engine = make_engine(url, tuned, args.readers + args.writers)
+    seed(engine, args.rows)
+    deadline = time.perf_counter() + args.seconds
+    read_latencies, write_latencies, errors = [], [], []
+    threads = [threading.Thread(target=worker, args=(engine, read, deadline, read_latencies, errors, args.rows))
+               for _ in range(args.readers)]
+    threads += [threading.Thread(target=worker, args=(engine, write, deadline, write_latencies, errors, args.rows))
+                for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metadata.drop_all(engine)
+    engine.dispose()
+    return {
+        'mode': label,
+        'reads_per_second': round(len(read_latencies) / args.seconds, 1),
+        'writes_per_second': round(len(write_latencies) / args.seconds, 1),
+        'read_p99_ms': percentile(read_latencies, 0.99),
+        'write_p99_ms': percentile(write_latencies, 0.99),
+        'errors': len(errors),
+        'error_types': sorted(set(errors)),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--url', help='database to test; defaults to temporary SQLite files')
+    arg_parser.add_argument('--readers', type=int, default=8)
+    arg_parser.add_argument('--writers', type=int, default=2)
+    arg_parser.add_argument('--seconds', type=float, default=5)
+    arg_parser.add_argument('--rows', type=int, default=20000)
+    args = arg_parser.parse_args()
+
+    results = []
+    if args.url:
+        results.append(run('tuned pool', args.url, True, args))
+    else:
+        for label, tuned in (('sqlite defaults', False), ('sqlite WAL + pragmas', True)):
+            with tempfile.TemporaryDirectory() as tmp:
+                results.append(run(label, f"sqlite:///{os.path.join(tmp, 'bench.db')}", tuned, args))
+
+    report = {
+        'readers': args.readers,
+        'writers': args.writers,
+        'seconds': args.seconds,
+        'results': results,
+    }
+    if len(results) == 2:
+        report['read_speedup'] = round(results[1]['reads_per_second'] / max(results[0]['reads_per_second'], 0.1), 2)
+        report['write_speedup'] = round(results[1]['writes_per_second'] / max(results[0]['writes_per_second'], 0.1), 2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
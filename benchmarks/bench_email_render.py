@@ -0,0 +1,112 @@
+"""Compare the old f-string + MIMEMultipart message build against EmailRenderer.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_email_render --messages 10000
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from email_templates import EmailRenderer
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'email')
+SENDER_NAME = 'Reminder App'
+SENDER_EMAIL = 'reminders@example.com'
+
+def legacy_message(reminder):
+    # The per-send path this replaced: f-string body, fresh MIME tree, as_string()
+    body = f"""
+    Hello!
+
+    This is your {reminder['frequency']} reminder for: {reminder['description']}
+    Originally scheduled for: {reminder['date'].strftime('%d-%m-%Y %H:%M')}
+
+    Frequency: {reminder['frequency'].capitalize()}
+    {f"End Date: {reminder['end_date'].strftime('%d-%m-%Y')}" if reminder['end_date'] else ""}
+
+    Best regards,
+    {SENDER_NAME}
+    """
+    msg = MIMEMultipart()
+    msg['From'] = f"{SENDER_NAME} <{SENDER_EMAIL}>"
+    msg['To'] = reminder['email']
+    msg['Subject'] = f"Reminder: {reminder['description']}"
+    msg.attach(MIMEText(body, 'plain'))
+    return msg.as_string()
+
+def context(reminder):
+    return {
+        'description': reminder['description'],
+        'frequency': reminder['frequency'],
+        'date': reminder['date'].strftime('%d-%m-%Y %H:%M'),
+        'end_date': reminder['end_date'].strftime('%d-%m-%Y') if reminder['end_date'] else None
+    }
+
+def timed(label, build, reminders):
+    start = time.perf_counter()
+    for reminder in reminders:
+        build(reminder)
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': label,
+        'seconds': round(elapsed, 4),
+        'messages_per_second': round(len(reminders) / elapsed, 1),
+        'microseconds_per_message': round(elapsed / len(reminders) * 1e6, 1),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--messages', type=int, default=10000)
+    arg_parser.add_argument('--user-templates', type=int, default=100,
+                            help='distinct recipients with their own template')
+    args = arg_parser.parse_args()
+
+    reminders = [{
+        'description': f"Birthday of friend {i}",
+        'email': f"user{i % 500}@example.com",
+        'frequency': 'yearly',
+        'date': datetime(2020, 1, 1) + timedelta(days=i % 365),
+        'end_date': None if i % 2 else datetime(2030, 1, 1),
+    } for i in range(args.messages)]
+
+    user_sources = {
+        (f"user{i}@example.com", 'reminder'): (
+            'Hi! {{ reminder.description }}',
+            'Custom reminder: {{ reminder.description }} on {{ reminder.date }}\n',
+            '<p>{{ reminder.description }}</p>'
+        )
+        for i in range(args.user_templates)
+    }
+    loads = []
+
+    def load_user_template(email, name):
+        loads.append(email)
+        return user_sources.get((email, name))
+
+    builtin = EmailRenderer(TEMPLATE_DIR, SENDER_NAME, SENDER_EMAIL)
+    per_user = EmailRenderer(TEMPLATE_DIR, SENDER_NAME, SENDER_EMAIL,
+                             user_templates=lambda: set(user_sources),
+                             load_user_template=load_user_template,
+                             user_template_version=lambda: 1)
+
+    results = [
+        timed('legacy f-string + MIMEMultipart', legacy_message, reminders),
+        timed('compiled templates, text + html', lambda r: builtin.build(
+            r['email'], builtin.render('reminder', {'reminder': context(r)}, recipient=r['email'])), reminders),
+        timed('compiled + per-user LRU', lambda r: per_user.build(
+            r['email'], per_user.render('reminder', {'reminder': context(r)}, recipient=r['email'])), reminders),
+    ]
+    print(json.dumps({
+        'messages': args.messages,
+        'user_template_compiles': len(loads),
+        'results': results,
+        'speedup': round(results[0]['seconds'] / results[1]['seconds'], 2),
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Measure `/export` throughput and memory, and check that exports round-trip.
+
+Loads `--rows` generated reminders, then streams the whole table from
+`/export` as CSV and as NDJSON through the Flask test client, reporting
+rows per second, time to first chunk and peak Python memory
+(tracemalloc). The CSV export is then imported into an emptied database
+through `/upload_csv` and exported again; `round_trip` is true when both
+exports are byte for byte the same.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_export --rows 100000
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+
+from benchmarks.datasets import generate, load
+from benchmarks.harness import create_bench_app
+
+def export(client, export_format):
+    """Body, seconds to first chunk and total seconds of one streamed export"""
+    start = time.perf_counter()
+    response = client.get(f"/export?format={export_format}", buffered=False)
+    if response.status_code != 200:
+        raise RuntimeError(f"Export failed: {response.status_code} {response.get_data(as_text=True)}")
+    chunks = iter(response.response)
+    body = [next(chunks)]
+    first_chunk = time.perf_counter() - start
+    body.extend(chunks)
+    response.close()
+    return b''.join(body), first_chunk, time.perf_counter() - start
+
+def export_peak_mb(client, export_format):
+    """Peak traced memory of an export whose chunks are counted and dropped"""
+    tracemalloc.start()
+    response = client.get(f"/export?format={export_format}", buffered=False)
+    for _ in response.response:
+        pass
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1e6, 2)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=10_000)
+    arg_parser.add_argument('--seed', type=int, default=1)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_bench_app(tmp)
+
+        from models import db, Reminder
+
+        with app.app_context():
+            load(db.session, Reminder.__table__, generate(args.rows, args.seed), datetime.utcnow())
+
+        client = app.test_client()
+        results = {}
+        exports = {}
+        for export_format in ('csv', 'ndjson'):
+            body, first_chunk, seconds = export(client, export_format)
+            exports[export_format] = body
+            results[export_format] = {
+                'megabytes': round(len(body) / 1e6, 2),
+                'first_chunk_ms': round(first_chunk * 1000, 3),
+                'seconds': round(seconds, 4),
+                'rows_per_second': round(args.rows / seconds, 1),
+                'peak_mb': export_peak_mb(client, export_format),
+            }
+
+        client.post('/reset_database')
+        response = client.post('/upload_csv', data={'file': (BytesIO(exports['csv']), 'export.csv')},
+                               content_type='multipart/form-data')
+        if response.status_code != 202:
+            raise RuntimeError(f"Upload failed: {response.status_code} {response.get_data(as_text=True)}")
+        status_url = response.get_json()['status_url']
+        while True:
+            job = client.get(status_url).get_json()['import']
+            if job['status'] in ('completed', 'failed'):
+                break
+            time.sleep(0.05)
+        reexported, _, _ = export(client, 'csv')
+
+    print(json.dumps({
+        'rows': args.rows,
+        'formats': results,
+        'reimported_rows': job['rows_inserted'],
+        'round_trip': reexported == exports['csv'],
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
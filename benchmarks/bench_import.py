@@ -0,0 +1,65 @@
+"""Measure `/upload_csv` import throughput on a generated CSV.
+
+Writes `--rows` synthetic reminders in the importer's column layout, posts
+the file to `/upload_csv` through the Flask test client and polls the job
+until the local import pool finishes it. Reports the upload's response
+time and the job's end-to-end rows per second.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import --rows 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.datasets import generate, write_csv
+from benchmarks.harness import create_bench_app
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=10_000)
+    arg_parser.add_argument('--seed', type=int, default=1)
+    arg_parser.add_argument('--chunk-size', type=int, default=None, help='IMPORT_CHUNK_SIZE override')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        overrides = {'IMPORT_CHUNK_SIZE': args.chunk_size} if args.chunk_size else {}
+        app = create_bench_app(tmp, **overrides)
+        csv_path = os.path.join(tmp, 'reminders.csv')
+        with open(csv_path, 'w', newline='') as f:
+            write_csv(generate(args.rows, args.seed), f)
+        csv_bytes = os.path.getsize(csv_path)
+
+        client = app.test_client()
+        start = time.perf_counter()
+        with open(csv_path, 'rb') as f:
+            response = client.post('/upload_csv', data={'file': (f, 'reminders.csv')},
+                                   content_type='multipart/form-data')
+        upload_seconds = time.perf_counter() - start
+        if response.status_code != 202:
+            raise RuntimeError(f"Upload failed: {response.status_code} {response.get_data(as_text=True)}")
+        status_url = response.get_json()['status_url']
+
+        while True:
+            job = client.get(status_url).get_json()['import']
+            if job['status'] in ('completed', 'failed'):
+                break
+            time.sleep(0.05)
+        total_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        'rows': args.rows,
+        'csv_megabytes': round(csv_bytes / 1e6, 2),
+        'status': job['status'],
+        'rows_inserted': job['rows_inserted'],
+        'rows_rejected': job['rows_rejected'],
+        'upload_seconds': round(upload_seconds, 4),
+        'import_seconds': round(total_seconds, 3),
+        'rows_per_second': round(args.rows / total_seconds, 1),
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
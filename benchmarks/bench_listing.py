@@ -0,0 +1,81 @@
+"""Measure `/get_reminders` latency over a synthetic reminder table.
+
+Loads `--rows` generated reminders, then times `--requests` requests per
+scenario through the Flask test client: the first page, deep keyset pages,
+date-sorted pages, filters on the busiest recipient and on a date range,
+and the count endpoint. Each scenario runs once with the response cache
+cleared before every request (database and serialization cost) and once
+warm, after the same requests have been made once (what repeated polling
+costs; keep `--requests` under CACHE_MAX_ENTRIES).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_listing --rows 100000 --requests 200
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from benchmarks.datasets import generate, load
+from benchmarks.harness import create_bench_app, latency_summary
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=10_000)
+    arg_parser.add_argument('--requests', type=int, default=200, help='requests per scenario and cache state')
+    arg_parser.add_argument('--seed', type=int, default=1)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_bench_app(tmp)
+
+        import services
+        from models import db, Reminder
+
+        reminders = list(generate(args.rows, args.seed))
+        busiest = Counter(reminder['email'] for reminder in reminders).most_common(1)[0][0]
+        with app.app_context():
+            load(db.session, Reminder.__table__, reminders, datetime.utcnow())
+
+        rng = random.Random(args.seed)
+        scenarios = {
+            'first_page': lambda: '/get_reminders?limit=50',
+            'deep_page': lambda: f"/get_reminders?limit=50&after_id={rng.randrange(args.rows)}",
+            'sort_date': lambda: f"/get_reminders?limit=50&sort=date&after_id={rng.randrange(args.rows)}",
+            'busiest_recipient': lambda: f"/get_reminders?limit=50&email={busiest}",
+            'date_range': lambda: '/get_reminders?limit=50&date_from=01-03-2024&date_to=31-03-2024',
+            'count': lambda: '/get_reminders/count?frequency=monthly',
+        }
+
+        client = app.test_client()
+        results = {}
+        for name, url in scenarios.items():
+            for state in ('cold', 'warm'):
+                if state == 'warm':
+                    # Prime the cache with the same request sequence
+                    rng.seed(args.seed)
+                    for _ in range(args.requests):
+                        client.get(url())
+                rng.seed(args.seed)
+                latencies = []
+                for _ in range(args.requests):
+                    path = url()
+                    if state == 'cold':
+                        with app.app_context():
+                            services.response_cache().clear()
+                    start = time.perf_counter()
+                    response = client.get(path)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{path}: {response.status_code} {response.get_data(as_text=True)}")
+                results[f"{name}_{state}"] = latency_summary(latencies)
+
+    print(json.dumps({'rows': args.rows, 'busiest_recipient_rows': Counter(
+        reminder['email'] for reminder in reminders)[busiest], 'scenarios': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
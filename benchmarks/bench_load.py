@@ -0,0 +1,163 @@
+"""Load-test gunicorn in sync and gevent worker modes against a slow SMTP server.
+
+For each mode this starts `gunicorn -c gunicorn_config.py wsgi:app` on a
+temporary SQLite database, points it at an in-process SMTP sink that takes
+`--smtp-delay` seconds per message, and has `--concurrency` clients hit
+GET /get_reminders with an `--email-ratio` share of POST /test_email mixed
+in. Reports requests per second and p50/p99 latency, overall and per route.
+
+Run from the repository root (gevent mode needs `pip install gevent`):
+
+    python -m benchmarks.bench_load --modes sync gevent --workers 2 --duration 10
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.smtp_sink import SMTPSink
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def request(conn, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+def wait_until_up(port, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            if request(conn, 'GET', '/keep-alive') == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start in time')
+
+def seed(port, reminders):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    for i in range(reminders):
+        request(conn, 'POST', '/add_reminder', {
+            'date': f"{i % 28 + 1:02d}-{i % 12 + 1:02d}-2030",
+            'description': f"Load test reminder {i}",
+            'email': f"user{i}@example.com",
+            'frequency': 'monthly',
+        })
+
+def client(port, deadline, email_ratio, samples, lock):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    rng = random.Random()
+    own = []
+    while time.monotonic() < deadline:
+        if rng.random() < email_ratio:
+            route, method, path, body = 'test_email', 'POST', '/test_email', {'email': 'load@example.com'}
+        else:
+            route, method, path, body = 'get_reminders', 'GET', '/get_reminders?limit=20', None
+        start = time.perf_counter()
+        try:
+            ok = request(conn, method, path, body) == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        own.append((route, time.perf_counter() - start, ok))
+    with lock:
+        samples.extend(own)
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(samples, elapsed):
+    def stats(rows):
+        latencies = [latency for _, latency, _ in rows]
+        return {
+            'requests': len(rows),
+            'errors': sum(1 for _, _, ok in rows if not ok),
+            'requests_per_second': round(len(rows) / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 1) if rows else None,
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 1) if rows else None,
+        }
+    report = stats(samples)
+    report['routes'] = {route: stats([row for row in samples if row[0] == route])
+                        for route in sorted({row[0] for row in samples})}
+    return report
+
+def run(mode, args, sink, tmp):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        GUNICORN_WORKER_CLASS=mode,
+        WEB_CONCURRENCY=str(args.workers),
+        DATABASE_URL=f"sqlite:///{os.path.join(tmp, f'{mode}.db')}",
+        SMTP_SERVER=sink.host,
+        SMTP_PORT=str(sink.port),
+        SMTP_USE_TLS='false',
+        SMTP_USERNAME='',
+        SENDER_EMAIL='bench@example.com',
+    )
+    env.pop('RENDER', None)
+    env.pop('REDIS_URL', None)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '--access-logfile', '/dev/null',
+         '--log-level', 'warning', 'wsgi:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up(port, server)
+        seed(port, args.reminders)
+        samples, lock = [], threading.Lock()
+        start = time.monotonic()
+        deadline = start + args.duration
+        clients = [threading.Thread(target=client, args=(port, deadline, args.email_ratio, samples, lock))
+                   for _ in range(args.concurrency)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        report = {'mode': mode, 'workers': args.workers, 'concurrency': args.concurrency}
+        report.update(summarize(samples, time.monotonic() - start))
+        return report
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--modes', nargs='+', default=['sync', 'gevent'], help='gunicorn worker classes')
+    arg_parser.add_argument('--workers', type=int, default=2)
+    arg_parser.add_argument('--concurrency', type=int, default=50, help='simultaneous clients')
+    arg_parser.add_argument('--duration', type=float, default=10, help='seconds of load per mode')
+    arg_parser.add_argument('--email-ratio', type=float, default=0.1,
+                            help='share of requests that are POST /test_email')
+    arg_parser.add_argument('--smtp-delay', type=float, default=0.2, help='seconds the SMTP server takes per message')
+    arg_parser.add_argument('--reminders', type=int, default=200, help='reminders to seed before the run')
+    args = arg_parser.parse_args()
+
+    results = []
+    with SMTPSink(send_delay=args.smtp_delay) as sink, tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            results.append(run(mode, args, sink, tmp))
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
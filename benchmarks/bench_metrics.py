@@ -0,0 +1,118 @@
+"""Measure what the Prometheus instrumentation adds to the hot paths.
+
+Runs in multiprocess mode, as under gunicorn, and reports the cost of a
+bare histogram observation, of SQL statements with and without the engine
+timing hooks (a trivial `SELECT 1` in memory, and a page of the seeded
+reminder table on disk), and of a request through the Flask test client
+with METRICS_ENABLED on and off. Each figure is the best of `--rounds`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_metrics --iterations 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def per_call_us(func, iterations, rounds):
+    func()
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / iterations * 1e6
+
+def compare(label, plain, instrumented, iterations, rounds):
+    plain_us = per_call_us(plain, iterations, rounds)
+    instrumented_us = per_call_us(instrumented, iterations, rounds)
+    return {
+        'path': label,
+        'iterations': iterations,
+        'plain_us': round(plain_us, 2),
+        'instrumented_us': round(instrumented_us, 2),
+        'overhead_us': round(instrumented_us - plain_us, 2),
+        'overhead_percent': round((instrumented_us - plain_us) / plain_us * 100, 1),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--iterations', type=int, default=20000)
+    arg_parser.add_argument('--rounds', type=int, default=3)
+    arg_parser.add_argument('--reminders', type=int, default=2000, help='rows to seed for the page query')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before anything imports prometheus_client
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tmp, 'metrics')
+        os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.pop('RENDER', None)
+
+        from sqlalchemy import create_engine, insert, select, text
+
+        import metrics
+        from app import create_app
+        from config import Config
+        from models import db, Reminder
+
+        results = []
+        histogram = metrics.TICK_PHASE['send']
+        results.append({
+            'path': 'histogram.observe',
+            'iterations': args.iterations,
+            'instrumented_us': round(per_call_us(lambda: histogram.observe(0.01), args.iterations, args.rounds), 2),
+        })
+
+        plain_engine = create_engine('sqlite://')
+        timed_engine = create_engine('sqlite://')
+        metrics.instrument_engine(timed_engine)
+        with plain_engine.connect() as plain_conn, timed_engine.connect() as timed_conn:
+            query = text('SELECT 1')
+            results.append(compare('sql SELECT 1',
+                                   lambda: plain_conn.execute(query).scalar(),
+                                   lambda: timed_conn.execute(query).scalar(),
+                                   args.iterations, args.rounds))
+
+        class PlainConfig(Config):
+            METRICS_ENABLED = False
+
+        plain_app, timed_app = create_app(PlainConfig), create_app(Config)
+        with plain_app.app_context():
+            now = datetime.utcnow()
+            db.session.execute(insert(Reminder), [{
+                'date': now, 'description': f"Reminder {i}", 'email': f"user{i}@example.com",
+                'frequency': 'daily', 'created_at': now, 'next_fire_at': now + timedelta(minutes=i)
+            } for i in range(args.reminders)])
+            db.session.commit()
+            plain_engine = db.engine
+        with timed_app.app_context():
+            timed_engine = db.engine
+        page = select(Reminder.__table__).order_by(Reminder.next_fire_at).limit(50)
+        with plain_engine.connect() as plain_conn, timed_engine.connect() as timed_conn:
+            results.append(compare('sql reminder page',
+                                   lambda: plain_conn.execute(page).all(),
+                                   lambda: timed_conn.execute(page).all(),
+                                   max(1, args.iterations // 10), args.rounds))
+
+        plain_client, timed_client = plain_app.test_client(), timed_app.test_client()
+        results.append(compare('GET /get_reminders/count',
+                               lambda: plain_client.get('/get_reminders/count'),
+                               lambda: timed_client.get('/get_reminders/count'),
+                               max(1, args.iterations // 10), args.rounds))
+        results.append({
+            'path': 'GET /metrics',
+            'iterations': 100,
+            'instrumented_us': round(per_call_us(lambda: timed_client.get('/metrics'), 100, 1), 2),
+            'metric_files': len(os.listdir(os.environ['PROMETHEUS_MULTIPROC_DIR'])),
+        })
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
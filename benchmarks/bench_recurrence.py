@@ -0,0 +1,48 @@
+"""Compare per-reminder next_fire_time against the vectorized batch version.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_recurrence --reminders 100000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from recurrence import FrequencyType, next_fire_time, next_fire_times
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--reminders', type=int, default=100000)
+    arg_parser.add_argument('--seed', type=int, default=1)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    frequencies = [f.value for f in FrequencyType]
+    dates = [datetime(2020, 1, 1) + timedelta(days=rng.randint(0, 2500)) for _ in range(args.reminders)]
+    freqs = [rng.choice(frequencies) for _ in range(args.reminders)]
+    end_dates = [None if rng.random() < 0.5 else d + timedelta(days=rng.randint(0, 900)) for d in dates]
+    now = datetime(2026, 1, 1, 12)
+
+    # Warm up, so the vectorized timing does not include importing NumPy
+    next_fire_times(dates[:10], freqs[:10], end_dates[:10], after=now)
+
+    start = time.perf_counter()
+    scalar = [next_fire_time(d, f, e, after=now) for d, f, e in zip(dates, freqs, end_dates)]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = next_fire_times(dates, freqs, end_dates, after=now)
+    vectorized_seconds = time.perf_counter() - start
+
+    assert scalar == vectorized
+    print(json.dumps({
+        'reminders': args.reminders,
+        'scalar_seconds': round(scalar_seconds, 4),
+        'vectorized_seconds': round(vectorized_seconds, 4),
+        'speedup': round(scalar_seconds / vectorized_seconds, 2),
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Compare the ways of turning reminder rows into a JSON listing.
+
+Loads `--rows` generated reminders, then times serializing `--page` of
+them and the whole table two ways: hydrating ORM objects, formatting
+dates with `strftime` and encoding with the standard library (how
+listings used to be built), and selecting the listing columns, using the
+cached date formatter and encoding with orjson (`serialization`). Peak
+Python memory of each is measured with tracemalloc. Finally the whole
+table is streamed from `/get_reminders?format=ndjson`, reporting time to
+first chunk, total time and peak memory.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialize --rows 100000
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.datasets import generate, load
+from benchmarks.harness import create_bench_app
+
+def measure(func, repeat):
+    """Median seconds of `func()` over `repeat` runs, and the peak traced memory of one run in MB"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(seconds), round(peak / 1e6, 2)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=10_000)
+    arg_parser.add_argument('--page', type=int, default=500, help='rows in the page-sized case')
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--seed', type=int, default=1)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_bench_app(tmp)
+
+        import serialization
+        from models import db, Reminder
+
+        with app.app_context():
+            load(db.session, Reminder.__table__, generate(args.rows, args.seed), datetime.utcnow())
+
+        def orm_stdlib(limit):
+            reminders = Reminder.query.order_by(Reminder.id).limit(limit).all()
+            body = json.dumps([{
+                'id': r.id,
+                'date': r.date.strftime('%d-%m-%Y'),
+                'description': r.description,
+                'email': r.email,
+                'frequency': r.frequency,
+                'created_at': r.created_at.strftime('%d-%m-%Y'),
+            } for r in reminders])
+            db.session.remove()
+            return body
+
+        def columns_orjson(limit):
+            statement = db.select(*serialization.REMINDER_COLUMNS).order_by(Reminder.id).limit(limit)
+            body = serialization.dumps([serialization.reminder_row(row) for row in db.session.execute(statement)])
+            db.session.remove()
+            return body
+
+        results = {}
+        with app.app_context():
+            for case, limit in (('page', args.page), ('table', args.rows)):
+                for name, build in (('orm_stdlib', orm_stdlib), ('columns_orjson', columns_orjson)):
+                    seconds, peak = measure(lambda: build(limit), args.repeat)
+                    results[f"{case}_{name}"] = {
+                        'rows': min(limit, args.rows),
+                        'seconds': round(seconds, 4),
+                        'rows_per_second': round(min(limit, args.rows) / seconds, 1),
+                        'peak_mb': peak,
+                    }
+                results[f"{case}_speedup"] = round(
+                    results[f"{case}_orm_stdlib"]['seconds'] / results[f"{case}_columns_orjson"]['seconds'], 2)
+
+        client = app.test_client()
+
+        def stream():
+            start = time.perf_counter()
+            response = client.get('/get_reminders?format=ndjson', buffered=False)
+            chunks = iter(response.response)
+            first = next(chunks)
+            first_chunk = time.perf_counter() - start
+            lines = first.count(b'\n') + sum(chunk.count(b'\n') for chunk in chunks)
+            response.close()
+            return first_chunk, time.perf_counter() - start, lines
+
+        runs = [stream() for _ in range(args.repeat)]
+        tracemalloc.start()
+        stream()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total = statistics.median(run[1] for run in runs)
+        results['stream_ndjson'] = {
+            'rows': runs[-1][2],
+            'first_chunk_ms': round(statistics.median(run[0] for run in runs) * 1000, 3),
+            'seconds': round(total, 4),
+            'rows_per_second': round(runs[-1][2] / total, 1),
+            'peak_mb': round(peak / 1e6, 2),
+        }
+
+    print(json.dumps({'rows': args.rows, 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
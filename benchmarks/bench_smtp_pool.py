@@ -0,0 +1,60 @@
+"""Compare one-connection-per-message sending against SMTPConnectionPool.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_smtp_pool --messages 2000 --connect-delay 0.02
+"""
+import argparse
+import json
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.smtp_sink import SMTPSink
+from mailer import SMTPConnectionPool
+
+MESSAGE = "From: bench@example.com\r\nTo: {to}\r\nSubject: Reminder\r\n\r\nHello!\r\n"
+
+def send_unpooled(sink, to):
+    server = smtplib.SMTP(sink.host, sink.port)
+    server.sendmail('bench@example.com', to, MESSAGE.format(to=to))
+    server.quit()
+
+def run(label, send, messages, threads):
+    recipients = [f"user{i}@example.com" for i in range(messages)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(send, recipients))
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': label,
+        'messages': messages,
+        'seconds': round(elapsed, 4),
+        'messages_per_second': round(messages / elapsed, 1),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--messages', type=int, default=1000)
+    arg_parser.add_argument('--threads', type=int, default=4)
+    arg_parser.add_argument('--connect-delay', type=float, default=0.02,
+                            help='seconds the sink waits before greeting (simulated TLS + login)')
+    args = arg_parser.parse_args()
+
+    results = []
+    with SMTPSink(connect_delay=args.connect_delay) as sink:
+        results.append(run('unpooled', lambda to: send_unpooled(sink, to),
+                           args.messages, args.threads))
+        results[-1]['connections'] = sink.connections
+
+        sink.connections = 0
+        pool = SMTPConnectionPool(sink.host, sink.port, use_tls=False, size=args.threads)
+        results.append(run('pooled', lambda to: pool.sendmail('bench@example.com', to, MESSAGE.format(to=to)),
+                           args.messages, args.threads))
+        results[-1]['connections'] = sink.connections
+        pool.close()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Measure what a web worker pays to start: import time, peak RSS and heavy modules.
+
+Each run imports `--target` in a fresh interpreter under `python -X
+importtime` and records the wall time to import it and create the app, the
+summed per-module import times, the process's peak RSS, and which of the
+modules a web worker should never load were imported anyway.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup              # print the measurements
+    python -m benchmarks.bench_startup --check      # compare with the tracked baseline
+    python -m benchmarks.bench_startup --update     # record a new baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'benchmarks', 'startup_baseline.json')
+
+# Modules only the scheduler process, imports or sends need
+HEAVY_MODULES = ['pandas', 'numpy', 'apscheduler', 'requests', 'celery', 'smtplib',
+                 'email.mime', 'jinja2.sandbox', 'importer', 'dispatch', 'timer_scheduler']
+
+CHILD = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+module = __import__({target!r})
+if {factory!r}:
+    getattr(module, {factory!r})()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+    'heavy': [name for name in {heavy!r} if name in sys.modules],
+}}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+def parse_importtime(stderr):
+    """Per-module self times in microseconds from `-X importtime` output"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        times[name.strip()] = times.get(name.strip(), 0) + int(self_us)
+    return times
+
+def measure(target, factory, tmp):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+    env.pop('RENDER', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         CHILD.format(target=target, factory=factory, heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    run['import_times'] = parse_importtime(result.stderr)
+    return run
+
+def summarize(target, factory, runs):
+    import_times = runs[-1]['import_times']
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        'target': f"{target}:{factory}" if factory else target,
+        'runs': len(runs),
+        'startup_seconds': round(statistics.median(run['seconds'] for run in runs), 4),
+        'import_seconds': round(statistics.median(sum(run['import_times'].values()) for run in runs) / 1e6, 4),
+        'max_rss_mb': round(statistics.median(run['max_rss_kb'] for run in runs) / 1024, 1),
+        'modules': runs[-1]['modules'],
+        'heavy_modules': runs[-1]['heavy'],
+        'slowest_imports_ms': {name: round(us / 1000, 1) for name, us in slowest},
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--target', default='wsgi', help='module a web worker imports')
+    arg_parser.add_argument('--factory', default='', help='app factory in --target to call as well')
+    arg_parser.add_argument('--runs', type=int, default=5)
+    arg_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='allowed regression over the baseline, as a fraction')
+    arg_parser.add_argument('--check', action='store_true', help='fail if worse than the baseline')
+    arg_parser.add_argument('--update', action='store_true', help='write the baseline file')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [measure(args.target, args.factory, tmp) for _ in range(args.runs)]
+    report = summarize(args.target, args.factory, runs)
+
+    if args.update:
+        with open(BASELINE, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    if args.check:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        failures = [
+            f"{key} {report[key]} > {baseline[key]} (+{args.tolerance:.0%})"
+            for key in ('startup_seconds', 'max_rss_mb')
+            if report[key] > baseline[key] * (1 + args.tolerance)
+        ]
+        failures += [f"heavy module imported: {name}" for name in report['heavy_modules']
+                     if name not in baseline['heavy_modules']]
+        report['baseline'] = {key: baseline[key] for key in ('startup_seconds', 'max_rss_mb', 'heavy_modules')}
+        report['regressions'] = failures
+
+    print(json.dumps(report, indent=2))
+    if args.check and report['regressions']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Time `check_reminders` ticks over a synthetic reminder table.
+
+Loads `--rows` generated reminders into a fresh SQLite database with
+`--due` of them due now, then runs `--ticks` ticks against a local SMTP
+sink. Before each tick the same reminders are made due again, at a new
+occurrence so their delivery claims do not collide. Reports tick time,
+throughput and how the time splits across the query, decide, render,
+send and commit phases.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tick --rows 100000 --due 1000 --ticks 3
+    python -m benchmarks.bench_tick --rows 100000 --due 1000 --digest
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.datasets import generate, load
+from benchmarks.harness import create_bench_app
+from benchmarks.smtp_sink import SMTPSink
+
+def phase_seconds(registry, phases):
+    return {phase: registry.get_sample_value('reminder_tick_phase_seconds_sum', {'phase': phase}) or 0.0
+            for phase in phases}
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=10_000)
+    arg_parser.add_argument('--due', type=int, default=500, help='reminders due in each tick')
+    arg_parser.add_argument('--ticks', type=int, default=3)
+    arg_parser.add_argument('--seed', type=int, default=1)
+    arg_parser.add_argument('--digest', action='store_true', help='run with DIGEST_MODE on')
+    arg_parser.add_argument('--send-delay', type=float, default=0.0, help='seconds the SMTP sink takes per message')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, SMTPSink(send_delay=args.send_delay) as sink:
+        app = create_bench_app(tmp, sink, DIGEST_MODE=args.digest, DIGEST_WINDOW=0)
+
+        from prometheus_client import REGISTRY
+
+        from metrics import TICK_PHASES
+        from models import db, Reminder
+        from reminders import check_reminders
+
+        table = Reminder.__table__
+        now = datetime.utcnow()
+        with app.app_context():
+            start = time.perf_counter()
+            load(db.session, table, generate(args.rows, args.seed), now, due=args.due)
+            load_seconds = time.perf_counter() - start
+            due_ids = [row.id for row in db.session.execute(
+                db.select(table.c.id).where(table.c.next_fire_at <= now))]
+
+            ticks = []
+            for tick in range(args.ticks):
+                db.session.execute(table.update().where(table.c.id.in_(due_ids)).values(
+                    next_fire_at=datetime.utcnow() - timedelta(seconds=tick + 1)))
+                db.session.commit()
+                messages_before = sink.messages
+                phases_before = phase_seconds(REGISTRY, TICK_PHASES)
+                start = time.perf_counter()
+                check_reminders()
+                elapsed = time.perf_counter() - start
+                phases_after = phase_seconds(REGISTRY, TICK_PHASES)
+                ticks.append({
+                    'seconds': elapsed,
+                    'messages': sink.messages - messages_before,
+                    'phases': {phase: phases_after[phase] - phases_before[phase] for phase in TICK_PHASES},
+                })
+
+    median_tick = statistics.median(tick['seconds'] for tick in ticks)
+    print(json.dumps({
+        'rows': args.rows,
+        'due': len(due_ids),
+        'ticks': args.ticks,
+        'digest': args.digest,
+        'load_seconds': round(load_seconds, 3),
+        'tick_seconds': round(median_tick, 4),
+        'tick_seconds_max': round(max(tick['seconds'] for tick in ticks), 4),
+        'reminders_per_second': round(len(due_ids) / median_tick, 1),
+        'messages_per_tick': ticks[-1]['messages'],
+        'phase_seconds': {phase: round(statistics.median(tick['phases'][phase] for tick in ticks), 4)
+                          for phase in TICK_PHASES},
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Synthetic reminder datasets for the benchmarks.
+
+Rows look like production data rather than the handful in the sample CSVs:
+a mix of every `FrequencyType`, recipients drawn from a Zipf-like
+distribution (a few addresses own many reminders, most own one or two)
+spread over a handful of mail domains, and end dates on some recurring
+reminders. The same `seed` always produces the same rows.
+
+Write one as a CSV in the importer's column layout:
+
+    python -m benchmarks.datasets --rows 100000 --out /tmp/reminders.csv
+"""
+import argparse
+import csv
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from recurrence import FrequencyType, next_fire_times
+
+SIZES = {'small': 10_000, 'medium': 100_000, 'large': 1_000_000}
+
+FREQUENCY_WEIGHTS = {
+    FrequencyType.ONCE.value: 30,
+    FrequencyType.DAILY.value: 10,
+    FrequencyType.WEEKLY.value: 15,
+    FrequencyType.MONTHLY.value: 25,
+    FrequencyType.YEARLY.value: 20,
+}
+DOMAIN_WEIGHTS = {'gmail.com': 45, 'outlook.com': 20, 'yahoo.com': 15, 'icloud.com': 10, 'example.org': 10}
+DESCRIPTIONS = ['Birthday', 'Anniversary', 'Pay rent', 'Renew insurance', 'Team sync', 'Water the plants',
+                'Dentist appointment', 'Submit timesheet', 'Call home', 'Car service']
+
+CSV_COLUMNS = ['date', 'description', 'email', 'frequency', 'end_date']
+
+def recipient_weights(recipients, skew):
+    """Cumulative Zipf weights: recipient k is picked with probability ~ 1 / k**skew"""
+    return list(itertools.accumulate(1 / (k ** skew) for k in range(1, recipients + 1)))
+
+def generate(rows, seed=1, recipients=None, skew=0.9, start=datetime(2024, 1, 1), days=730,
+             end_date_share=0.3):
+    """Yield `rows` reminders as dicts with date, description, email, frequency and end_date"""
+    rng = random.Random(seed)
+    recipients = recipients or max(1, rows // 20)
+    cumulative = recipient_weights(recipients, skew)
+    domains = list(DOMAIN_WEIGHTS)
+    domain_cumulative = list(itertools.accumulate(DOMAIN_WEIGHTS.values()))
+    frequencies = list(FREQUENCY_WEIGHTS)
+    frequency_cumulative = list(itertools.accumulate(FREQUENCY_WEIGHTS.values()))
+    # Each recipient keeps one address, so the skew carries over to domains
+    recipient_domains = rng.choices(domains, cum_weights=domain_cumulative, k=recipients)
+
+    for i in range(rows):
+        recipient = rng.choices(range(recipients), cum_weights=cumulative)[0]
+        frequency = rng.choices(frequencies, cum_weights=frequency_cumulative)[0]
+        date = start + timedelta(days=rng.randrange(days), minutes=rng.randrange(0, 1440, 15))
+        end_date = None
+        if frequency != FrequencyType.ONCE.value and rng.random() < end_date_share:
+            end_date = date + timedelta(days=rng.randint(30, 3 * 365))
+        yield {
+            'date': date,
+            'description': f"{rng.choice(DESCRIPTIONS)} #{i}",
+            'email': f"user{recipient}@{recipient_domains[recipient]}",
+            'frequency': frequency,
+            'end_date': end_date,
+        }
+
+def write_csv(reminders, stream):
+    """Write reminders in the layout `/upload_csv` accepts; returns the row count"""
+    writer = csv.writer(stream)
+    writer.writerow(CSV_COLUMNS)
+    count = 0
+    for reminder in reminders:
+        writer.writerow([
+            reminder['date'].strftime('%d-%m-%Y'),
+            reminder['description'],
+            reminder['email'],
+            reminder['frequency'],
+            reminder['end_date'].strftime('%d-%m-%Y') if reminder['end_date'] else '',
+        ])
+        count += 1
+    return count
+
+def load(session, table, reminders, now, due=0, chunk_size=10_000):
+    """Insert reminders with next fire times after `now`, except the first `due`, which are due at `now`.
+
+    Returns the number of rows inserted.
+    """
+    created_at = datetime.utcnow()
+    reminders = iter(reminders)
+    count = 0
+    while True:
+        chunk = list(itertools.islice(reminders, chunk_size))
+        if not chunk:
+            return count
+        fire_times = next_fire_times([r['date'] for r in chunk], [r['frequency'] for r in chunk],
+                                     [r['end_date'] for r in chunk], after=now)
+        for position, (reminder, fire_at) in enumerate(zip(chunk, fire_times)):
+            reminder['created_at'] = created_at
+            reminder['next_fire_at'] = now - timedelta(minutes=1) if count + position < due else fire_at
+        session.execute(table.insert(), chunk)
+        session.commit()
+        count += len(chunk)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=SIZES['small'])
+    arg_parser.add_argument('--seed', type=int, default=1)
+    arg_parser.add_argument('--skew', type=float, default=0.9, help='Zipf exponent of the recipient distribution')
+    arg_parser.add_argument('--out', required=True, help='CSV file to write')
+    args = arg_parser.parse_args()
+
+    with open(args.out, 'w', newline='') as f:
+        count = write_csv(generate(args.rows, args.seed, skew=args.skew), f)
+    print(f"Wrote {count} reminders to {args.out}")
+
+if __name__ == '__main__':
+    main()
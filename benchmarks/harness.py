@@ -0,0 +1,40 @@
+"""Shared setup for benchmarks that drive the app in-process."""
+import logging
+import os
+import statistics
+
+def create_bench_app(tmp, sink=None, **config):
+    """An app on a fresh SQLite database in `tmp`, sending to `sink` if given.
+
+    Must be called before anything imports `config`, since the settings
+    are read from the environment. `config` overrides individual settings.
+    """
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ['IMPORT_SPOOL_DIR'] = os.path.join(tmp, 'imports')
+    os.environ['PROFILE_DIR'] = os.path.join(tmp, 'profiles')
+    for name in ('RENDER', 'REDIS_URL', 'CELERY_BROKER_URL', 'PROMETHEUS_MULTIPROC_DIR'):
+        os.environ.pop(name, None)
+    if sink is not None:
+        os.environ.update(SMTP_SERVER=sink.host, SMTP_PORT=str(sink.port), SMTP_USE_TLS='false',
+                          SMTP_USERNAME='', SENDER_EMAIL='bench@example.com')
+
+    from app import create_app
+    from config import Config
+
+    # create_app logs to app.log in the working directory; keep it out of the tree
+    os.chdir(tmp)
+    app = create_app(type('BenchConfig', (Config,), config))
+    # Per-email and per-request INFO lines would dominate the timings
+    logging.disable(logging.INFO)
+    return app
+
+def latency_summary(seconds):
+    """Count, mean, p50, p99 and max of a list of durations, in milliseconds"""
+    ordered = sorted(seconds)
+    return {
+        'requests': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+        'p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
@@ -0,0 +1,193 @@
+"""Run the benchmark suite and record the results as JSON for comparison between commits.
+
+Each benchmark runs as its own `python -m benchmarks.<module>` process, sized
+by `--size` (small = 10k, medium = 100k, large = 1M generated reminders),
+and its JSON output is collected into one file with the commit it measured:
+
+    python -m benchmarks.run --size medium                    # benchmarks/results/<commit>-medium.json
+    python -m benchmarks.run --only tick listing --output /tmp/after.json
+    python -m benchmarks.run --compare /tmp/before.json       # run, then diff against an earlier run
+    python -m benchmarks.run --compare /tmp/before.json /tmp/after.json --check
+
+Comparisons list every timing or throughput figure that moved by more than
+`--tolerance`; `--check` exits non-zero if any of them got worse.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.datasets import SIZES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+def suite(rows):
+    """Command-line arguments of every benchmark for a dataset of `rows` reminders"""
+    return {
+        'tick': ['bench_tick', '--rows', rows, '--due', min(1000, rows // 10)],
+        'import': ['bench_import', '--rows', rows],
+        'listing': ['bench_listing', '--rows', rows],
+        'serialize': ['bench_serialize', '--rows', rows],
+        'export': ['bench_export', '--rows', rows],
+        'dateparse': ['bench_dateparse', '--rows', rows],
+        'email_render': ['bench_email_render', '--messages', min(rows, 20_000)],
+        'recurrence': ['bench_recurrence', '--reminders', rows],
+        'smtp_pool': ['bench_smtp_pool', '--messages', 500],
+        'db_concurrency': ['bench_db_concurrency', '--seconds', 3],
+        'metrics': ['bench_metrics'],
+        'startup': ['bench_startup', '--runs', 3],
+        # Needs gevent and starts gunicorn twice; run with --only load
+        'load': ['bench_load', '--duration', 5],
+    }
+
+DEFAULT_EXCLUDED = {'load'}
+
+def git(*args):
+    result = subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def run_benchmark(name, command, timeout):
+    module, *args = command
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-m', f"benchmarks.{module}", *map(str, args)],
+                            cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    wall_seconds = round(time.perf_counter() - start, 2)
+    if result.returncode != 0:
+        return None, result.stderr[-2000:]
+    # Skip anything printed before the JSON document
+    lines = result.stdout.splitlines(keepends=True)
+    first = next((i for i, line in enumerate(lines) if line.startswith(('{', '['))), len(lines))
+    try:
+        output, _ = json.JSONDecoder().raw_decode(''.join(lines[first:]))
+    except ValueError:
+        return None, f"No JSON in the output of {name}:\n{result.stdout[-2000:]}"
+    return {'wall_seconds': wall_seconds, 'result': output}, None
+
+def flatten(value, prefix=''):
+    """Numeric leaves of a result as {'a.b.c': number}"""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        # Lists of results are labelled by their mode/parser/path field when they have one
+        items = ((item.get('mode') or item.get('parser') or item.get('path') or str(i)
+                  if isinstance(item, dict) else str(i), item) for i, item in enumerate(value))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    else:
+        return {}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+def direction(path):
+    """+1 if bigger is better, -1 if smaller is better, 0 for sizes and counts"""
+    key = path.rsplit('.', 1)[-1]
+    if 'per_second' in key or key == 'speedup':
+        return 1
+    if key.endswith(('seconds', '_ms', '_us', '_mb', 'percent')):
+        return -1
+    return 0
+
+def compare(before, after, tolerance):
+    changes = []
+    for name in sorted(set(before['benchmarks']) & set(after['benchmarks'])):
+        old = flatten(before['benchmarks'][name]['result'])
+        new = flatten(after['benchmarks'][name]['result'])
+        for path in sorted(set(old) & set(new)):
+            better = direction(path)
+            if not better or not old[path]:
+                continue
+            change = (new[path] - old[path]) / abs(old[path])
+            if abs(change) <= tolerance:
+                continue
+            changes.append({
+                'benchmark': name,
+                'metric': path,
+                'before': old[path],
+                'after': new[path],
+                'change_percent': round(change * 100, 1),
+                'verdict': 'improvement' if change * better > 0 else 'regression',
+            })
+    return {
+        'before': before.get('commit'),
+        'after': after.get('commit'),
+        'tolerance_percent': round(tolerance * 100, 1),
+        'regressions': [c for c in changes if c['verdict'] == 'regression'],
+        'improvements': [c for c in changes if c['verdict'] == 'improvement'],
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--size', choices=SIZES, default='small')
+    arg_parser.add_argument('--only', nargs='+', metavar='NAME', help=f"benchmarks to run: {', '.join(suite(0))}")
+    arg_parser.add_argument('--output', help='results file (default benchmarks/results/<commit>-<size>.json)')
+    arg_parser.add_argument('--compare', nargs='+', metavar='RESULTS',
+                            help='an earlier results file to compare this run with, or two files to compare')
+    arg_parser.add_argument('--tolerance', type=float, default=0.10, help='change to ignore, as a fraction')
+    arg_parser.add_argument('--check', action='store_true', help='exit 1 if a comparison finds a regression')
+    arg_parser.add_argument('--timeout', type=int, default=3600, help='seconds allowed per benchmark')
+    args = arg_parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        arg_parser.error('--compare takes one or two results files')
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as f:
+            report = json.load(f)
+    else:
+        rows = SIZES[args.size]
+        benchmarks = suite(rows)
+        names = args.only or [name for name in benchmarks if name not in DEFAULT_EXCLUDED]
+        unknown = [name for name in names if name not in benchmarks]
+        if unknown:
+            arg_parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+        commit = git('rev-parse', '--short', 'HEAD')
+        dirty = bool(git('status', '--porcelain', '--untracked-files=no'))
+        report = {
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'size': args.size,
+            'rows': rows,
+            'benchmarks': {},
+            'failures': {},
+        }
+        for name in names:
+            print(f"Running {name}...", file=sys.stderr, flush=True)
+            result, error = run_benchmark(name, benchmarks[name], args.timeout)
+            if error:
+                report['failures'][name] = error
+            else:
+                report['benchmarks'][name] = result
+
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"{commit or 'unknown'}{'-dirty' if dirty else ''}-{args.size}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        comparison = compare(before, report, args.tolerance)
+        print(json.dumps(comparison, indent=2))
+        if args.check and comparison['regressions']:
+            sys.exit(1)
+    else:
+        print(json.dumps(report, indent=2))
+    if report.get('failures'):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
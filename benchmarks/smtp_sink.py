@@ -0,0 +1,89 @@
+"""Minimal in-process SMTP server that accepts and discards mail.
+
+Used by the benchmarks so email throughput can be measured offline:
+
+    with SMTPSink(connect_delay=0.05) as sink:
+        ...send to sink.host / sink.port...
+    print(sink.connections, sink.messages)
+
+`connect_delay` simulates the cost of the TLS handshake and login that a real
+provider charges on every new connection, and `close_after` closes a
+connection after that many messages, as providers that cap sessions do.
+"""
+import socketserver
+import threading
+import time
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        if sink.connect_delay:
+            time.sleep(sink.connect_delay)
+        self._reply('220 localhost SMTP sink ready')
+
+        received = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip().upper()
+
+            if command.startswith(('EHLO', 'HELO')):
+                self._reply('250-localhost')
+                self._reply('250 8BITMIME')
+            elif command.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self._reply('250 OK')
+            elif command == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                if sink.send_delay:
+                    time.sleep(sink.send_delay)
+                with sink.lock:
+                    sink.messages += 1
+                self._reply('250 OK queued')
+                received += 1
+                if sink.close_after and received >= sink.close_after:
+                    return
+            elif command == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class SMTPSink:
+    """Threaded fake SMTP server bound to an ephemeral localhost port"""
+
+    def __init__(self, connect_delay=0.0, send_delay=0.0, close_after=None):
+        self.connect_delay = connect_delay
+        self.send_delay = send_delay
+        self.close_after = close_after
+        self.connections = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+        self._server = _ThreadingServer(('127.0.0.1', 0), _SMTPHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
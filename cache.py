@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+class ResponseCache:
+    """In-process cache of serialized responses keyed by table versions.
+
+    Every write path bumps a per-table version counter in the database in the
+    same transaction as its change. Readers key their cached bodies (and
+    ETags) on the current version, so a bump invalidates them implicitly.
+    The versions themselves are re-read at most once per `version_ttl`
+    seconds, which bounds how stale another process's writes can appear;
+    writes made by this process expire the snapshot immediately.
+    """
+
+    def __init__(self, load_versions, version_ttl=1.0, max_entries=256):
+        self.load_versions = load_versions
+        self.version_ttl = version_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._versions = None
+        self._loaded_at = 0.0
+        self._entries = OrderedDict()
+
+    def versions(self, max_age=None):
+        """Return the table version snapshot, reloading it if older than `max_age` seconds"""
+        max_age = self.version_ttl if max_age is None else max_age
+        with self._lock:
+            if self._versions is not None and time.monotonic() - self._loaded_at < max_age:
+                return self._versions
+        versions = self.load_versions()
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+        return versions
+
+    def expire_versions(self):
+        """Force the next read to reload versions from the database"""
+        with self._lock:
+            self._versions = None
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions = None
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from database import database_url, engine_options
+
 class Config:
     # Basic Flask config
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
@@ -31,7 +33,104 @@ class Config:
     
     # Set database path
     DB_PATH = os.path.join(DB_DIR, 'reminders.db')
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_PATH}'
+    # DATABASE_URL (e.g. Render's Postgres) wins over the local SQLite file
+    SQLALCHEMY_DATABASE_URI = database_url(os.getenv('DATABASE_URL')) or f'sqlite:///{DB_PATH}'
+    
+    # Connection pool, and the pragmas every SQLite connection is opened with
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE
+    )
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    # Apply pending schema migrations at startup; otherwise run `flask db upgrade`
+    DB_AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', 'true').lower() == 'true'
+    
+    # Scheduler
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 500))
+    DISPATCH_MAX_WORKERS = int(os.getenv('DISPATCH_MAX_WORKERS', 4))
+    DISPATCH_PER_DOMAIN_LIMIT = int(os.getenv('DISPATCH_PER_DOMAIN_LIMIT', 2))
+    # 'poll' checks for due reminders every minute, 'timer' sleeps until the next one is due
+    SCHEDULER_MODE = os.getenv('SCHEDULER_MODE', 'poll')
+    TIMER_HORIZON = int(os.getenv('TIMER_HORIZON', 3600))
+    TIMER_RECONCILE_INTERVAL = int(os.getenv('TIMER_RECONCILE_INTERVAL', 300))
+    TIMER_POLL_INTERVAL = float(os.getenv('TIMER_POLL_INTERVAL', 1.0))
+    TIMER_RETRY_DELAY = int(os.getenv('TIMER_RETRY_DELAY', 60))
+    SCHEDULER_LEASE_TTL = int(os.getenv('SCHEDULER_LEASE_TTL', 30))
+    SCHEDULER_LEASE_RENEW_INTERVAL = int(os.getenv('SCHEDULER_LEASE_RENEW_INTERVAL', 10))
+    DELIVERY_CLAIM_TIMEOUT = int(os.getenv('DELIVERY_CLAIM_TIMEOUT', 300))
+    
+    # Failed sends: exponential backoff with jitter, then the dead-letter table
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', 5))
+    RETRY_BASE_DELAY = int(os.getenv('RETRY_BASE_DELAY', 60))
+    RETRY_MAX_DELAY = int(os.getenv('RETRY_MAX_DELAY', 3600))
+    # Dispatch pauses for BREAKER_COOLDOWN seconds once this share of the last
+    # BREAKER_WINDOW sends (at least BREAKER_MIN_VOLUME) failed
+    BREAKER_FAILURE_THRESHOLD = float(os.getenv('BREAKER_FAILURE_THRESHOLD', 0.5))
+    BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', 50))
+    BREAKER_MIN_VOLUME = int(os.getenv('BREAKER_MIN_VOLUME', 10))
+    BREAKER_COOLDOWN = int(os.getenv('BREAKER_COOLDOWN', 60))
+    
+    # Digest mode: one email per recipient for all of their due reminders,
+    # held DIGEST_WINDOW seconds after the oldest one fell due (0 = this tick)
+    DIGEST_MODE = os.getenv('DIGEST_MODE', 'false').lower() == 'true'
+    DIGEST_WINDOW = int(os.getenv('DIGEST_WINDOW', 0))
+    DIGEST_MAX_ITEMS = int(os.getenv('DIGEST_MAX_ITEMS', 100))
+    
+    # Compiled per-recipient email templates kept in memory
+    EMAIL_TEMPLATE_CACHE_SIZE = int(os.getenv('EMAIL_TEMPLATE_CACHE_SIZE', 256))
+    
+    # Reminder listing
+    REMINDERS_PAGE_SIZE = int(os.getenv('REMINDERS_PAGE_SIZE', 50))
+    REMINDERS_MAX_PAGE_SIZE = int(os.getenv('REMINDERS_MAX_PAGE_SIZE', 500))
+    # Rows fetched per batch when streaming listings
+    STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 1000))
+    
+    # Response cache and conditional GETs
+    CACHE_VERSION_TTL = float(os.getenv('CACHE_VERSION_TTL', 1.0))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 256))
+    HEALTH_CHECK_TTL = float(os.getenv('HEALTH_CHECK_TTL', 30))
+
+    # Prometheus metrics at /metrics, with request and SQL timing hooks
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # SQLAlchemy's cursor events add ~30us to every statement; off skips db_query_seconds
+    METRICS_SQL_TIMING = os.getenv('METRICS_SQL_TIMING', 'true').lower() == 'true'
+    # Port for the scheduler process's own metrics endpoint (0 = off)
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+
+    # Sampled cProfile of ticks, imports and slow routes; switch at runtime
+    # with POST /admin/profiling. PROFILE_MAX_FILES newest profiles are kept.
+    PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'false').lower() == 'true'
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0.01))
+    PROFILE_MIN_DURATION = float(os.getenv('PROFILE_MIN_DURATION', 0))
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 100))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(DB_DIR, 'profiles'))
+
+    # Required as `Authorization: Bearer <token>` on /admin endpoints when set
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+    
+    # CSV import
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 5000))
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', 100))
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', 1))
+    IMPORT_SPOOL_DIR = os.getenv('IMPORT_SPOOL_DIR', os.path.join(DB_DIR, 'imports'))
+    # A queued or running job older than this no longer blocks re-uploading its file
+    IMPORT_STALE_AFTER = int(os.getenv('IMPORT_STALE_AFTER', 3600))
+    
+    # Celery (imports run in-process when no broker is configured)
+    CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', os.getenv('REDIS_URL'))
+    CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', os.getenv('REDIS_URL'))
+    CELERY_BEAT_INTERVAL = int(os.getenv('CELERY_BEAT_INTERVAL', 60))
+    CELERY_REMINDER_BATCH_SIZE = int(os.getenv('CELERY_REMINDER_BATCH_SIZE', 100))
+    CELERY_REMINDER_QUEUE = os.getenv('CELERY_REMINDER_QUEUE', 'reminders')
     
     # Email configuration
     SMTP_SERVER = os.getenv('SMTP_SERVER')
@@ -40,4 +139,11 @@ class Config:
     SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
     SENDER_EMAIL = os.getenv('SENDER_EMAIL')
     SENDER_NAME = os.getenv('SENDER_NAME', 'Reminder App')
-    DEFAULT_RECIPIENT_EMAIL = os.getenv('DEFAULT_RECIPIENT_EMAIL', 'default@example.com') 
\ No newline at end of file
+    DEFAULT_RECIPIENT_EMAIL = os.getenv('DEFAULT_RECIPIENT_EMAIL', 'default@example.com')
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+    SMTP_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', 30))
+    
+    # SMTP connection pool
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', 4))
+    SMTP_POOL_IDLE_TIMEOUT = int(os.getenv('SMTP_POOL_IDLE_TIMEOUT', 60))
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', 100)) 
\ No newline at end of file
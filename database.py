@@ -0,0 +1,51 @@
+import logging
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+def database_url(url):
+    """Normalise a DATABASE_URL for SQLAlchemy, which dropped the `postgres://` alias"""
+    if url and url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def engine_options(url, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800):
+    """SQLAlchemy engine options for `url`.
+
+    Every backend gets a pre-pinged pool, so connections the server or a
+    proxy dropped while idle are replaced instead of failing a request, and
+    recycled before typical server-side idle limits. In-memory SQLite keeps
+    SQLAlchemy's single-connection pool.
+    """
+    options = {'pool_pre_ping': True, 'pool_recycle': pool_recycle}
+    if url.startswith('sqlite') and (url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in url):
+        return options
+    options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+    return options
+
+def configure_sqlite(engine, busy_timeout=5000, mmap_size=268435456, synchronous='NORMAL'):
+    """Apply WAL and friends to every connection `engine` opens, if it is SQLite.
+
+    WAL lets readers keep reading while the scheduler writes, and with
+    `synchronous=NORMAL` a commit no longer waits for an fsync (a power
+    loss can drop the last transactions but not corrupt the file).
+    `busy_timeout` makes a writer wait for the lock instead of failing
+    with "database is locked", and `mmap_size` serves reads from the page
+    cache without a read() per page.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute(f'PRAGMA synchronous={synchronous}')
+            cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout)}')
+            cursor.execute(f'PRAGMA mmap_size={int(mmap_size)}')
+        finally:
+            cursor.close()
+
+    logger.info(f"SQLite connections use WAL, synchronous={synchronous}, busy_timeout={busy_timeout}ms")
@@ -0,0 +1,155 @@
+import functools
+import re
+from datetime import datetime, timedelta, timezone
+
+# Numeric shapes are always read day-first (DD-MM-YYYY) or year-first
+# (YYYY-MM-DD, then YY-MM-DD); day and month are never swapped.
+TIME = r'(?:[ T](\d{1,2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?)?'
+OFFSET = r'(Z|[+-]\d{2}:?\d{2})?'
+DAY_FIRST = re.compile(r'(\d{1,2})([-/.])(\d{1,2})\2(\d{4}|\d{2})' + TIME + r'\Z')
+YEAR_FIRST = re.compile(r'(\d{4})([-/.])(\d{1,2})\2(\d{1,2})' + TIME + OFFSET + r'\Z')
+TWO_DIGIT_YEAR_FIRST = re.compile(r'(\d{2})([-/])(\d{1,2})\2(\d{1,2})\Z')
+NUMERIC = re.compile(r'[\d\-/.:T +Z]+\Z')
+
+def _year(text):
+    year = int(text)
+    if len(text) == 2:
+        # Same pivot as strptime's %y
+        year += 1900 if year >= 69 else 2000
+    return year
+
+def _build(year, month, day, hour, minute, second, fraction, offset=None):
+    value = datetime(year, month, day, int(hour or 0), int(minute or 0), int(second or 0),
+                     int((fraction or '0').ljust(6, '0')))
+    if offset and offset != 'Z':
+        sign = -1 if offset[0] == '-' else 1
+        digits = offset[1:].replace(':', '')
+        value -= sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+    return value
+
+def _fixed_dd_mm_yyyy(value):
+    # 'DD-MM-YYYY' and 'DD/MM/YYYY' by position, the shape of nearly every upload
+    if len(value) != 10 or value[2] != value[5] or value[2] not in '-/':
+        return None
+    return datetime(int(value[6:]), int(value[3:5]), int(value[:2]))
+
+def _fixed_yyyy_mm_dd(value):
+    if len(value) != 10 or value[4] != value[7] or value[4] not in '-/':
+        return None
+    return datetime(int(value[:4]), int(value[5:7]), int(value[8:]))
+
+def _day_first(value):
+    match = DAY_FIRST.match(value)
+    if not match:
+        return None
+    day, _, month, year, hour, minute, second, fraction = match.groups()
+    return _build(_year(year), int(month), int(day), hour, minute, second, fraction)
+
+def _year_first(value):
+    match = YEAR_FIRST.match(value)
+    if not match:
+        return None
+    year, _, month, day, hour, minute, second, fraction, offset = match.groups()
+    return _build(int(year), int(month), int(day), hour, minute, second, fraction, offset)
+
+def _two_digit_year_first(value):
+    match = TWO_DIGIT_YEAR_FIRST.match(value)
+    if not match:
+        return None
+    year, _, month, day = match.groups()
+    return datetime(_year(year), int(month), int(day))
+
+# Tried in this order after the remembered one; DD-MM-YY wins over YY-MM-DD
+FAST_PATHS = (_fixed_dd_mm_yyyy, _fixed_yyyy_mm_dd, _day_first, _year_first, _two_digit_year_first)
+# Paths safe to try first: any value two of them both read, they read the
+# same way. YY-MM-DD is left out, since trying it first would turn a valid
+# DD-MM-YY value into a different date.
+REMEMBERED_PATHS = (_fixed_dd_mm_yyyy, _fixed_yyyy_mm_dd, _day_first, _year_first)
+
+class DateParser:
+    """Parse reminder date strings, remembering the format that last worked.
+
+    Known numeric formats (DD-MM-YYYY or DD/MM/YY with an optional
+    HH:MM[:SS], YYYY-MM-DD and ISO 8601 with an optional UTC offset,
+    YY-MM-DD) are parsed with fixed-position slicing or one regex match,
+    trying the last successful one first, so a stream of same-format
+    values costs one check each. Only formats that cannot read a value
+    differently from the fixed order are remembered, so results never
+    depend on what was parsed before. Only non-numeric strings (such as
+    '25 March 2024') go to dateutil, with `dayfirst=True`. Results are
+    naive UTC datetimes; invalid values give None.
+    """
+
+    def __init__(self):
+        self.last = None
+
+    def parse(self, value):
+        if isinstance(value, datetime):
+            return value
+        if not isinstance(value, str):
+            return None
+        value = value.strip()
+        if not value:
+            return None
+
+        paths = FAST_PATHS if self.last is None else (self.last,) + FAST_PATHS
+        for path in paths:
+            try:
+                parsed = path(value)
+            except ValueError:
+                # Right shape but not a real date in that reading
+                continue
+            if parsed is not None:
+                if path in REMEMBERED_PATHS:
+                    self.last = path
+                return parsed
+
+        # Numeric dates never reach dateutil, which would swap day and month
+        # to make an invalid day-first date like 01-13-2024 parse
+        if NUMERIC.match(value):
+            return None
+        # Imported here: most processes never see a non-numeric date
+        from dateutil import parser as dateutil_parser
+        try:
+            parsed = dateutil_parser.parse(value, dayfirst=True)
+        except (ValueError, OverflowError):
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+_default_parser = DateParser()
+
+def parse_date(value):
+    """Parse one date string with the shared parser, returning None if invalid"""
+    return _default_parser.parse(value)
+
+@functools.lru_cache(maxsize=4096)
+def _format_ordinal(ordinal):
+    return datetime.fromordinal(ordinal).strftime('%d-%m-%Y')
+
+def format_day(value):
+    """Format a datetime as DD-MM-YYYY, or None; each distinct day is formatted once"""
+    if value is None:
+        return None
+    return _format_ordinal(value.toordinal())
+
+def format_minute(value):
+    """Format a datetime as DD-MM-YYYY HH:MM, or None"""
+    if value is None:
+        return None
+    return f"{_format_ordinal(value.toordinal())} {value.hour:02d}:{value.minute:02d}"
+
+def format_timestamp(value):
+    """Format a datetime as DD-MM-YYYY, adding HH:MM[:SS] unless it is midnight, or None.
+
+    Unlike format_day this keeps the time of day, and parse_date reads it back.
+    """
+    if value is None:
+        return None
+    day = _format_ordinal(value.toordinal())
+    if value.second:
+        return f"{day} {value.hour:02d}:{value.minute:02d}:{value.second:02d}"
+    if value.hour or value.minute:
+        return f"{day} {value.hour:02d}:{value.minute:02d}"
+    return day
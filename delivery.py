@@ -0,0 +1,187 @@
+import logging
+import os
+import random
+import socket
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+CLAIMED = 'claimed'
+SENT = 'sent'
+FAILED = 'failed'
+DEAD = 'dead'
+
+class DeliveryLog:
+    """Claim reminder occurrences before sending them and record the outcome.
+
+    A delivery row is unique per `(reminder_id, occurrence)`, where the
+    occurrence is the reminder's `next_fire_at` when it was found due, so
+    inserting the row is the claim: of any number of schedulers or Celery
+    workers racing for the same occurrence exactly one insert succeeds.
+
+    A failed delivery is retried at `retry_at`, backing off exponentially
+    with jitter, until `max_attempts` is reached and it is marked dead.
+    Retries and claims older than `stale_after` seconds, whose worker died
+    mid-send, are claimed again by a conditional UPDATE that bumps `attempts`.
+    """
+
+    def __init__(self, table, stale_after=300, max_attempts=5, base_delay=60, max_delay=3600):
+        self.table = table
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @property
+    def worker_id(self):
+        # Read on every call so forked workers get their own identity
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def retry_time(self, attempts, now):
+        """When to retry after `attempts` failed sends, or None to give up"""
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        # Equal jitter: keep half the backoff, randomise the rest so a burst
+        # of failures does not come back as a burst of retries
+        return now + timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+    def claim(self, session, due, now):
+        """Claim deliveries for due reminders given `(reminder_id, next_fire_at)` pairs.
+
+        A reminder with an unfinished delivery retries that occurrence once
+        its `retry_at` has passed; otherwise its `next_fire_at` is claimed as
+        a new occurrence. Commits the claims and returns
+        `{reminder_id: (occurrence, attempts)}` for the deliveries this worker
+        now owns; anything else is being (or has been) delivered elsewhere.
+        """
+        due = dict(due)
+        if not due:
+            return {}
+        table = self.table
+        worker_id = self.worker_id
+
+        pending = {
+            row.reminder_id: row
+            for row in session.execute(
+                select(table.c.reminder_id, table.c.occurrence, table.c.status,
+                       table.c.attempts, table.c.claimed_at, table.c.retry_at)
+                .where(table.c.reminder_id.in_(due))
+                .where(table.c.status.in_((CLAIMED, FAILED)))
+                .order_by(table.c.id)
+            )
+        }
+
+        claimed = {}
+        fresh = [(reminder_id, occurrence) for reminder_id, occurrence in due.items()
+                 if reminder_id not in pending]
+        rows = [{
+            'reminder_id': reminder_id,
+            'occurrence': occurrence,
+            'status': CLAIMED,
+            'attempts': 1,
+            'claimed_by': worker_id,
+            'claimed_at': now
+        } for reminder_id, occurrence in fresh]
+        if rows:
+            try:
+                with session.begin_nested():
+                    session.execute(insert(table), rows)
+                claimed.update((reminder_id, (occurrence, 1)) for reminder_id, occurrence in fresh)
+            except IntegrityError:
+                # Someone claimed part of the batch since we looked; fall back
+                # to one insert per occurrence to find out which
+                for (reminder_id, occurrence), row in zip(fresh, rows):
+                    try:
+                        with session.begin_nested():
+                            session.execute(insert(table), row)
+                        claimed[reminder_id] = (occurrence, 1)
+                    except IntegrityError:
+                        pass
+
+        stale_before = now - timedelta(seconds=self.stale_after)
+        for reminder_id, row in pending.items():
+            retry_due = row.status == FAILED and row.retry_at is not None and row.retry_at <= now
+            stale = row.status == CLAIMED and row.claimed_at < stale_before
+            if not (retry_due or stale):
+                continue
+            # Only succeeds if nobody re-claimed the row since it was read
+            result = session.execute(
+                update(table)
+                .where(table.c.reminder_id == reminder_id)
+                .where(table.c.occurrence == row.occurrence)
+                .where(table.c.status == row.status)
+                .where(table.c.claimed_at == row.claimed_at)
+                .values(status=CLAIMED, attempts=table.c.attempts + 1,
+                        claimed_by=worker_id, claimed_at=now, retry_at=None)
+            )
+            if result.rowcount:
+                claimed[reminder_id] = (row.occurrence, row.attempts + 1)
+
+        session.commit()
+        return claimed
+
+    def replayed(self, session, occurrences, now):
+        """Mark dead `(reminder_id, occurrence)` deliveries sent after a replay.
+
+        Does not commit, like `finish`.
+        """
+        if not occurrences:
+            return
+        table = self.table
+        session.execute(
+            update(table)
+            .where(table.c.reminder_id == bindparam('b_reminder_id'))
+            .where(table.c.occurrence == bindparam('b_occurrence'))
+            .where(table.c.status == DEAD)
+            .values(status=SENT, attempts=table.c.attempts + 1, claimed_by=self.worker_id,
+                    finished_at=now, error=None),
+            [{'b_reminder_id': reminder_id, 'b_occurrence': occurrence} for reminder_id, occurrence in occurrences]
+        )
+
+    def last_finished(self, session, reminder_id):
+        """The latest occurrence of a reminder that was sent or given up on, or None.
+
+        Rescheduling must start after it: claim() skips an occurrence that
+        already has a finished delivery, so a reminder moved back onto one
+        would never fire again.
+        """
+        table = self.table
+        return session.execute(
+            select(func.max(table.c.occurrence))
+            .where(table.c.reminder_id == reminder_id)
+            .where(table.c.status.in_((SENT, DEAD)))
+        ).scalar()
+
+    def finish(self, session, results):
+        """Record `(reminder_id, occurrence, sent, latency_ms, error, retry_at)` outcomes.
+
+        Failures with a `retry_at` stay pending for a retry; those without
+        one are dead. Does not commit, so callers can store the outcome in
+        the same transaction that reschedules the reminder.
+        """
+        if not results:
+            return
+        table = self.table
+        session.execute(
+            update(table)
+            .where(table.c.reminder_id == bindparam('b_reminder_id'))
+            .where(table.c.occurrence == bindparam('b_occurrence'))
+            .where(table.c.claimed_by == bindparam('b_claimed_by'))
+            .values(status=bindparam('b_status'), finished_at=bindparam('b_finished_at'),
+                    latency_ms=bindparam('b_latency_ms'), error=bindparam('b_error'),
+                    retry_at=bindparam('b_retry_at')),
+            [{
+                'b_reminder_id': reminder_id,
+                'b_occurrence': occurrence,
+                'b_claimed_by': self.worker_id,
+                'b_status': SENT if sent else (FAILED if retry_at else DEAD),
+                'b_finished_at': datetime.utcnow(),
+                'b_latency_ms': latency_ms,
+                'b_error': None if sent else (error or 'send failed')[:500],
+                'b_retry_at': None if sent else retry_at
+            } for reminder_id, occurrence, sent, latency_ms, error, retry_at in results]
+        )
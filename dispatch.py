@@ -0,0 +1,218 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from metrics import DISPATCH_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+class DispatchStats:
+    """Thread-safe counters describing dispatcher activity"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.ticks = 0
+        self.last_tick_seconds = 0.0
+        self.last_tick_due = 0
+        self.total_tick_seconds = 0.0
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def record_tick(self, seconds, due):
+        with self._lock:
+            self.ticks += 1
+            self.last_tick_seconds = seconds
+            self.last_tick_due = due
+            self.total_tick_seconds += seconds
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'sent': self.sent,
+                'failed': self.failed,
+                'in_flight': self.in_flight,
+                'ticks': self.ticks,
+                'last_tick_seconds': round(self.last_tick_seconds, 4),
+                'last_tick_due': self.last_tick_due,
+                'total_tick_seconds': round(self.total_tick_seconds, 4),
+            }
+
+class CircuitBreaker:
+    """Pause dispatch while the send failure rate is too high.
+
+    Outcomes are kept for the last `window` sends. Once at least
+    `min_volume` of them are recorded and the failure rate reaches
+    `threshold`, the breaker opens and permits nothing for `cooldown`
+    seconds. It then lets `probe` messages through: if they all succeed it
+    closes, otherwise it opens for another cooldown. A probe whose outcome
+    is never recorded expires after `cooldown`, so a caller that fails
+    between `permits` and `record` cannot wedge the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold=0.5, window=50, min_volume=10, cooldown=60, probe=1):
+        self.threshold = threshold
+        self.min_volume = min_volume
+        self.cooldown = cooldown
+        self.probe = probe
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self.trips = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        elif self._probing and time.monotonic() - self._probe_started >= self.cooldown:
+            # The probe's outcome was never recorded; allow another one
+            self._probing = False
+        return self._state
+
+    def retry_after(self):
+        """Seconds until the breaker next lets messages through"""
+        with self._lock:
+            if self._current_state() == self.OPEN:
+                return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+            if not self._probing:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._probe_started))
+
+    def permits(self, wanted):
+        """How many of `wanted` messages may be sent now"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return wanted
+            if state == self.HALF_OPEN and not self._probing and wanted > 0:
+                self._probing = True
+                self._probe_started = time.monotonic()
+                return min(wanted, self.probe)
+            return 0
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.trips += 1
+
+    def record(self, sent, failed):
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probing:
+                if failed:
+                    self._open()
+                    logger.warning("Dispatch circuit re-opened after a failed probe")
+                elif sent:
+                    self._state = self.CLOSED
+                    self._probing = False
+                    self._outcomes.clear()
+                    logger.info("Dispatch circuit closed")
+                else:
+                    # Nothing was actually sent; let the next call probe
+                    self._probing = False
+                return
+            self._outcomes.extend([True] * sent + [False] * failed)
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_volume:
+                failure_rate = self._outcomes.count(False) / len(self._outcomes)
+                if failure_rate >= self.threshold:
+                    self._open()
+                    logger.warning(f"Dispatch circuit opened at a {failure_rate:.0%} failure rate")
+
+    def to_dict(self):
+        with self._lock:
+            state = self._current_state()
+            return {
+                'state': state,
+                'failure_rate': round(self._outcomes.count(False) / len(self._outcomes), 3) if self._outcomes else 0.0,
+                'window': len(self._outcomes),
+                'trips': self.trips,
+            }
+
+def recipient_domain(email):
+    return email.rpartition('@')[2].lower()
+
+class ReminderDispatcher:
+    """Send a batch of messages through a bounded thread pool.
+
+    Messages are grouped by recipient domain and each domain gets at most
+    `per_domain_limit` concurrent lanes, so one slow or rate-limiting
+    provider cannot occupy every worker.
+    """
+
+    def __init__(self, send, max_workers=4, per_domain_limit=2):
+        self.send = send
+        self.max_workers = max_workers
+        self.per_domain_limit = per_domain_limit
+        self.stats = DispatchStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='reminder-dispatch')
+
+    def _run_lane(self, lane, sent, failed, timings, errors):
+        for key, to_email, *content in lane:
+            self.stats.add(in_flight=1)
+            DISPATCH_IN_FLIGHT.inc()
+            start = time.perf_counter()
+            try:
+                ok = self.send(to_email, *content)
+            except Exception as e:
+                logger.error(f"Error dispatching message {key}: {str(e)}")
+                errors[key] = f"{type(e).__name__}: {e}"
+                ok = False
+            finally:
+                timings[key] = (time.perf_counter() - start) * 1000
+                self.stats.add(in_flight=-1)
+                DISPATCH_IN_FLIGHT.dec()
+            if ok:
+                sent.append(key)
+                self.stats.add(sent=1)
+            else:
+                failed.append(key)
+                self.stats.add(failed=1)
+
+    def dispatch(self, messages, timings=None, errors=None):
+        """Send `(key, to_email, *content)` tuples and wait for them all.
+
+        `content` is passed on to `send` after the address, e.g. subject,
+        text and HTML bodies.
+
+        Returns the lists of keys that were sent and that failed. If given,
+        `timings` is filled with each key's send time in milliseconds and
+        `errors` with the exception raised for a key, if any.
+        """
+        timings = {} if timings is None else timings
+        errors = {} if errors is None else errors
+        by_domain = defaultdict(list)
+        for message in messages:
+            by_domain[recipient_domain(message[1])].append(message)
+
+        sent, failed = [], []
+        futures = []
+        for domain_messages in by_domain.values():
+            lanes = min(self.per_domain_limit, len(domain_messages))
+            for i in range(lanes):
+                futures.append(self._executor.submit(
+                    self._run_lane, domain_messages[i::lanes], sent, failed, timings, errors))
+        wait(futures)
+        return sent, failed
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
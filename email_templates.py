@@ -0,0 +1,182 @@
+import logging
+import quopri
+import socket
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
+from email.header import Header
+from email.utils import formataddr, formatdate, make_msgid
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2.sandbox import SandboxedEnvironment
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAMES = ('reminder', 'digest')
+
+RenderedEmail = namedtuple('RenderedEmail', 'subject text html')
+CompiledTemplate = namedtuple('CompiledTemplate', 'subject text html')
+
+# RFC 5322 caps lines at 998 octets; longer bodies must be encoded
+MAX_LINE_LENGTH = 998
+
+def _header_value(value):
+    # Newlines in user data must never start a new header
+    value = ' '.join(value.splitlines())
+    if value.isascii():
+        return value
+    return Header(value, 'utf-8').encode(linesep='\r\n')
+
+def _encode_body(text):
+    text = text.replace('\r\n', '\n')
+    if text.isascii() and all(len(line) <= MAX_LINE_LENGTH for line in text.split('\n')):
+        return '7bit', text.replace('\n', '\r\n').encode('ascii')
+    return 'quoted-printable', quopri.encodestring(text.encode('utf-8')).replace(b'\n', b'\r\n')
+
+def _part(content_type, text):
+    encoding, payload = _encode_body(text)
+    return (
+        f'Content-Type: {content_type}; charset="utf-8"\r\n'
+        f'Content-Transfer-Encoding: {encoding}\r\n\r\n'
+    ).encode('ascii') + payload
+
+class EmailRenderer:
+    """Render reminder emails from compiled Jinja templates and build the wire message.
+
+    The built-in templates in `template_dir` (`<name>.subject`, `<name>.txt`
+    and `<name>.html`) compile once per process. Per-recipient overrides
+    come from the database: `user_templates()` returns the set of
+    `(email, name)` pairs that have one and `load_user_template(email,
+    name)` their `(subject, text, html)` sources, which are compiled in a
+    sandbox and kept in an LRU of `cache_size` entries. Both are dropped
+    whenever `user_template_version()` changes.
+
+    The sender headers are encoded once, so building a message only
+    encodes what differs per recipient.
+    """
+
+    def __init__(self, template_dir, sender_name, sender_email, user_templates=None,
+                 load_user_template=None, user_template_version=None, cache_size=256):
+        self.sender_name = sender_name
+        self.user_templates = user_templates
+        self.load_user_template = load_user_template
+        self.user_template_version = user_template_version
+        self.cache_size = cache_size
+
+        env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(['html']),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            auto_reload=False
+        )
+        self._builtin = {
+            name: CompiledTemplate(
+                env.get_template(f'{name}.subject'),
+                env.get_template(f'{name}.txt'),
+                env.get_template(f'{name}.html')
+            )
+            for name in TEMPLATE_NAMES
+        }
+        # User templates are untrusted input, so they never see the real environment
+        self._sandbox = SandboxedEnvironment(trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True)
+        self._html_sandbox = SandboxedEnvironment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+
+        self._lock = threading.Lock()
+        self._compiled = OrderedDict()
+        self._user_keys = None
+        self._seen_version = None
+
+        self._static_headers = (
+            f"From: {formataddr((sender_name or '', sender_email or ''), charset='utf-8')}\r\n"
+            'MIME-Version: 1.0\r\n'
+        ).encode('ascii')
+        # make_msgid looks the host name up on every call unless given a domain
+        self._msgid_domain = sender_email.rpartition('@')[2] if sender_email else socket.getfqdn()
+
+    def compile_user_template(self, subject, text, html=None):
+        """Compile user template sources, raising jinja2.TemplateSyntaxError if invalid"""
+        return CompiledTemplate(
+            self._sandbox.from_string(subject),
+            self._sandbox.from_string(text),
+            self._html_sandbox.from_string(html) if html else None
+        )
+
+    def _user_template(self, recipient, name):
+        if self.user_templates is None:
+            return None
+        version = self.user_template_version() if self.user_template_version else None
+        with self._lock:
+            if version != self._seen_version:
+                self._compiled.clear()
+                self._user_keys = None
+                self._seen_version = version
+            user_keys = self._user_keys
+        if user_keys is None:
+            user_keys = frozenset(self.user_templates())
+            with self._lock:
+                self._user_keys = user_keys
+
+        key = (recipient.strip().lower(), name)
+        if key not in user_keys:
+            return None
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                return compiled
+        source = self.load_user_template(*key)
+        if source is None:
+            return None
+        compiled = self.compile_user_template(*source)
+        with self._lock:
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.cache_size:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def render(self, name, context, recipient=None):
+        """Render template `name` for `recipient`, preferring their own template if they have one"""
+        context = {'sender_name': self.sender_name, **context}
+        builtin = self._builtin[name]
+        template = builtin
+        if recipient:
+            try:
+                template = self._user_template(recipient, name) or builtin
+            except Exception as e:
+                logger.error(f"Error loading {name} template for {recipient}: {str(e)}")
+        try:
+            return self._render(template, context)
+        except Exception as e:
+            if template is builtin:
+                raise
+            logger.error(f"Error rendering {name} template for {recipient}: {str(e)}")
+            return self._render(builtin, context)
+
+    def _render(self, template, context):
+        return RenderedEmail(
+            template.subject.render(context).strip(),
+            template.text.render(context),
+            template.html.render(context) if template.html else None
+        )
+
+    def build(self, to_email, email):
+        """Encode a rendered email for `to_email` as the bytes handed to SMTP"""
+        headers = self._static_headers + (
+            f'To: {_header_value(to_email)}\r\n'
+            f'Subject: {_header_value(email.subject)}\r\n'
+            f'Date: {formatdate(localtime=True)}\r\n'
+            f'Message-ID: {make_msgid(domain=self._msgid_domain)}\r\n'
+        ).encode('ascii')
+        if email.html is None:
+            return headers + _part('text/plain', email.text)
+        boundary = uuid.uuid4().hex
+        return headers + (
+            f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n\r\n'
+            f'--{boundary}\r\n'
+        ).encode('ascii') + _part('text/plain', email.text) + (
+            f'\r\n--{boundary}\r\n'
+        ).encode('ascii') + _part('text/html', email.html) + (
+            f'\r\n--{boundary}--\r\n'
+        ).encode('ascii')
@@ -1,17 +1,35 @@
 import multiprocessing
 import os
+import shutil
+import tempfile
 
 # Server socket
 bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
 backlog = 2048
 
-# Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
-worker_connections = 1000
+# Worker processes. 'sync' serves one request per process at a time;
+# 'gevent' serves up to worker_connections per process, so a slow SMTP
+# handshake or database query only holds up its own request.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
 timeout = 30
 keepalive = 2
 
+if worker_class == 'gevent':
+    # Patch before the preloaded app imports socket, ssl and threading, so
+    # smtplib, the SMTP pool's locks and SQLAlchemy's pool all yield to
+    # other requests instead of blocking the worker
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        # psycopg2 is a C extension; without this a Postgres query blocks
+        # every request in the worker. SQLite calls stay blocking but short.
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+
 # Logging
 accesslog = '-'
 errorlog = '-'
@@ -37,4 +55,27 @@ reload = False
 reload_engine = 'auto'
 
 # Development
-preload_app = True 
\ No newline at end of file
+preload_app = True
+
+# Metrics: every worker writes samples to files in this directory and
+# /metrics adds them up. It has to exist before the preloaded app imports
+# prometheus_client, and start empty so a previous run's samples are not
+# added to this one's (a reload keeps it, as the variable is then set).
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    metrics_dir = os.path.join(tempfile.gettempdir(), f"reminder-app-metrics-{os.getenv('PORT', '10000')}")
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = metrics_dir
+
+def child_exit(server, worker):
+    # Drop a dead worker's live gauges, keep its counters and histograms
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def post_fork(server, worker):
+    # The preloaded app opened database connections in the master (init_db and
+    # its migrations); workers must not share those sockets or file handles
+    from models import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose(close=False) 
\ No newline at end of file
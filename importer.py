@@ -0,0 +1,168 @@
+import csv
+import io
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from dateparse import DateParser
+
+logger = logging.getLogger(__name__)
+
+class ImportStats:
+    """Progress and outcome of a CSV import"""
+
+    def __init__(self, max_errors=100):
+        self.max_errors = max_errors
+        self.rows_parsed = 0
+        self.rows_inserted = 0
+        self.rows_rejected = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def reject(self, line, message, rows=1):
+        self.rows_rejected += rows
+        if len(self.errors) < self.max_errors:
+            self.errors.append(f"Line {line}: {message}")
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def to_dict(self):
+        elapsed = self.elapsed
+        return {
+            'rows_parsed': self.rows_parsed,
+            'rows_inserted': self.rows_inserted,
+            'rows_rejected': self.rows_rejected,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows_parsed / elapsed, 1) if elapsed else None,
+        }
+
+class CSVImporter:
+    """Stream a reminders CSV into the database in fixed-size chunks.
+
+    The upload is decoded incrementally and only one chunk of raw rows is
+    held at a time. Each date column has its own DateParser, which keeps
+    re-using the format that matched the previous row, and `schedule`
+    computes the chunk's next fire times in one vectorized call, unless
+    the file carries them in a `next_fire_at` column, as exports do. Each
+    chunk is written with a single executemany INSERT and committed, and
+    `progress` is called with the running stats. A chunk the database
+    rejects is bisected to find and reject just the rows it refuses.
+    """
+
+    def __init__(self, session, table, schedule, chunk_size=5000,
+                 max_errors=100, progress=None):
+        self.session = session
+        self.table = table
+        self.schedule = schedule
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.progress = progress
+        self.date_parser = DateParser()
+        self.end_date_parser = DateParser()
+        self.last_sent_parser = DateParser()
+        self.next_fire_parser = DateParser()
+
+    def _flush(self, chunk, stats):
+        parse_date = self.date_parser.parse
+        parse_end_date = self.end_date_parser.parse
+        parse_last_sent = self.last_sent_parser.parse
+        parse_next_fire = self.next_fire_parser.parse
+        created_at = datetime.now()
+
+        lines, rows = [], []
+        for line, row in chunk:
+            date = parse_date(row.get('date'))
+            end_date = parse_end_date(row.get('end_date'))
+            last_sent = parse_last_sent(row.get('last_sent'))
+            next_fire_at = parse_next_fire(row.get('next_fire_at'))
+            if not date:
+                stats.reject(line, f"Invalid date format: {row.get('date')}")
+                continue
+            if (row.get('end_date') or '').strip() and not end_date:
+                stats.reject(line, f"Invalid end date format: {row.get('end_date')}")
+                continue
+            if (row.get('last_sent') or '').strip() and not last_sent:
+                stats.reject(line, f"Invalid last sent format: {row.get('last_sent')}")
+                continue
+            if (row.get('next_fire_at') or '').strip() and not next_fire_at:
+                stats.reject(line, f"Invalid next fire time format: {row.get('next_fire_at')}")
+                continue
+            values = {
+                'date': date,
+                'description': (row.get('description') or '').strip(),
+                'email': (row.get('email') or '').strip().lower(),
+                'frequency': (row.get('frequency') or 'once').strip().lower(),
+                'created_at': created_at,
+                'end_date': end_date,
+                'last_sent': last_sent,
+            }
+            if 'next_fire_at' in row:
+                # Kept as exported; blank means no occurrences are left
+                values['next_fire_at'] = next_fire_at
+            lines.append(line)
+            rows.append(values)
+
+        unscheduled = [row for row in rows if 'next_fire_at' not in row]
+        if unscheduled:
+            fire_times = self.schedule(
+                [row['date'] for row in unscheduled],
+                [row['frequency'] for row in unscheduled],
+                [row['end_date'] for row in unscheduled]
+            )
+            for row, fire_at in zip(unscheduled, fire_times):
+                row['next_fire_at'] = fire_at
+        if rows:
+            self._insert(lines, rows, stats)
+
+        if self.progress:
+            self.progress(stats)
+
+    def _insert(self, lines, rows, stats):
+        """Insert and commit `rows`, read from CSV `lines`.
+
+        If the database rejects the data in the batch it is split in halves
+        and each retried, down to single rows, so only the offending rows
+        are rejected, each with its own line and error. Any other error,
+        such as a missing table or a lost connection, fails the import.
+        """
+        try:
+            self.session.execute(self.table.insert(), rows)
+            self.session.commit()
+            stats.rows_inserted += len(rows)
+        except (IntegrityError, DataError) as e:
+            self.session.rollback()
+            if len(rows) == 1:
+                stats.reject(lines[0], f"Failed to insert: {getattr(e, 'orig', None) or e}")
+                return
+            middle = len(rows) // 2
+            self._insert(lines[:middle], rows[:middle], stats)
+            self._insert(lines[middle:], rows[middle:], stats)
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def run(self, binary_stream):
+        """Import every row from a binary file-like object and return ImportStats"""
+        stats = ImportStats(self.max_errors)
+        text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.DictReader(text_stream)
+            chunk = []
+            for row in reader:
+                stats.rows_parsed += 1
+                chunk.append((reader.line_num, row))
+                if len(chunk) >= self.chunk_size:
+                    self._flush(chunk, stats)
+                    chunk = []
+            if chunk:
+                self._flush(chunk, stats)
+        finally:
+            # Leave the underlying upload stream open for the caller
+            text_stream.detach()
+
+        logger.info(f"CSV import finished: {stats.to_dict()}")
+        return stats
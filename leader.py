@@ -0,0 +1,108 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+class LeaderElection:
+    """Lease-based leader election on a database row.
+
+    Every candidate tries to take or renew the lease row `name` every
+    `renew_interval` seconds. The holder keeps it by renewing before
+    `ttl` expires; when it stops (crash, deploy, network loss) any other
+    candidate takes over within `ttl + renew_interval` seconds. The same
+    row works across gunicorn workers, clock processes and nodes as long as
+    they share the database and their clocks agree to within the TTL.
+    """
+
+    def __init__(self, engine, table, name='reminder-scheduler', ttl=30, renew_interval=10,
+                 on_elected=None, on_demoted=None):
+        self.engine = engine
+        self.table = table
+        self.name = name
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def try_acquire(self):
+        """Take or renew the lease, returning whether this candidate holds it"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(self.table)
+                .where(self.table.c.name == self.name)
+                .where(or_(self.table.c.holder == self.identity, self.table.c.expires_at < now))
+                .values(holder=self.identity, expires_at=expires_at)
+            )
+            if result.rowcount:
+                return True
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(self.table).values(
+                    name=self.name, holder=self.identity, expires_at=expires_at))
+            return True
+        except IntegrityError:
+            # Another candidate holds a live lease
+            return False
+
+    def release(self):
+        """Give up the lease so a follower can take over immediately"""
+        if not self.is_leader:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(self.table)
+                .where(self.table.c.name == self.name)
+                .where(self.table.c.holder == self.identity)
+                .values(expires_at=datetime.utcnow())
+            )
+        self._set_leader(False)
+
+    def _set_leader(self, leader):
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        if leader:
+            logger.info(f"{self.identity} elected leader for {self.name}")
+            if self.on_elected:
+                self.on_elected()
+        else:
+            logger.info(f"{self.identity} is no longer leader for {self.name}")
+            if self.on_demoted:
+                self.on_demoted()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self._set_leader(self.try_acquire())
+            except Exception as e:
+                logger.error(f"Leader election for {self.name} failed: {str(e)}")
+                # Without a renewed lease we must assume someone else took over
+                self._set_leader(False)
+            self._stopped.wait(self.renew_interval)
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='leader-election', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        try:
+            self.release()
+        except Exception as e:
+            logger.error(f"Failed to release lease {self.name}: {str(e)}")
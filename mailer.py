@@ -0,0 +1,161 @@
+import logging
+import os
+import smtplib
+import threading
+import time
+
+from metrics import SMTP_CONNECT_SECONDS, SMTP_ERRORS, SMTP_POOL_WAIT_SECONDS, SMTP_SEND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class PooledConnection:
+    """An authenticated SMTP session checked out from the pool"""
+
+    def __init__(self, server):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+class SMTPConnectionPool:
+    """Thread-safe pool of persistent, authenticated SMTP connections.
+
+    Connections are opened lazily, reused until they have sent
+    `max_messages` or sat idle for `idle_timeout` seconds, and transparently
+    replaced when the server drops them.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True,
+                 size=4, idle_timeout=60, max_messages=100, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._pid = os.getpid()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a pool from the Flask app config"""
+        return cls(
+            host=config['SMTP_SERVER'],
+            port=config['SMTP_PORT'],
+            username=config['SMTP_USERNAME'],
+            password=config['SMTP_PASSWORD'],
+            use_tls=config['SMTP_USE_TLS'],
+            size=config['SMTP_POOL_SIZE'],
+            idle_timeout=config['SMTP_POOL_IDLE_TIMEOUT'],
+            max_messages=config['SMTP_MAX_MESSAGES_PER_CONNECTION'],
+            timeout=config['SMTP_TIMEOUT'],
+        )
+
+    def _connect(self):
+        start = time.perf_counter()
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        SMTP_CONNECT_SECONDS.observe(time.perf_counter() - start)
+        logger.debug(f"Opened SMTP connection to {self.host}:{self.port}")
+        return PooledConnection(server)
+
+    def _close(self, conn):
+        try:
+            conn.server.quit()
+        except Exception:
+            conn.server.close()
+
+    def _check_fork(self):
+        # Sockets inherited from a parent process (gunicorn preload) must not be
+        # shared, so a forked child starts with an empty pool
+        if self._pid != os.getpid():
+            self._idle = []
+            self._pid = os.getpid()
+
+    def _acquire(self):
+        start = time.perf_counter()
+        self._slots.acquire()
+        SMTP_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        try:
+            now = time.monotonic()
+            stale = []
+            conn = None
+            with self._lock:
+                self._check_fork()
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if now - candidate.last_used <= self.idle_timeout:
+                        conn = candidate
+                        break
+                    stale.append(candidate)
+            for candidate in stale:
+                self._close(candidate)
+            return conn or self._connect()
+        except Exception:
+            SMTP_ERRORS.inc()
+            self._slots.release()
+            raise
+
+    def _release(self, conn, discard=False):
+        try:
+            if discard or conn.sent >= self.max_messages:
+                self._close(conn)
+            else:
+                conn.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        """Send a message over a pooled connection.
+
+        A connection the server has closed (e.g. its own idle timeout) is
+        discarded and the send retried once on a fresh connection.
+        """
+        for attempt in range(2):
+            conn = self._acquire()
+            start = time.perf_counter()
+            try:
+                result = conn.server.sendmail(from_addr, to_addrs, msg)
+                SMTP_SEND_SECONDS.observe(time.perf_counter() - start)
+            except smtplib.SMTPServerDisconnected:
+                SMTP_ERRORS.inc()
+                self._release(conn, discard=True)
+                if attempt:
+                    raise
+                logger.info("SMTP connection dropped by server, reconnecting")
+                continue
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # The server rejected this message but the session is still usable
+                SMTP_ERRORS.inc()
+                conn.sent += 1
+                self._release(conn)
+                raise
+            except Exception:
+                SMTP_ERRORS.inc()
+                self._release(conn, discard=True)
+                raise
+            conn.sent += 1
+            self._release(conn)
+            return result
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            self._check_fork()
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
@@ -0,0 +1,126 @@
+"""Prometheus metrics for the scheduler tick, routes, SQL and SMTP.
+
+With PROMETHEUS_MULTIPROC_DIR set (gunicorn_config.py sets it) every
+process writes its samples to memory-mapped files in that directory and
+`/metrics` adds them up, so any worker can answer a scrape. Without it
+each process reports only its own samples.
+"""
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+
+# Buckets in seconds: SQL and cached routes take well under a millisecond,
+# SMTP handshakes and whole ticks can take seconds
+FAST_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5)
+SLOW_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+TICK_PHASES = ('query', 'decide', 'render', 'send', 'commit')
+
+TICK_SECONDS = Histogram('reminder_tick_seconds', 'Duration of a scheduler tick', buckets=SLOW_BUCKETS)
+TICK_PHASE_SECONDS = Histogram('reminder_tick_phase_seconds', 'Time spent in each phase of a scheduler tick',
+                               ['phase'], buckets=SLOW_BUCKETS)
+TICK_DUE = Histogram('reminder_tick_due', 'Reminders due in a scheduler tick',
+                     buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000))
+REMINDERS_SENT = Counter('reminders_sent', 'Reminders sent')
+REMINDERS_FAILED = Counter('reminders_failed', 'Reminder sends that failed')
+REMINDERS_FANNED_OUT = Counter('reminders_fanned_out', 'Due reminder IDs enqueued by Celery check_reminders')
+FANOUT_BATCHES = Counter('reminder_fanout_batches', 'process_reminders_batch tasks enqueued by check_reminders')
+DISPATCH_IN_FLIGHT = Gauge('reminder_dispatch_in_flight', 'Messages being sent right now',
+                           multiprocess_mode='livesum')
+
+HTTP_REQUEST_SECONDS = Histogram('http_request_seconds', 'Request latency by route',
+                                 ['method', 'route', 'status'], buckets=FAST_BUCKETS + (5, 10, 30))
+
+DB_QUERY_SECONDS = Histogram('db_query_seconds', 'SQL statement execution time',
+                             ['statement'], buckets=FAST_BUCKETS)
+
+SMTP_CONNECT_SECONDS = Histogram('smtp_connect_seconds', 'Time to open and authenticate an SMTP connection',
+                                 buckets=SLOW_BUCKETS)
+SMTP_SEND_SECONDS = Histogram('smtp_send_seconds', 'Time to send one message on an open SMTP connection',
+                              buckets=SLOW_BUCKETS)
+SMTP_POOL_WAIT_SECONDS = Histogram('smtp_pool_wait_seconds', 'Time spent waiting for a free SMTP connection',
+                                   buckets=FAST_BUCKETS)
+SMTP_ERRORS = Counter('smtp_errors', 'SMTP connects and sends that raised')
+
+# Label children are looked up once, not on every observation
+TICK_PHASE = {phase: TICK_PHASE_SECONDS.labels(phase=phase) for phase in TICK_PHASES}
+SQL_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'PRAGMA')
+DB_QUERY = {name: DB_QUERY_SECONDS.labels(statement=name) for name in SQL_STATEMENTS + ('OTHER',)}
+
+class PhaseTimer:
+    """Attribute the time since the previous lap to a tick phase"""
+
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        TICK_PHASE[phase].observe(now - self.last)
+        self.last = now
+
+def statement_kind(statement):
+    """First keyword of a SQL statement, or OTHER, to keep label values bounded"""
+    words = statement[:16].split(None, 1)
+    kind = words[0].upper() if words else 'OTHER'
+    return kind if kind in DB_QUERY else 'OTHER'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append((context, time.perf_counter()))
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, start = conn.info['query_start'].pop()
+    DB_QUERY[statement_kind(statement)].observe(time.perf_counter() - start)
+
+def _handle_error(exception_context):
+    # A statement that raised never reaches after_cursor_execute. Errors
+    # raised before it started, or while fetching its rows, have no entry
+    conn = exception_context.connection
+    starts = conn.info.get('query_start') if conn is not None else None
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+def instrument_engine(engine):
+    """Time every statement `engine` executes"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+_request_series = {}
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+def _observe_request(response):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        # The URL rule, not the path, so IDs in URLs do not multiply series
+        key = (request.method, request.url_rule.rule if request.url_rule else 'unmatched', response.status_code)
+        series = _request_series.get(key)
+        if series is None:
+            series = _request_series[key] = HTTP_REQUEST_SECONDS.labels(*key)
+        series.observe(time.perf_counter() - start)
+    return response
+
+def registry():
+    """The registry to expose: every process's samples in multiprocess mode"""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    collector_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collector_registry)
+    return collector_registry
+
+def metrics_response():
+    return generate_latest(registry()), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+def init_metrics(app, engine, sql_timing=True):
+    """Time `app`'s requests, and `engine`'s statements if `sql_timing`, and serve them at /metrics"""
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    if sql_timing:
+        instrument_engine(engine)
+    app.add_url_rule('/metrics', 'metrics', metrics_response)
@@ -0,0 +1,257 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import (Column, DateTime, Float, Index, Integer, LargeBinary, MetaData, String, Table, Text,
+                        UniqueConstraint, bindparam, func, insert, inspect, select, text, update)
+from sqlalchemy.exc import DBAPIError
+
+from recurrence import next_fire_time
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    'schema_version', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+# Migrations describe the schema as it was when they were written, never
+# through models.py: a later column's defaults or onupdate would otherwise
+# reach statements that run before that column exists.
+baseline_schema = MetaData()
+
+Table(
+    'settings', baseline_schema,
+    Column('id', Integer, primary_key=True),
+    Column('default_email', String(120), nullable=False),
+    Column('sender_name', String(120), nullable=False),
+)
+Table(
+    'table_version', baseline_schema,
+    Column('name', String(50), primary_key=True),
+    Column('version', Integer, nullable=False),
+)
+Table(
+    'scheduler_lease', baseline_schema,
+    Column('name', String(50), primary_key=True),
+    Column('holder', String(200), nullable=False),
+    Column('expires_at', DateTime, nullable=False),
+)
+baseline_reminder = Table(
+    'reminder', baseline_schema,
+    Column('id', Integer, primary_key=True),
+    Column('date', DateTime, nullable=False),
+    Column('description', String(500), nullable=False),
+    Column('email', String(120), nullable=False),
+    Column('frequency', String(50)),
+    Column('created_at', DateTime),
+    Column('last_sent', DateTime),
+    Column('end_date', DateTime),
+    Column('next_fire_at', DateTime),
+    Index('ix_reminder_next_fire_at', 'next_fire_at', 'id'),
+    Index('ix_reminder_date', 'date', 'id'),
+    Index('ix_reminder_email', 'email', 'id'),
+    Index('ix_reminder_frequency', 'frequency', 'id'),
+    Index('ix_reminder_end_date', 'end_date'),
+)
+Table(
+    'delivery', baseline_schema,
+    Column('id', Integer, primary_key=True),
+    Column('reminder_id', Integer, nullable=False),
+    Column('occurrence', DateTime, nullable=False),
+    Column('status', String(20), nullable=False),
+    Column('attempts', Integer, nullable=False),
+    Column('claimed_by', String(200), nullable=False),
+    Column('claimed_at', DateTime, nullable=False),
+    Column('finished_at', DateTime),
+    Column('retry_at', DateTime),
+    Column('latency_ms', Float),
+    Column('error', String(500)),
+    UniqueConstraint('reminder_id', 'occurrence', name='uq_delivery_occurrence'),
+    Index('ix_delivery_status', 'status', 'id'),
+)
+Table(
+    'dead_letter', baseline_schema,
+    Column('id', Integer, primary_key=True),
+    Column('reminder_id', Integer, nullable=False, index=True),
+    Column('occurrence', DateTime, nullable=False),
+    Column('email', String(120), nullable=False),
+    Column('subject', String(600), nullable=False),
+    Column('body', Text, nullable=False),
+    Column('html', Text),
+    Column('attempts', Integer, nullable=False),
+    Column('error', String(500)),
+    Column('created_at', DateTime),
+    Column('replayed_at', DateTime),
+)
+Table(
+    'email_template', baseline_schema,
+    Column('id', Integer, primary_key=True),
+    Column('email', String(120), nullable=False),
+    Column('name', String(20), nullable=False),
+    Column('subject', String(500), nullable=False),
+    Column('text_body', Text, nullable=False),
+    Column('html_body', Text),
+    Column('updated_at', DateTime),
+    UniqueConstraint('email', 'name', name='uq_email_template'),
+)
+Table(
+    'import_job', baseline_schema,
+    Column('id', String(32), primary_key=True),
+    Column('filename', String(255)),
+    Column('content_hash', String(64), nullable=False, index=True),
+    Column('spool_path', String(500)),
+    Column('status', String(20), nullable=False),
+    Column('rows_parsed', Integer),
+    Column('rows_inserted', Integer),
+    Column('rows_rejected', Integer),
+    Column('errors', Text),
+    Column('created_at', DateTime),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+)
+
+def _add_column(conn, table_name, column):
+    if column.name in {existing['name'] for existing in inspect(conn).get_columns(table_name)}:
+        return False
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(text(
+        f"ALTER TABLE {quote(table_name)} ADD COLUMN {quote(column.name)} "
+        f"{column.type.compile(dialect=conn.dialect)}"
+    ))
+    logger.info(f"Added column {table_name}.{column.name}")
+    return True
+
+def baseline(conn):
+    # Databases from before migrations were rebuilt on every boot, so they
+    # can only be missing whole tables or columns added since their last boot
+    baseline_schema.create_all(conn)
+    added = set()
+    for table in baseline_schema.sorted_tables:
+        for column in table.columns:
+            if not column.primary_key and column.nullable and _add_column(conn, table.name, column):
+                added.add((table.name, column.name))
+    if ('reminder', 'next_fire_at') in added:
+        _backfill_next_fire_at(conn)
+
+def _backfill_next_fire_at(conn):
+    # The scheduler only reads next_fire_at, so older reminders would never fire
+    table = baseline_reminder
+    rows = conn.execute(select(table.c.id, table.c.date, table.c.frequency,
+                               table.c.end_date, table.c.last_sent)).all()
+    if rows:
+        conn.execute(
+            update(table).where(table.c.id == bindparam('b_id')).values(next_fire_at=bindparam('b_next')),
+            [{'b_id': row.id,
+              'b_next': next_fire_time(row.date, row.frequency or 'once', row.end_date, row.last_sent)}
+             for row in rows]
+        )
+
+def reminder_indexes(conn):
+    # The scheduler's due-set scan, the listing's sort orders and filters,
+    # and end-date checks; baseline only indexes tables it creates
+    for index in baseline_reminder.indexes:
+        index.create(conn, checkfirst=True)
+
+def reminder_updated_at(conn):
+    # Lets the timer scheduler re-read only the reminders changed since it
+    # last looked; existing rows stay NULL until they are next written
+    column = Column('updated_at', DateTime)
+    _add_column(conn, 'reminder', column)
+    Table('reminder', MetaData(), column)
+    Index('ix_reminder_updated_at', column).create(conn, checkfirst=True)
+
+import_upload_chunk = Table(
+    'import_upload_chunk', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('job_id', String(32), nullable=False),
+    Column('seq', Integer, nullable=False),
+    Column('data', LargeBinary, nullable=False),
+    UniqueConstraint('job_id', 'seq', name='uq_import_upload_chunk'),
+)
+
+def import_uploads(conn):
+    # Uploads handed to Celery travel through the database, not the web
+    # host's disk, and a job's last progress tells an abandoned one apart
+    import_upload_chunk.create(conn, checkfirst=True)
+    _add_column(conn, 'import_job', Column('updated_at', DateTime))
+
+def reminder_email_case(conn):
+    # Reminders now store addresses trimmed and lower-cased, so digests can
+    # look recipients up on ix_reminder_email; older rows are brought in line.
+    # Normalised in Python, as SQLite's lower() leaves non-ASCII letters alone
+    table = baseline_reminder
+    rows = [(row.id, row.email.strip().lower()) for row in conn.execute(select(table.c.id, table.c.email))
+            if row.email != row.email.strip().lower()]
+    if rows:
+        conn.execute(
+            update(table).where(table.c.id == bindparam('b_id')).values(email=bindparam('b_email')),
+            [{'b_id': reminder_id, 'b_email': email} for reminder_id, email in rows]
+        )
+
+# Append only. Each migration runs in one transaction with its
+# schema_version row, so one that fails leaves nothing behind; it must
+# still be safe to run again, as another process may race it.
+MIGRATIONS = [
+    (1, 'baseline schema', baseline),
+    (2, 'reminder scheduler and listing indexes', reminder_indexes),
+    (3, 'reminder updated_at for incremental timer reloads', reminder_updated_at),
+    (4, 'import upload chunks and job progress times', import_uploads),
+    (5, 'normalised reminder emails', reminder_email_case),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(conn):
+    """Schema version of the database `conn` is connected to, 0 if never migrated"""
+    if not inspect(conn).has_table(schema_version.name):
+        return 0
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def is_current(engine):
+    """Whether every migration has been applied; one cheap query on a current database"""
+    with engine.connect() as conn:
+        return current_version(conn) >= LATEST_VERSION
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to `target` (default latest) and return their versions.
+
+    Each migration, DDL included, and its `schema_version` row commit
+    together. If one
+    fails because another process applied it first, that is not an error.
+    """
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    applied = []
+    for number, description, migrate in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        try:
+            with engine.begin() as conn:
+                if conn.dialect.name == 'sqlite':
+                    # pysqlite only opens a transaction before DML, so the
+                    # DDL before it would commit on its own
+                    conn.exec_driver_sql('BEGIN')
+                schema_version.create(conn, checkfirst=True)
+                migrate(conn)
+                conn.execute(insert(schema_version).values(
+                    version=number, description=description, applied_at=datetime.utcnow()))
+        except DBAPIError:
+            with engine.connect() as conn:
+                if current_version(conn) >= number:
+                    logger.info(f"Migration {number} was applied by another process")
+                    continue
+            raise
+        logger.info(f"Applied migration {number}: {description}")
+        applied.append(number)
+    return applied
+
+def history(engine):
+    """Applied migrations, oldest first"""
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_version.name):
+            return []
+        return [dict(row._mapping) for row in conn.execute(
+            select(schema_version).order_by(schema_version.c.version))]
@@ -0,0 +1,237 @@
+import json
+import uuid
+from datetime import datetime
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
+
+from dateparse import format_day, format_minute
+from recurrence import next_fire_time
+
+db = SQLAlchemy()
+
+def normalize_email(email):
+    """An address as reminders store it: surrounding spaces removed, lower case"""
+    return email.strip().lower()
+
+class Settings(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    default_email = db.Column(db.String(120), nullable=False)
+    sender_name = db.Column(db.String(120), nullable=False)
+
+    def to_dict(self):
+        return {
+            'default_email': self.default_email,
+            'sender_name': self.sender_name
+        }
+
+class TableVersion(db.Model):
+    """Per-table change counter backing ETags and the response cache"""
+    __tablename__ = 'table_version'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+CACHED_TABLES = ('reminder', 'settings', 'email_template')
+
+class SchedulerLease(db.Model):
+    """Lease row held by the one process allowed to run the reminder scheduler"""
+    __tablename__ = 'scheduler_lease'
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(200), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class Reminder(db.Model):
+    """Model for storing reminders"""
+    __tablename__ = 'reminder'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.DateTime, nullable=False)
+    description = db.Column(db.String(500), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    frequency = db.Column(db.String(50), default='once')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_sent = db.Column(db.DateTime, nullable=True)
+    end_date = db.Column(db.DateTime, nullable=True)
+    next_fire_at = db.Column(db.DateTime, nullable=True)
+    # Set on every insert and update, so the timer scheduler can re-read
+    # just the rows other processes changed
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Serves the scheduler's due-set range scan ordered by fire time
+        db.Index('ix_reminder_next_fire_at', 'next_fire_at', 'id'),
+        # Back the keyset-paginated listing's sort orders and filters
+        db.Index('ix_reminder_date', 'date', 'id'),
+        db.Index('ix_reminder_email', 'email', 'id'),
+        db.Index('ix_reminder_frequency', 'frequency', 'id'),
+        db.Index('ix_reminder_end_date', 'end_date'),
+        db.Index('ix_reminder_updated_at', 'updated_at'),
+    )
+
+    @validates('email')
+    def _normalize_email(self, key, email):
+        # Stored normalised, so lookups by recipient are plain comparisons on ix_reminder_email
+        return normalize_email(email) if email is not None else email
+
+    def __repr__(self):
+        return f'<Reminder {self.description[:20]}...>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'date': format_day(self.date),
+            'description': self.description,
+            'email': self.email,
+            'created_at': format_minute(self.created_at),
+            'frequency': self.frequency,
+            'end_date': format_day(self.end_date)
+        }
+
+    def schedule_next(self, after=None):
+        """Recompute next_fire_at from the reminder's schedule"""
+        self.next_fire_at = next_fire_time(self.date, self.frequency, self.end_date, after)
+        return self.next_fire_at
+
+class Delivery(db.Model):
+    """One claimed occurrence of a reminder and the outcome of sending it"""
+    __tablename__ = 'delivery'
+
+    id = db.Column(db.Integer, primary_key=True)
+    reminder_id = db.Column(db.Integer, nullable=False)
+    occurrence = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=1)
+    claimed_by = db.Column(db.String(200), nullable=False)
+    claimed_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    retry_at = db.Column(db.DateTime, nullable=True)
+    latency_ms = db.Column(db.Float, nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+
+    __table_args__ = (
+        # The claim: only one worker can insert a given occurrence
+        db.UniqueConstraint('reminder_id', 'occurrence', name='uq_delivery_occurrence'),
+        db.Index('ix_delivery_status', 'status', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'reminder_id': self.reminder_id,
+            'occurrence': self.occurrence.strftime('%d-%m-%Y %H:%M'),
+            'status': self.status,
+            'attempts': self.attempts,
+            'claimed_by': self.claimed_by,
+            'claimed_at': self.claimed_at.strftime('%d-%m-%Y %H:%M:%S'),
+            'finished_at': self.finished_at.strftime('%d-%m-%Y %H:%M:%S') if self.finished_at else None,
+            'retry_at': self.retry_at.strftime('%d-%m-%Y %H:%M:%S') if self.retry_at else None,
+            'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            'error': self.error
+        }
+
+class DeadLetter(db.Model):
+    """A reminder email that failed RETRY_MAX_ATTEMPTS times, kept for replay"""
+    __tablename__ = 'dead_letter'
+
+    id = db.Column(db.Integer, primary_key=True)
+    reminder_id = db.Column(db.Integer, nullable=False, index=True)
+    occurrence = db.Column(db.DateTime, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(600), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    html = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False)
+    error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    replayed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'reminder_id': self.reminder_id,
+            'occurrence': self.occurrence.strftime('%d-%m-%Y %H:%M'),
+            'email': self.email,
+            'subject': self.subject,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.strftime('%d-%m-%Y %H:%M:%S'),
+            'replayed_at': self.replayed_at.strftime('%d-%m-%Y %H:%M:%S') if self.replayed_at else None
+        }
+
+class EmailTemplate(db.Model):
+    """A recipient's own Jinja template for one kind of reminder email"""
+    __tablename__ = 'email_template'
+
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), nullable=False)
+    name = db.Column(db.String(20), nullable=False)
+    subject = db.Column(db.String(500), nullable=False)
+    text_body = db.Column(db.Text, nullable=False)
+    html_body = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('email', 'name', name='uq_email_template'),
+    )
+
+    def to_dict(self):
+        return {
+            'email': self.email,
+            'name': self.name,
+            'subject': self.subject,
+            'text': self.text_body,
+            'html': self.html_body,
+            'updated_at': self.updated_at.strftime('%d-%m-%Y %H:%M:%S') if self.updated_at else None
+        }
+
+class ImportJob(db.Model):
+    """Background CSV import, tracked through /imports/<id>"""
+    __tablename__ = 'import_job'
+
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    filename = db.Column(db.String(255))
+    content_hash = db.Column(db.String(64), nullable=False, index=True)
+    spool_path = db.Column(db.String(500))
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    rows_parsed = db.Column(db.Integer, default=0)
+    rows_inserted = db.Column(db.Integer, default=0)
+    rows_rejected = db.Column(db.Integer, default=0)
+    errors = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Last progress; a queued or running job silent for IMPORT_STALE_AFTER is abandoned
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'status': self.status,
+            'rows_parsed': self.rows_parsed or 0,
+            'rows_inserted': self.rows_inserted or 0,
+            'rows_rejected': self.rows_rejected or 0,
+            'rows_per_second': round((self.rows_parsed or 0) / elapsed, 1) if elapsed else None,
+            'errors': json.loads(self.errors) if self.errors else None,
+            'created_at': self.created_at.strftime('%d-%m-%Y %H:%M:%S') if self.created_at else None,
+            'started_at': self.started_at.strftime('%d-%m-%Y %H:%M:%S') if self.started_at else None,
+            'finished_at': self.finished_at.strftime('%d-%m-%Y %H:%M:%S') if self.finished_at else None
+        }
+
+class ImportUploadChunk(db.Model):
+    """Part of a spooled upload, stored so a Celery worker on another host can read it"""
+    __tablename__ = 'import_upload_chunk'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'seq', name='uq_import_upload_chunk'),
+    )
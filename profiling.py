@@ -0,0 +1,141 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CONTROL_FILE = 'control.json'
+
+class Profiler:
+    """Opt-in cProfile sampling of scheduler ticks and request handlers.
+
+    While enabled, each `profile(name)` block runs under cProfile with
+    probability `sample_rate`, and its stats are written to `directory` as
+    `<name>-<time>-<pid>-<ms>ms.pstats` when it took at least
+    `min_duration` seconds. Only the newest `max_files` profiles are kept.
+
+    `configure()` writes the switch and rate to a control file in
+    `directory`, which every process using the directory re-reads at most
+    once per `reload_interval` seconds, so one call reaches all gunicorn
+    workers and the scheduler on the host.
+    """
+
+    def __init__(self, directory, enabled=False, sample_rate=0.01, max_files=100, min_duration=0.0,
+                 reload_interval=1.0):
+        self.directory = directory
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.min_duration = min_duration
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._control_mtime = None
+        self._checked_at = 0.0
+
+    def _reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        path = os.path.join(self.directory, CONTROL_FILE)
+        try:
+            mtime = os.stat(path).st_mtime
+            if mtime == self._control_mtime:
+                return
+            with open(path) as f:
+                control = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._control_mtime = mtime
+            self.enabled = bool(control.get('enabled', self.enabled))
+            self.sample_rate = float(control.get('sample_rate', self.sample_rate))
+            self.min_duration = float(control.get('min_duration', self.min_duration))
+
+    def configure(self, enabled=None, sample_rate=None, min_duration=None):
+        """Change settings for every process sharing `directory`"""
+        with self._lock:
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if sample_rate is not None:
+                if not 0 <= sample_rate <= 1:
+                    raise ValueError('sample_rate must be between 0 and 1')
+                self.sample_rate = sample_rate
+            if min_duration is not None:
+                self.min_duration = min_duration
+            control = {'enabled': self.enabled, 'sample_rate': self.sample_rate, 'min_duration': self.min_duration}
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, CONTROL_FILE)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(control, f)
+            os.replace(temp_path, path)
+            self._control_mtime = os.stat(path).st_mtime
+        return self.state()
+
+    def state(self):
+        with self._lock:
+            return {'enabled': self.enabled, 'sample_rate': self.sample_rate, 'min_duration': self.min_duration,
+                    'max_files': self.max_files, 'directory': self.directory}
+
+    def profiles(self):
+        """Stored profile file names, newest first"""
+        stored = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.pstats'):
+                        try:
+                            stored.append((entry.stat().st_mtime, entry.name))
+                        except FileNotFoundError:
+                            pass
+        except FileNotFoundError:
+            return []
+        return [name for _, name in sorted(stored, reverse=True)]
+
+    @contextmanager
+    def profile(self, name):
+        """Run the block under cProfile if profiling is on and this call is sampled"""
+        self._reload()
+        # cProfile profiles one thread; a nested block is part of the outer profile
+        if (not self.enabled or getattr(self._local, 'active', False)
+                or random.random() >= self.sample_rate):
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile per process
+            yield
+            return
+        self._local.active = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._local.active = False
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_duration:
+                self._save(profiler, name, elapsed)
+
+    def _save(self, profiler, name, elapsed):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            file_name = f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}-{elapsed * 1000:.0f}ms.pstats"
+            profiler.dump_stats(os.path.join(self.directory, file_name))
+            for old in self.profiles()[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except FileNotFoundError:
+                    pass  # Another process pruned it first
+        except OSError as e:
+            logger.error(f"Could not save {name} profile: {str(e)}")
@@ -0,0 +1,167 @@
+import calendar
+from datetime import datetime, timedelta
+from enum import Enum
+
+class FrequencyType(str, Enum):
+    ONCE = "once"
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+# Fixed-length steps are timedeltas, calendar steps are a number of months
+FIXED_STEPS = {
+    FrequencyType.DAILY: timedelta(days=1),
+    FrequencyType.WEEKLY: timedelta(weeks=1),
+}
+MONTH_STEPS = {
+    FrequencyType.MONTHLY: 1,
+    FrequencyType.YEARLY: 12,
+}
+
+def add_months(value, months):
+    """Shift a datetime by whole months, clamping the day to the target month's length"""
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+def occurrence(date, frequency, index):
+    """Return the `index`-th occurrence (0 = `date`) of a schedule.
+
+    Each occurrence is computed from the anchor `date`, not from the previous
+    one, so a reminder on the 31st fires on the last day of shorter months
+    and returns to the 31st afterwards.
+    """
+    if index == 0:
+        return date
+    if frequency in FIXED_STEPS:
+        return date + index * FIXED_STEPS[frequency]
+    if frequency in MONTH_STEPS:
+        return add_months(date, index * MONTH_STEPS[frequency])
+    return None
+
+def first_index_after(date, frequency, after):
+    """Index of the first occurrence strictly after `after`, in O(1)"""
+    if after is None or date > after:
+        return 0
+    if frequency in FIXED_STEPS:
+        return (after - date) // FIXED_STEPS[frequency] + 1
+    if frequency in MONTH_STEPS:
+        step = MONTH_STEPS[frequency]
+        index = ((after.year - date.year) * 12 + after.month - date.month) // step
+        if add_months(date, index * step) <= after:
+            index += 1
+        return index
+    return None
+
+def within_end(value, end_date):
+    # The end date is inclusive of the whole day
+    return end_date is None or value.date() <= end_date.date()
+
+def next_fire_time(date, frequency, end_date=None, after=None):
+    """Return the first occurrence of a reminder schedule strictly after `after`.
+
+    Returns None once the schedule is exhausted (one-off already fired or
+    past `end_date`).
+    """
+    index = first_index_after(date, frequency, after)
+    if index is None:
+        return None
+    candidate = occurrence(date, frequency, index)
+    return candidate if within_end(candidate, end_date) else None
+
+def occurrences(date, frequency, end_date=None, after=None, count=1):
+    """Return up to `count` upcoming occurrences strictly after `after`"""
+    index = first_index_after(date, frequency, after)
+    if index is None:
+        return []
+    result = []
+    while len(result) < count:
+        candidate = occurrence(date, frequency, index)
+        if candidate is None or not within_end(candidate, end_date):
+            break
+        result.append(candidate)
+        if frequency not in FIXED_STEPS and frequency not in MONTH_STEPS:
+            break
+        index += 1
+    return result
+
+def is_due(next_fire_at, now):
+    """Whether a reminder with the given stored next fire time should be sent at `now`"""
+    return next_fire_at is not None and next_fire_at <= now
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+# numpy's NaT is the smallest int64. numpy itself is imported by the batch
+# functions only, so web workers that never schedule in bulk do not load it
+NAT_INT = -2 ** 63
+
+def _as_datetime64(values):
+    import numpy as np
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+        return values.astype('datetime64[us]')
+    # Integer arithmetic is an order of magnitude faster than numpy's
+    # conversion of a list of datetime objects
+    return np.array(
+        [NAT_INT if v is None else (v - EPOCH) // MICROSECOND for v in values],
+        dtype=np.int64
+    ).view('datetime64[us]')
+
+def next_fire_times_array(dates, frequencies, end_dates=None, after=None):
+    """Vectorized next_fire_time over a batch of reminders.
+
+    Takes parallel sequences of anchor dates, frequencies and optional end
+    dates and returns a datetime64[us] array with NaT where a schedule is
+    exhausted. `after` is a single datetime (or None) applied to every row.
+    """
+    import numpy as np
+
+    dates = _as_datetime64(dates)
+    frequencies = np.asarray(frequencies, dtype=object).astype(str)
+    result = np.full(dates.shape, np.datetime64('NaT'), dtype='datetime64[us]')
+
+    if after is None:
+        not_started = np.ones(dates.shape, dtype=bool)
+    else:
+        after = np.datetime64(after, 'us')
+        not_started = dates > after
+    result[not_started] = dates[not_started]
+
+    for frequency, step in FIXED_STEPS.items():
+        rows = (frequencies == frequency.value) & ~not_started
+        if rows.any():
+            step = np.timedelta64(step, 'us')
+            index = (after - dates[rows]) // step + 1
+            result[rows] = dates[rows] + index * step
+
+    for frequency, step in MONTH_STEPS.items():
+        rows = (frequencies == frequency.value) & ~not_started
+        if rows.any():
+            anchor = dates[rows]
+            anchor_month = anchor.astype('datetime64[M]')
+            day_offset = (anchor.astype('datetime64[D]') - anchor_month.astype('datetime64[D]')).astype(np.int64)
+            time_of_day = anchor - anchor.astype('datetime64[D]')
+
+            def nth(index):
+                month = anchor_month + index * step
+                month_days = ((month + 1).astype('datetime64[D]') - month.astype('datetime64[D]')).astype(np.int64)
+                day = np.minimum(day_offset, month_days - 1)
+                return month.astype('datetime64[D]') + day.astype('timedelta64[D]') + time_of_day
+
+            index = (after.astype('datetime64[M]') - anchor_month).astype(np.int64) // step
+            candidate = nth(index)
+            late = candidate <= after
+            index[late] += 1
+            result[rows] = np.where(late, nth(index), candidate)
+
+    if end_dates is not None:
+        end_days = _as_datetime64(end_dates).astype('datetime64[D]')
+        past_end = ~np.isnat(end_days) & (result.astype('datetime64[D]') > end_days)
+        result[past_end] = np.datetime64('NaT')
+    return result
+
+def next_fire_times(dates, frequencies, end_dates=None, after=None):
+    """List form of next_fire_times_array, with None for exhausted schedules"""
+    return next_fire_times_array(dates, frequencies, end_dates, after).astype(object).tolist()
@@ -0,0 +1,458 @@
+"""Sending reminders and running imports.
+
+Everything here expects an app context: request handlers and Celery tasks
+have one, and the scheduler process wraps its jobs in one.
+"""
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import bindparam
+
+import services
+from metrics import REMINDERS_FAILED, REMINDERS_SENT, TICK_DUE, TICK_PHASE, TICK_SECONDS, PhaseTimer
+from models import db, DeadLetter, ImportJob, ImportUploadChunk, Reminder, TableVersion
+from recurrence import next_fire_times
+
+logger = logging.getLogger(__name__)
+
+def send_email(to_email, subject, body, html=None):
+    """Send email over a pooled connection to the configured SMTP server.
+
+    Raises the SMTP or connection error if it fails, so callers can record it.
+    """
+    from email_templates import RenderedEmail
+    message = services.email_renderer().build(to_email, RenderedEmail(subject, body, html))
+    services.smtp_pool().sendmail(current_app.config['SENDER_EMAIL'], to_email, message)
+
+    logger.info(f"Email sent successfully to {to_email}")
+    return True
+
+def reminder_context(reminder):
+    """Template variables for one reminder"""
+    return {
+        'id': reminder.id,
+        'description': reminder.description,
+        'email': reminder.email,
+        'frequency': reminder.frequency,
+        'date': reminder.date.strftime('%d-%m-%Y %H:%M'),
+        'end_date': reminder.end_date.strftime('%d-%m-%Y') if reminder.end_date else None
+    }
+
+def reminder_email(reminder, context=None):
+    """Render the `(subject, text, html)` notification for one reminder"""
+    return services.email_renderer().render('reminder', {'reminder': context or reminder_context(reminder)},
+                                 recipient=reminder.email)
+
+def digest_email(to_email, contexts):
+    """Render the `(subject, text, html)` digest of several due reminders"""
+    return services.email_renderer().render('digest', {'reminders': contexts}, recipient=to_email)
+
+def digest_companions(reminders, now):
+    """Other due reminders for the recipients in a batch, so each gets one digest"""
+    batch_ids = {reminder.id for reminder in reminders}
+    emails = {reminder.email for reminder in reminders}
+    return [reminder for reminder in Reminder.query.filter(
+        Reminder.email.in_(emails),
+        Reminder.next_fire_at <= now
+    ).order_by(Reminder.next_fire_at, Reminder.id) if reminder.id not in batch_ids]
+
+def message_groups(due, emails, now):
+    """Split reminder IDs into outgoing messages and the groups held back.
+
+    Without DIGEST_MODE every reminder is its own message. With it, each
+    recipient's reminders form one digest of at most DIGEST_MAX_ITEMS,
+    held until its oldest reminder has waited DIGEST_WINDOW seconds.
+    Returns the ready groups and `(reminder_id, send_at)` pairs for the rest.
+    """
+    if not current_app.config['DIGEST_MODE']:
+        return [[reminder_id] for reminder_id in due], []
+    by_email = defaultdict(list)
+    for reminder_id in due:
+        by_email[emails[reminder_id]].append(reminder_id)
+    max_items = current_app.config['DIGEST_MAX_ITEMS']
+    window = timedelta(seconds=current_app.config['DIGEST_WINDOW'])
+    ready, held = [], []
+    for reminder_ids in by_email.values():
+        send_at = min(due[reminder_id][0] for reminder_id in reminder_ids) + window
+        if send_at > now:
+            held.extend((reminder_id, send_at) for reminder_id in reminder_ids)
+            continue
+        ready.extend(reminder_ids[i:i + max_items] for i in range(0, len(reminder_ids), max_items))
+    return ready, held
+
+def reschedule_reminders(rows, sent_at=None):
+    """Move reminders on given `(reminder_id, expected_fire_at, next_fire_at)` rows.
+
+    Conditional on `next_fire_at` still being the value the batch read, so
+    an edit made while the email was in flight is not overwritten. With
+    `sent_at` the reminders are also marked sent.
+    """
+    if not rows:
+        return
+    table = Reminder.__table__
+    values = {'next_fire_at': bindparam('fire_at')}
+    if sent_at is not None:
+        values['last_sent'] = sent_at
+    db.session.execute(
+        table.update()
+        .where(table.c.id == bindparam('reminder_id'))
+        .where(table.c.next_fire_at == bindparam('expected'))
+        .values(**values),
+        [{
+            'reminder_id': reminder_id,
+            'expected': expected,
+            'fire_at': fire_at
+        } for reminder_id, expected, fire_at in rows]
+    )
+
+def send_due_reminders(reminders, now):
+    """Claim, render, dispatch and record one batch of due reminders.
+
+    Sent reminders move on to their next occurrence. Failed ones are retried
+    with exponential backoff until RETRY_MAX_ATTEMPTS, after which they are
+    dead-lettered and also move on. While the SMTP circuit is open the batch
+    is deferred unclaimed. In DIGEST_MODE each recipient's due reminders,
+    including ones outside this batch, go out as one message.
+
+    Returns the `(reminder_id, next_fire_at)` pairs to schedule next and the
+    IDs that failed. Reminders another process already claimed are in
+    neither.
+    """
+    breaker = services.smtp_breaker()
+    delivery_log = services.deliveries()
+    phases = PhaseTimer()
+    if current_app.config['DIGEST_MODE']:
+        reminders = list(reminders) + digest_companions(reminders, now)
+        phases.lap('query')
+
+    # Render and snapshot on this thread, before the claim's commit expires
+    # the ORM objects, so worker threads never touch them
+    due = {reminder.id: (reminder.next_fire_at, reminder.date, reminder.frequency, reminder.end_date)
+           for reminder in reminders}
+    contexts = {reminder.id: reminder_context(reminder) for reminder in reminders}
+    messages = {reminder.id: (reminder.email, *reminder_email(reminder, contexts[reminder.id]))
+                for reminder in reminders}
+    phases.lap('render')
+
+    groups, scheduled = message_groups(due, {reminder_id: message[0] for reminder_id, message in messages.items()}, now)
+    allowed = breaker.permits(len(groups))
+    if allowed < len(groups):
+        resume_at = now + timedelta(seconds=breaker.retry_after())
+        deferred = [reminder_id for group in groups[allowed:] for reminder_id in group]
+        scheduled.extend((reminder_id, resume_at) for reminder_id in deferred)
+        logger.warning(f"SMTP circuit {breaker.state}; deferring {len(deferred)} reminders")
+        groups = groups[:allowed]
+    if not groups:
+        phases.lap('decide')
+        return scheduled, []
+
+    # Whatever happens from here on, report to the breaker so a half-open
+    # probe is always released
+    sent_keys, failed_keys = [], []
+    try:
+        batch_ids = [reminder_id for group in groups for reminder_id in group]
+        claimed = delivery_log.claim(db.session, [(reminder_id, due[reminder_id][0]) for reminder_id in batch_ids], now)
+        if len(claimed) < len(batch_ids):
+            skipped = sorted(reminder_id for reminder_id in batch_ids if reminder_id not in claimed)
+            logger.info(f"Skipping reminders already claimed or awaiting retry: {skipped}")
+        phases.lap('decide')
+
+        # Each outgoing message is keyed by the tuple of reminder IDs it covers
+        outgoing = []
+        for group in groups:
+            members = tuple(reminder_id for reminder_id in group if reminder_id in claimed)
+            if len(members) == 1:
+                outgoing.append((members, *messages[members[0]]))
+            elif members:
+                to_email = messages[members[0]][0]
+                outgoing.append((members, to_email,
+                                 *digest_email(to_email, [contexts[reminder_id] for reminder_id in members])))
+        phases.lap('render')
+
+        timings, errors = {}, {}
+        sent_keys, failed_keys = services.dispatcher().dispatch(outgoing, timings, errors)
+        phases.lap('send')
+    finally:
+        breaker.record(len(sent_keys), len(failed_keys))
+
+    sent_ids = [reminder_id for key in sent_keys for reminder_id in key]
+    failed_ids = [reminder_id for key in failed_keys for reminder_id in key]
+    REMINDERS_SENT.inc(len(sent_ids))
+    REMINDERS_FAILED.inc(len(failed_ids))
+    retries, dead_ids = [], []
+    for key in failed_keys:
+        # One retry time per message so a digest's reminders come back together
+        live = [reminder_id for reminder_id in key if claimed[reminder_id][1] < delivery_log.max_attempts]
+        if live:
+            retry_at = delivery_log.retry_time(min(claimed[reminder_id][1] for reminder_id in live), now)
+            retries.extend((reminder_id, retry_at) for reminder_id in live)
+        dead_ids.extend(reminder_id for reminder_id in key if reminder_id not in live)
+
+    # Sent and dead-lettered reminders both move on to their next occurrence
+    moving_on = sent_ids + dead_ids
+    fire_times = {}
+    if moving_on:
+        fire_times = dict(zip(moving_on, next_fire_times(
+            [due[reminder_id][1] for reminder_id in moving_on],
+            [due[reminder_id][2] for reminder_id in moving_on],
+            [due[reminder_id][3] for reminder_id in moving_on],
+            after=now
+        )))
+    reschedule_reminders([(reminder_id, due[reminder_id][0], fire_times[reminder_id]) for reminder_id in sent_ids],
+                         sent_at=now)
+    reschedule_reminders([(reminder_id, due[reminder_id][0], retry_at) for reminder_id, retry_at in retries] +
+                         [(reminder_id, due[reminder_id][0], fire_times[reminder_id]) for reminder_id in dead_ids])
+
+    retry_times = dict(retries)
+    delivery_log.finish(db.session, [
+        (reminder_id, claimed[reminder_id][0], sent, timings.get(key),
+         errors.get(key), retry_times.get(reminder_id))
+        for keys, sent in ((sent_keys, True), (failed_keys, False))
+        for key in keys
+        for reminder_id in key
+    ])
+    if dead_ids:
+        # Dead letters hold each reminder's own email so replays are not digests
+        db.session.execute(DeadLetter.__table__.insert(), [{
+            'reminder_id': reminder_id,
+            'occurrence': claimed[reminder_id][0],
+            'email': messages[reminder_id][0],
+            'subject': messages[reminder_id][1],
+            'body': messages[reminder_id][2],
+            'html': messages[reminder_id][3],
+            'attempts': claimed[reminder_id][1],
+            'error': (errors.get(key) or 'send failed')[:500],
+            'created_at': now
+        } for key in failed_keys for reminder_id in key if reminder_id in dead_ids])
+    db.session.commit()
+    phases.lap('commit')
+
+    if sent_ids:
+        logger.info(f"Reminders sent for IDs: {sorted(sent_ids)} in {len(sent_keys)} messages")
+    if retries:
+        logger.error(f"Failed to send reminders for IDs: {sorted(retry_times)}; retrying with backoff")
+    if dead_ids:
+        logger.error(f"Dead-lettered reminders after {delivery_log.max_attempts} attempts: {sorted(dead_ids)}")
+    scheduled.extend((reminder_id, fire_times[reminder_id]) for reminder_id in moving_on)
+    scheduled.extend(retries)
+    return scheduled, failed_ids
+
+@services.profiled('check_reminders')
+def check_reminders():
+    """Check for due reminders and send notifications"""
+    tick_start = time.perf_counter()
+    due_count = 0
+    try:
+        now = datetime.utcnow()
+        batch_size = current_app.config['REMINDER_BATCH_SIZE']
+        last_fire_at, last_id = None, 0
+
+        while True:
+            # Walk the due set in (next_fire_at, id) order so the index bounds
+            # the scan and reminders that failed to send are not revisited
+            query = Reminder.query.filter(Reminder.next_fire_at <= now)
+            if last_fire_at is not None:
+                query = query.filter(
+                    (Reminder.next_fire_at > last_fire_at) |
+                    ((Reminder.next_fire_at == last_fire_at) & (Reminder.id > last_id))
+                )
+            query_start = time.perf_counter()
+            reminders = query.order_by(Reminder.next_fire_at, Reminder.id).limit(batch_size).all()
+            TICK_PHASE['query'].observe(time.perf_counter() - query_start)
+            if not reminders:
+                break
+            due_count += len(reminders)
+            last_fire_at, last_id = reminders[-1].next_fire_at, reminders[-1].id
+
+            send_due_reminders(reminders, now)
+
+            if len(reminders) < batch_size:
+                break
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error in check_reminders: {str(e)}")
+    finally:
+        tick_seconds = time.perf_counter() - tick_start
+        services.dispatcher().stats.record_tick(tick_seconds, due_count)
+        TICK_SECONDS.observe(tick_seconds)
+        TICK_DUE.observe(due_count)
+
+@services.profiled('fire_reminders')
+def fire_reminders(reminder_ids, now):
+    """Send the given reminders if they are still due; used by the timer scheduler.
+
+    Returns the `(reminder_id, fire_at)` pairs the timer should schedule next:
+    next occurrences, backed-off retries and deferrals from the dispatch, and
+    the stored time for reminders that changed since they were queued.
+    """
+    tick_start = time.perf_counter()
+    scheduled = []
+    due = []
+    try:
+        batch_size = current_app.config['REMINDER_BATCH_SIZE']
+        for offset in range(0, len(reminder_ids), batch_size):
+            query_start = time.perf_counter()
+            reminders = Reminder.query.filter(
+                Reminder.id.in_(reminder_ids[offset:offset + batch_size])
+            ).all()
+            TICK_PHASE['query'].observe(time.perf_counter() - query_start)
+            due = [r for r in reminders if r.next_fire_at is not None and r.next_fire_at <= now]
+            scheduled.extend((r.id, r.next_fire_at) for r in reminders if r not in due)
+            if due:
+                scheduled.extend(send_due_reminders(due, now)[0])
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error firing reminders {reminder_ids}: {str(e)}")
+        # Hand the batch back so it is retried rather than dropped
+        retry_at = now + timedelta(seconds=current_app.config['TIMER_RETRY_DELAY'])
+        scheduled = [(reminder_id, retry_at) for reminder_id in reminder_ids]
+    finally:
+        tick_seconds = time.perf_counter() - tick_start
+        services.dispatcher().stats.record_tick(tick_seconds, len(reminder_ids))
+        TICK_SECONDS.observe(tick_seconds)
+        TICK_DUE.observe(len(reminder_ids))
+    return scheduled
+
+def load_upcoming_reminders(until):
+    """(id, next_fire_at) for every reminder due by `until`, read from the fire-time index"""
+    return db.session.query(Reminder.id, Reminder.next_fire_at).filter(
+        Reminder.next_fire_at <= until
+    ).all()
+
+def load_changed_reminders(since):
+    """(id, next_fire_at) for every reminder written at or after `since`"""
+    return db.session.query(Reminder.id, Reminder.next_fire_at).filter(
+        Reminder.updated_at >= since
+    ).all()
+
+def reminder_table_version():
+    return db.session.query(TableVersion.version).filter(TableVersion.name == 'reminder').scalar()
+
+def replay_dead_letters(letters):
+    """Resend dead letters through the dispatcher, marking the ones that go out.
+
+    Each goes to its reminder's current address, so correcting a bad one
+    and replaying delivers it; letters of deleted reminders go to the
+    address they failed on. A replay that goes out also closes the dead
+    delivery of its occurrence.
+    """
+    now = datetime.utcnow()
+    by_id = {letter.id: letter for letter in letters}
+    current = dict(db.session.execute(
+        db.select(Reminder.id, Reminder.email).where(Reminder.id.in_({letter.reminder_id for letter in letters}))
+    ).all()) if letters else {}
+    sent_ids, failed_ids = [], []
+    try:
+        sent_ids, failed_ids = services.dispatcher().dispatch(
+            [(letter.id, current.get(letter.reminder_id, letter.email), letter.subject, letter.body, letter.html)
+             for letter in letters])
+    finally:
+        # Always report, so a half-open probe is released
+        services.smtp_breaker().record(len(sent_ids), len(failed_ids))
+    for letter_id in sent_ids:
+        by_id[letter_id].replayed_at = now
+    services.deliveries().replayed(
+        db.session, [(by_id[letter_id].reminder_id, by_id[letter_id].occurrence) for letter_id in sent_ids], now)
+    db.session.commit()
+    return sent_ids, failed_ids
+
+# Size of the pieces an upload is stored in for a remote worker
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+def store_upload(job):
+    """Move a job's spooled upload into the database, for a worker on another host"""
+    table = ImportUploadChunk.__table__
+    with open(job.spool_path, 'rb') as spool:
+        for seq, data in enumerate(iter(lambda: spool.read(UPLOAD_CHUNK_BYTES), b'')):
+            db.session.execute(table.insert().values(job_id=job.id, seq=seq, data=data))
+    os.remove(job.spool_path)
+    job.spool_path = None
+    db.session.commit()
+
+def restore_upload(job):
+    """Write a job's stored upload to this host's spool directory and delete it from the database"""
+    os.makedirs(current_app.config['IMPORT_SPOOL_DIR'], exist_ok=True)
+    job.spool_path = os.path.join(current_app.config['IMPORT_SPOOL_DIR'], f"{job.id}.csv")
+    table = ImportUploadChunk.__table__
+    result = db.session.execute(db.select(table.c.data).where(table.c.job_id == job.id)
+                                .order_by(table.c.seq).execution_options(yield_per=1))
+    with open(job.spool_path, 'wb') as spool:
+        for data, in result:
+            spool.write(data)
+    db.session.execute(table.delete().where(table.c.job_id == job.id))
+    db.session.commit()
+
+@services.profiled('import_job')
+def run_import_job(job_id):
+    """Import a spooled CSV and record progress on its ImportJob"""
+    from importer import CSVImporter
+
+    job = db.session.get(ImportJob, job_id)
+    if not job or job.status != 'queued':
+        return
+
+    job.status = 'running'
+    job.started_at = datetime.utcnow()
+    db.session.commit()
+
+    def record_progress(stats):
+        job.rows_parsed = stats.rows_parsed
+        job.rows_inserted = stats.rows_inserted
+        job.rows_rejected = stats.rows_rejected
+        # Each chunk the importer committed is visible to listings now
+        services.bump_table_version('reminder')
+        db.session.commit()
+
+    try:
+        if job.spool_path is None:
+            restore_upload(job)
+        importer = CSVImporter(
+            db.session,
+            Reminder.__table__,
+            schedule=next_fire_times,
+            chunk_size=current_app.config['IMPORT_CHUNK_SIZE'],
+            max_errors=current_app.config['IMPORT_MAX_ERRORS'],
+            progress=record_progress
+        )
+        with open(job.spool_path, 'rb') as spool:
+            stats = importer.run(spool)
+        record_progress(stats)
+        job.errors = json.dumps(stats.errors) if stats.errors else None
+        job.status = 'completed'
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Import job {job_id} failed: {str(e)}")
+        job.errors = json.dumps([str(e)])
+        job.status = 'failed'
+    finally:
+        job.finished_at = datetime.utcnow()
+        # Anything restore_upload did not get to
+        db.session.execute(ImportUploadChunk.__table__.delete().where(ImportUploadChunk.job_id == job_id))
+        db.session.commit()
+        if job.spool_path and os.path.exists(job.spool_path):
+            os.remove(job.spool_path)
+
+def submit_import_job(job):
+    """Hand an import to Celery when a broker is configured, else a local thread.
+
+    Celery workers may run on another host, so their upload goes through
+    the database instead of the local spool directory.
+    """
+    job_id = job.id
+    if current_app.config['CELERY_BROKER_URL']:
+        store_upload(job)
+        services.celery_client().send_task('tasks.import_csv', args=[job_id])
+    else:
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                run_import_job(job_id)
+
+        services.import_executor().submit(run)
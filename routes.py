@@ -0,0 +1,690 @@
+import csv
+import functools
+import hashlib
+import hmac
+import io
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, render_template, request, send_from_directory
+
+import serialization
+import services
+from dateparse import parse_date
+from models import db, normalize_email, DeadLetter, Delivery, EmailTemplate, ImportJob, Reminder, Settings
+from reminders import replay_dead_letters, send_email, submit_import_job
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('reminders', __name__)
+
+def cached_json(table, key, build):
+    """Serve `build()` as JSON with a strong ETag, reusing the cached body while `table` is unchanged"""
+    cache = services.response_cache()
+    version = cache.versions()[table]
+    etag = f"{table}-{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        body = cache.get(etag)
+        if body is None:
+            body = current_app.json.dumps(build())
+            cache.put(etag, body)
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@bp.route('/keep-alive')
+def keep_alive_endpoint():
+    """Secondary keep-alive endpoint that helps maintain the application's active state"""
+    try:
+        # The version snapshot doubles as the database probe, so frequent
+        # pings reach the database at most once per HEALTH_CHECK_TTL
+        services.response_cache().versions(max_age=current_app.config['HEALTH_CHECK_TTL'])
+        return jsonify({
+            'status': 'ok',
+            'timestamp': datetime.utcnow().strftime('%d-%m-%Y %H:%M:%S')
+        })
+    except Exception as e:
+        logger.error(f"Keep-alive check failed: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        }), 500
+
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+def parse_date_string(date_string):
+    """Parse any date string to datetime object, or None if it is not a valid date"""
+    return parse_date(date_string)
+
+@bp.route('/add_reminder', methods=['POST'])
+def add_reminder():
+    try:
+        data = request.get_json()
+        
+        # Convert string date to datetime object
+        reminder_date = parse_date_string(data.get('date'))
+        if not reminder_date:
+            return jsonify({"error": "Invalid date format. Use DD-MM-YYYY"}), 400
+
+        new_reminder = Reminder(
+            date=reminder_date,
+            description=data.get('description', '').strip(),
+            email=data.get('email', ''),
+            frequency=data.get('frequency', 'once'),
+            created_at=datetime.now()
+        )
+        new_reminder.schedule_next()
+
+        db.session.add(new_reminder)
+        services.bump_table_version('reminder')
+        db.session.commit()
+
+        return jsonify({"message": "Reminder added successfully"}), 200
+
+    except Exception as e:
+        print(f"Error adding reminder: {str(e)}")  # Debug log
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+REMINDER_SORTS = {
+    'id': Reminder.id,
+    'date': Reminder.date,
+}
+
+def parse_filter_date(args, name):
+    if not args.get(name):
+        return None
+    value = parse_date_string(args[name])
+    if not value:
+        raise ValueError(f"Invalid {name}. Use DD-MM-YYYY")
+    return value
+
+def reminder_filters(args):
+    """Build filter criteria for reminder listings from query string arguments"""
+    criteria = []
+    if args.get('email'):
+        criteria.append(Reminder.email == normalize_email(args['email']))
+    if args.get('frequency'):
+        criteria.append(Reminder.frequency == args['frequency'].strip().lower())
+    date_from = parse_filter_date(args, 'date_from')
+    if date_from:
+        criteria.append(Reminder.date >= date_from)
+    date_to = parse_filter_date(args, 'date_to')
+    if date_to:
+        criteria.append(Reminder.date <= date_to)
+    return criteria
+
+def reminder_query(args):
+    """Select the listing columns of reminders matching `args`, in sort order and resuming after `after_id`"""
+    sort = args.get('sort', 'id')
+    after_id = args.get('after_id', type=int)
+    if sort not in REMINDER_SORTS:
+        raise ValueError(f"Invalid sort. Sort by one of: {', '.join(REMINDER_SORTS)}")
+
+    statement = db.select(*serialization.REMINDER_COLUMNS).where(*reminder_filters(args))
+    sort_column = REMINDER_SORTS[sort]
+    if after_id is not None:
+        if sort_column is Reminder.id:
+            statement = statement.where(Reminder.id > after_id)
+        else:
+            # Resume after the cursor row's (sort value, id) position
+            cursor_value = db.session.query(sort_column).filter(Reminder.id == after_id).scalar()
+            if cursor_value is None:
+                raise ValueError('Invalid after_id')
+            statement = statement.where(
+                (sort_column > cursor_value) |
+                ((sort_column == cursor_value) & (Reminder.id > after_id))
+            )
+    return statement.order_by(sort_column, Reminder.id)
+
+def reminder_page(args):
+    """Build one keyset-paginated page of reminders, raising ValueError on bad arguments"""
+    limit = min(args.get('limit', current_app.config['REMINDERS_PAGE_SIZE'], type=int),
+                current_app.config['REMINDERS_MAX_PAGE_SIZE'])
+    if limit < 1:
+        raise ValueError('Invalid limit')
+
+    rows = db.session.execute(reminder_query(args).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'reminders': [serialization.reminder_row(row) for row in rows],
+        'has_more': has_more,
+        'next_after_id': rows[-1].id if has_more else None
+    }
+
+@bp.route('/get_reminders', methods=['GET'])
+@services.profiled('get_reminders')
+def get_reminders():
+    """List reminders a page at a time.
+
+    Pages are keyset-paginated: pass the previous page's `next_after_id` as
+    `after_id`. Supports `limit`, `sort` (id or date) and the `email`,
+    `frequency`, `date_from` and `date_to` filters. Responses carry an ETag
+    and are served from the response cache until reminders change.
+
+    With `format=ndjson` every matching reminder after `after_id` (or the
+    first `limit` of them) is streamed one JSON object per line instead.
+    """
+    try:
+        if request.args.get('format') == 'ndjson':
+            statement = reminder_query(request.args)
+            if 'limit' in request.args:
+                limit = request.args.get('limit', type=int)
+                if not limit or limit < 1:
+                    raise ValueError('Invalid limit')
+                statement = statement.limit(limit)
+            return serialization.ndjson_response(statement)
+        return cached_json('reminder', request.full_path, lambda: reminder_page(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error fetching reminders: {str(e)}")
+        return jsonify({'error': 'Failed to fetch reminders', 'details': str(e)}), 500
+
+@bp.route('/get_reminders/count', methods=['GET'])
+def count_reminders():
+    """Number of reminders matching the same filters as /get_reminders"""
+    try:
+        try:
+            criteria = reminder_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return cached_json('reminder', request.full_path, lambda: {
+            'count': db.session.query(db.func.count(Reminder.id)).filter(*criteria).scalar()
+        })
+    except Exception as e:
+        logger.error(f"Error counting reminders: {str(e)}")
+        return jsonify({'error': 'Failed to count reminders', 'details': str(e)}), 500
+
+@bp.route('/deliveries', methods=['GET'])
+def list_deliveries():
+    """Most recent delivery attempts, optionally for one reminder or status"""
+    try:
+        query = Delivery.query
+        if request.args.get('reminder_id'):
+            query = query.filter(Delivery.reminder_id == int(request.args['reminder_id']))
+        if request.args.get('status'):
+            query = query.filter(Delivery.status == request.args['status'])
+        limit = min(int(request.args.get('limit', 100)), current_app.config['REMINDERS_MAX_PAGE_SIZE'])
+        return jsonify([delivery.to_dict() for delivery in query.order_by(Delivery.id.desc()).limit(limit)])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error listing deliveries: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/dead_letters', methods=['GET'])
+def list_dead_letters():
+    """Dead-lettered reminder emails, newest first; replayed ones only with ?replayed=1"""
+    try:
+        query = DeadLetter.query
+        if request.args.get('replayed') not in ('1', 'true'):
+            query = query.filter(DeadLetter.replayed_at.is_(None))
+        limit = min(int(request.args.get('limit', 100)), current_app.config['REMINDERS_MAX_PAGE_SIZE'])
+        return jsonify([letter.to_dict() for letter in query.order_by(DeadLetter.id.desc()).limit(limit)])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error listing dead letters: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/dead_letters/replay', methods=['POST'])
+@bp.route('/dead_letters/<int:letter_id>/replay', methods=['POST'])
+def replay_dead_letter(letter_id=None):
+    """Resend one dead letter, or up to `limit` unreplayed ones oldest first"""
+    try:
+        query = DeadLetter.query.filter(DeadLetter.replayed_at.is_(None))
+        if letter_id is not None:
+            letters = query.filter(DeadLetter.id == letter_id).all()
+            if not letters:
+                return jsonify({"error": "Dead letter not found or already replayed"}), 404
+        else:
+            limit = min(int(request.args.get('limit', 100)), current_app.config['REMINDERS_MAX_PAGE_SIZE'])
+            letters = query.order_by(DeadLetter.id).limit(limit).all()
+
+        # Replays go through the circuit breaker like scheduled sends
+        breaker = services.smtp_breaker()
+        allowed = breaker.permits(len(letters))
+        if letters and not allowed:
+            return jsonify({
+                "error": "SMTP circuit is open",
+                "retry_after": round(breaker.retry_after(), 1)
+            }), 503
+        sent_ids, failed_ids = replay_dead_letters(letters[:allowed])
+        logger.info(f"Replayed dead letters {sorted(sent_ids)}; failed {sorted(failed_ids)}")
+        return jsonify({
+            "replayed": sorted(sent_ids),
+            "failed": sorted(failed_ids),
+            "deferred": [letter.id for letter in letters[allowed:]]
+        }), 200 if not failed_ids else 502
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error replaying dead letters: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/test_email', methods=['POST'])
+def test_email():
+    try:
+        data = request.get_json()
+        email = data.get('email')
+        if not email:
+            return jsonify({"error": "Email is required"}), 400
+
+        subject = "Test Email from Reminder App"
+        body = "This is a test email from your Reminder App."
+        
+        send_email(email, subject, body)
+        return jsonify({"message": "Test email sent successfully"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def spool_upload(file):
+    """Copy an upload to the import spool directory, returning (path, sha256)"""
+    os.makedirs(current_app.config['IMPORT_SPOOL_DIR'], exist_ok=True)
+    path = os.path.join(current_app.config['IMPORT_SPOOL_DIR'], f"{uuid.uuid4().hex}.csv")
+    digest = hashlib.sha256()
+    with open(path, 'wb') as spool:
+        for chunk in iter(lambda: file.stream.read(64 * 1024), b''):
+            digest.update(chunk)
+            spool.write(chunk)
+    return path, digest.hexdigest()
+
+@bp.route('/upload_csv', methods=['POST'])
+@services.profiled('upload_csv')
+def upload_csv():
+    if 'file' not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    file = request.files['file']
+    if not file.filename.endswith('.csv'):
+        return jsonify({"error": "File must be a CSV"}), 400
+
+    spool_path = None
+    try:
+        spool_path, content_hash = spool_upload(file)
+
+        # The same content already imported (or being imported) is not queued
+        # again, unless its job has made no progress for so long that its
+        # worker must have gone away
+        stale_before = datetime.utcnow() - timedelta(seconds=current_app.config['IMPORT_STALE_AFTER'])
+        existing = None
+        for job in ImportJob.query.filter(ImportJob.content_hash == content_hash,
+                                          ImportJob.status != 'failed'):
+            if job.status != 'completed' and (job.updated_at or job.created_at) < stale_before:
+                job.status = 'failed'
+                job.errors = json.dumps(['Abandoned: no progress before it was uploaded again'])
+                job.finished_at = datetime.utcnow()
+            else:
+                existing = job
+        db.session.commit()
+        if existing:
+            os.remove(spool_path)
+            return jsonify({
+                "message": "This file has already been imported",
+                "skipped": True,
+                "job": existing.to_dict(),
+                "status_url": f"/imports/{existing.id}"
+            }), 200
+
+        job = ImportJob(filename=file.filename, content_hash=content_hash, spool_path=spool_path)
+        db.session.add(job)
+        db.session.commit()
+        submit_import_job(job)
+
+        return jsonify({
+            "message": "Import queued",
+            "skipped": False,
+            "job": job.to_dict(),
+            "status_url": f"/imports/{job.id}"
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        if spool_path and os.path.exists(spool_path):
+            os.remove(spool_path)
+        return jsonify({"error": f"Failed to process CSV: {str(e)}"}), 500
+
+@bp.route('/imports', methods=['GET'])
+def list_imports():
+    try:
+        jobs = ImportJob.query.order_by(ImportJob.created_at.desc()).limit(20).all()
+        return jsonify({'imports': [job.to_dict() for job in jobs]})
+    except Exception as e:
+        logger.error(f"Error fetching imports: {str(e)}")
+        return jsonify({'error': 'Failed to fetch imports', 'details': str(e)}), 500
+
+@bp.route('/imports/<job_id>', methods=['GET'])
+def get_import(job_id):
+    try:
+        job = db.session.get(ImportJob, job_id)
+        if not job:
+            return jsonify({"error": "Import not found"}), 404
+        return jsonify({'import': job.to_dict()})
+    except Exception as e:
+        logger.error(f"Error fetching import {job_id}: {str(e)}")
+        return jsonify({'error': 'Failed to fetch import', 'details': str(e)}), 500
+
+@bp.route('/health')
+def health_check():
+    """Health check endpoint to verify application status"""
+    try:
+        # Test database connection (at most once per HEALTH_CHECK_TTL)
+        services.response_cache().versions(max_age=current_app.config['HEALTH_CHECK_TTL'])
+        return jsonify({
+            'status': 'ok',
+            'database': 'connected',
+            'timestamp': datetime.utcnow().strftime('%d-%m-%Y %H:%M:%S')
+        })
+    except Exception as e:
+        logger.error(f"Health check failed: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'database': 'disconnected',
+            'error': str(e)
+        }), 500
+
+def admin_required(view):
+    """Require `Authorization: Bearer <ADMIN_TOKEN>` when ADMIN_TOKEN is set"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config['ADMIN_TOKEN']
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+            return jsonify({"error": "Admin token required"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+@bp.route('/admin/profiling', methods=['GET'])
+@admin_required
+def profiling_status():
+    """Profiler settings and the stored profiles, newest first"""
+    profiler = services.profiler()
+    return jsonify({'profiling': profiler.state(), 'profiles': profiler.profiles()})
+
+@bp.route('/admin/profiling', methods=['POST'])
+@admin_required
+def configure_profiling():
+    """Switch profiling on or off for every process on this host"""
+    try:
+        data = request.get_json() or {}
+        sample_rate = data.get('sample_rate')
+        min_duration = data.get('min_duration')
+        state = services.profiler().configure(
+            enabled=data.get('enabled'),
+            sample_rate=float(sample_rate) if sample_rate is not None else None,
+            min_duration=float(min_duration) if min_duration is not None else None
+        )
+        logger.info(f"Profiling configured: {state}")
+        return jsonify({'profiling': state})
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+@bp.route('/admin/profiling/<name>', methods=['GET'])
+@admin_required
+def download_profile(name):
+    """One stored profile, for `python -m pstats`, snakeviz or flameprof"""
+    if not name.endswith('.pstats'):
+        return jsonify({"error": "Profile not found"}), 404
+    return send_from_directory(services.profiler().directory, name, as_attachment=True)
+
+@bp.route('/reminders', methods=['POST'])
+def create_reminder():
+    try:
+        data = request.json
+        if not all(key in data for key in ['date', 'description', 'email']):
+            return jsonify({'status': 'error', 'message': 'Missing required fields'}), 400
+        
+        reminder = Reminder(
+            date=datetime.fromisoformat(data['date']),
+            description=data['description'],
+            email=data['email']
+        )
+        reminder.schedule_next()
+        db.session.add(reminder)
+        services.bump_table_version('reminder')
+        db.session.commit()
+        
+        return jsonify({
+            'status': 'success',
+            'message': 'Reminder created successfully',
+            'reminder': reminder.to_dict()
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+@bp.route('/delete_reminder/<int:reminder_id>', methods=['DELETE'])
+def delete_reminder(reminder_id):
+    try:
+        reminder = Reminder.query.get_or_404(reminder_id)
+        db.session.delete(reminder)
+        services.bump_table_version('reminder')
+        db.session.commit()
+        return jsonify({"message": "Reminder deleted successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/edit_reminder/<int:reminder_id>', methods=['PUT'])
+def edit_reminder(reminder_id):
+    try:
+        data = request.get_json()
+        reminder = Reminder.query.get(reminder_id)
+        
+        if not reminder:
+            return jsonify({"error": "Reminder not found"}), 404
+
+        # Parse and validate the date
+        try:
+            date_str = data.get('date')
+            reminder.date = parse_date_string(date_str)
+        except:
+            return jsonify({"error": "Invalid date format"}), 400
+
+        # Update other fields
+        reminder.description = data.get('description', reminder.description)
+        reminder.email = data.get('email', reminder.email)
+        reminder.frequency = data.get('frequency', reminder.frequency)
+        # Never back onto an occurrence already sent or dead-lettered;
+        # those are replayed from /dead_letters instead
+        finished = services.deliveries().last_finished(db.session, reminder.id)
+        reminder.schedule_next(after=max(filter(None, (reminder.last_sent, finished)), default=None))
+        services.bump_table_version('reminder')
+
+        db.session.commit()
+        return jsonify({"message": "Reminder updated successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/settings', methods=['GET'])
+def get_settings():
+    try:
+        def build():
+            settings = Settings.query.first()
+            return {
+                'status': 'success',
+                'settings': settings.to_dict() if settings else {
+                    'default_email': '',
+                    'sender_name': ''
+                }
+            }
+        return cached_json('settings', 'settings', build)
+    except Exception as e:
+        logger.error(f"Error fetching settings: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to fetch settings',
+            'error': str(e)
+        }), 500
+
+@bp.route('/settings', methods=['POST'])
+def update_settings():
+    try:
+        data = request.json
+        if not data or 'default_email' not in data or 'sender_name' not in data:
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required fields'
+            }), 400
+
+        settings = Settings.query.first()
+        if not settings:
+            settings = Settings()
+        
+        settings.default_email = data['default_email']
+        settings.sender_name = data['sender_name']
+        
+        db.session.add(settings)
+        services.bump_table_version('settings')
+        db.session.commit()
+        
+        return jsonify({
+            'status': 'success',
+            'message': 'Settings updated successfully',
+            'settings': settings.to_dict()
+        })
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating settings: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to update settings',
+            'error': str(e)
+        }), 500
+
+@bp.route('/email_templates', methods=['GET'])
+def list_email_templates():
+    """Per-recipient email templates"""
+    try:
+        templates = EmailTemplate.query.order_by(EmailTemplate.email, EmailTemplate.name).all()
+        return jsonify([template.to_dict() for template in templates])
+    except Exception as e:
+        logger.error(f"Error listing email templates: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/email_templates/<path:email>/<name>', methods=['PUT'])
+def save_email_template(email, name):
+    """Create or replace a recipient's template; `subject` and `text` are required, `html` optional"""
+    from email_templates import TEMPLATE_NAMES
+    from jinja2 import TemplateError
+    try:
+        if name not in TEMPLATE_NAMES:
+            return jsonify({"error": f"Template name must be one of {', '.join(TEMPLATE_NAMES)}"}), 400
+        data = request.get_json() or {}
+        if not data.get('subject') or not data.get('text'):
+            return jsonify({"error": "subject and text are required"}), 400
+        try:
+            services.email_renderer().compile_user_template(data['subject'], data['text'], data.get('html'))
+        except TemplateError as e:
+            return jsonify({"error": f"Invalid template: {str(e)}"}), 400
+
+        email = email.strip().lower()
+        template = EmailTemplate.query.filter_by(email=email, name=name).first() or EmailTemplate(email=email, name=name)
+        template.subject = data['subject']
+        template.text_body = data['text']
+        template.html_body = data.get('html')
+        db.session.add(template)
+        services.bump_table_version('email_template')
+        db.session.commit()
+        return jsonify(template.to_dict())
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error saving email template: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/email_templates/<path:email>/<name>', methods=['DELETE'])
+def delete_email_template(email, name):
+    try:
+        template = EmailTemplate.query.filter_by(email=email.strip().lower(), name=name).first()
+        if not template:
+            return jsonify({"error": "Template not found"}), 404
+        db.session.delete(template)
+        services.bump_table_version('email_template')
+        db.session.commit()
+        return jsonify({"message": "Template deleted"})
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error deleting email template: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/sample_csv')
+def get_sample_csv():
+    try:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        # Write header
+        writer.writerow(['date', 'description', 'email', 'frequency'])
+        
+        # Write sample row
+        writer.writerow(['25-03-2024', 'Sample Reminder', 'example@email.com', 'once'])
+        
+        return output.getvalue(), 200, {
+            'Content-Type': 'text/csv',
+            'Content-Disposition': 'attachment; filename=sample_reminder.csv'
+        }
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/export', methods=['GET'])
+def export_reminders():
+    """Download reminders as CSV (the default) or NDJSON with `format=ndjson`.
+
+    Rows are streamed in id order in the column layout /upload_csv accepts,
+    so an export can be imported again as it is. Takes the `email`,
+    `frequency`, `date_from` and `date_to` filters of /get_reminders.
+    """
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'ndjson'):
+            return jsonify({'error': 'Invalid format. Use csv or ndjson'}), 400
+        try:
+            criteria = reminder_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        statement = db.select(*serialization.EXPORT_COLUMNS).where(*criteria).order_by(Reminder.id)
+        filename = f"reminders-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
+        return serialization.export_response(statement, export_format, filename)
+    except Exception as e:
+        logger.error(f"Error exporting reminders: {str(e)}")
+        return jsonify({'error': 'Failed to export reminders', 'details': str(e)}), 500
+
+@bp.route('/reset_database', methods=['POST'])
+def reset_database():
+    try:
+        # Simple reset - delete all reminders and the import history so
+        # previously imported files can be uploaded again
+        db.session.query(Reminder).delete()
+        db.session.query(ImportJob).delete()
+        db.session.query(Delivery).delete()
+        db.session.query(DeadLetter).delete()
+        services.bump_table_version('reminder')
+        db.session.commit()
+        return jsonify({"message": "Database reset successful"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+def standardize_date(date_input):
+    """Convert any date format to datetime object"""
+    if isinstance(date_input, datetime):
+        return date_input
+    
+    if isinstance(date_input, str):
+        parsed = parse_date(date_input)
+        if parsed is None:
+            raise ValueError(f"Could not parse date: {date_input}")
+        return parsed
+    
+    raise ValueError("Invalid date input")
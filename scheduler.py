@@ -1,10 +1,127 @@
-from app import app, scheduler
-from flask_sqlalchemy import SQLAlchemy
+"""The reminder scheduler process: `python scheduler.py`.
+
+Web workers never schedule. Every scheduler process joins the leader
+election on the `scheduler_lease` table and only the lease holder runs
+jobs: either polling for due reminders every minute or, with
+SCHEDULER_MODE=timer, sleeping until the next one is due.
+"""
+import atexit
+import logging
+import os
+import time
+
+import requests
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from app import create_app
+from leader import LeaderElection
+from models import db, SchedulerLease
+from reminders import (check_reminders, fire_reminders, load_changed_reminders, load_upcoming_reminders,
+                       reminder_table_version)
+from timer_scheduler import TimerScheduler
+
+logger = logging.getLogger(__name__)
+
+def in_app_context(app, func):
+    """Wrap `func` to run inside an app context, for scheduler threads"""
+    def wrapper(*args, **kwargs):
+        with app.app_context():
+            return func(*args, **kwargs)
+    return wrapper
+
+def keep_alive():
+    """Ping the web service so it does not spin down"""
+    try:
+        server_url = os.environ.get('SERVER_URL', 'https://reminder-app-ojul.onrender.com')
+        response = requests.get(f"{server_url.rstrip('/')}/keep-alive", timeout=10)
+        logger.info(f"Keep-alive ping sent. Status: {response.status_code}")
+    except Exception as e:
+        logger.error(f"Keep-alive ping failed: {str(e)}")
+
+def create_scheduler(app):
+    """Build the paused scheduler, the timer and the leader election that drives them"""
+    reminder_timer = TimerScheduler(
+        in_app_context(app, load_upcoming_reminders),
+        in_app_context(app, fire_reminders),
+        version=in_app_context(app, reminder_table_version),
+        load_changed=in_app_context(app, load_changed_reminders),
+        horizon=app.config['TIMER_HORIZON'],
+        reconcile_interval=app.config['TIMER_RECONCILE_INTERVAL'],
+        poll_interval=app.config['TIMER_POLL_INTERVAL']
+    )
+
+    scheduler = BackgroundScheduler()
+    if app.config['SCHEDULER_MODE'] != 'timer':
+        scheduler.add_job(func=in_app_context(app, check_reminders), trigger="interval", minutes=1,
+                          coalesce=True, max_instances=1)
+    scheduler.add_job(func=keep_alive, trigger="interval", seconds=45, id='secondary_keep_alive')
+    scheduler.start(paused=True)
+
+    def start_scheduling():
+        if app.config['SCHEDULER_MODE'] == 'timer':
+            reminder_timer.start()
+        scheduler.resume()
+
+    def stop_scheduling():
+        scheduler.pause()
+        if reminder_timer.running:
+            reminder_timer.stop()
 
-if __name__ == '__main__':
     with app.app_context():
-        scheduler.start()
-        try:
-            scheduler.run()
-        except (KeyboardInterrupt, SystemExit):
-            scheduler.shutdown() 
\ No newline at end of file
+        scheduler_leader = LeaderElection(
+            db.engine,
+            SchedulerLease.__table__,
+            ttl=app.config['SCHEDULER_LEASE_TTL'],
+            renew_interval=app.config['SCHEDULER_LEASE_RENEW_INTERVAL'],
+            on_elected=start_scheduling,
+            on_demoted=stop_scheduling
+        )
+    return scheduler, scheduler_leader
+
+def status_app(app, scheduler_leader):
+    """WSGI app with this process's `/dispatch/stats` and Prometheus metrics at any other path"""
+    from prometheus_client import make_wsgi_app
+    from werkzeug.wrappers import Request
+
+    import services
+
+    metrics = make_wsgi_app()
+
+    def application(environ, start_response):
+        if Request(environ).path != '/dispatch/stats':
+            return metrics(environ, start_response)
+        with app.app_context():
+            response = app.json.response({
+                **services.dispatcher().stats.to_dict(),
+                'circuit': services.smtp_breaker().to_dict(),
+                'leader': scheduler_leader.is_leader,
+            })
+        return response(environ, start_response)
+
+    return application
+
+def serve_status(app, scheduler_leader, port):
+    """Serve status_app on `port` from a daemon thread"""
+    import threading
+    from werkzeug.serving import make_server
+
+    server = make_server('0.0.0.0', port, status_app(app, scheduler_leader), threaded=True)
+    threading.Thread(target=server.serve_forever, name='status-server', daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    app = create_app()
+    scheduler, scheduler_leader = create_scheduler(app)
+    if app.config['METRICS_PORT']:
+        # Sending only happens here, so its counters and metrics are served
+        # from this process rather than the web's /metrics
+        serve_status(app, scheduler_leader, app.config['METRICS_PORT'])
+    scheduler_leader.start()
+    atexit.register(scheduler_leader.stop)
+    # This process only has to stay alive to hold or take over the lease
+    try:
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        scheduler_leader.stop()
+        scheduler.shutdown()
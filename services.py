@@ -0,0 +1,167 @@
+import atexit
+import functools
+import os
+import sys
+import threading
+
+from flask import current_app
+
+from cache import ResponseCache
+from models import db, EmailTemplate, Delivery, TableVersion
+
+# Re-entrant: building one service may need another (the renderer reads
+# the response cache's table versions)
+_lock = threading.RLock()
+
+def _service(name, build):
+    """The current app's `name` object, built by `build(app)` on first use.
+
+    Keeps web workers from paying for SMTP, templating or thread pools
+    until a request actually needs them.
+    """
+    app = current_app._get_current_object()
+    services = app.extensions.setdefault('reminder_services', {})
+    service = services.get(name)
+    if service is None:
+        with _lock:
+            service = services.get(name)
+            if service is None:
+                service = services[name] = build(app)
+    return service
+
+def response_cache():
+    return _service('response_cache', lambda app: ResponseCache(
+        lambda: dict(db.session.query(TableVersion.name, TableVersion.version).all()),
+        version_ttl=app.config['CACHE_VERSION_TTL'],
+        max_entries=app.config['CACHE_MAX_ENTRIES']
+    ))
+
+def bump_table_version(*names):
+    """Bump table versions in the current transaction, invalidating cached reads"""
+    db.session.execute(
+        TableVersion.__table__.update()
+        .where(TableVersion.name.in_(names))
+        .values(version=TableVersion.version + 1)
+    )
+    response_cache().expire_versions()
+
+def _build_smtp_pool(app):
+    from mailer import SMTPConnectionPool
+    pool = SMTPConnectionPool.from_config(app.config)
+    atexit.register(pool.close)
+    return pool
+
+def smtp_pool():
+    """Shared by the scheduler, request handlers and Celery tasks in this process"""
+    return _service('smtp_pool', _build_smtp_pool)
+
+def load_user_template(email, name):
+    template = EmailTemplate.query.filter_by(email=email, name=name).first()
+    return (template.subject, template.text_body, template.html_body) if template else None
+
+def _build_email_renderer(app):
+    from email_templates import EmailRenderer
+    cache = response_cache()
+    return EmailRenderer(
+        os.path.join(app.root_path, 'templates', 'email'),
+        app.config['SENDER_NAME'],
+        app.config['SENDER_EMAIL'],
+        user_templates=lambda: set(db.session.query(EmailTemplate.email, EmailTemplate.name).all()),
+        load_user_template=load_user_template,
+        user_template_version=lambda: cache.versions().get('email_template'),
+        cache_size=app.config['EMAIL_TEMPLATE_CACHE_SIZE']
+    )
+
+def email_renderer():
+    return _service('email_renderer', _build_email_renderer)
+
+def _build_dispatcher(app):
+    from dispatch import ReminderDispatcher
+    from reminders import send_email
+
+    def send(*args):
+        # Dispatch threads have no app context of their own
+        with app.app_context():
+            return send_email(*args)
+
+    return ReminderDispatcher(
+        send,
+        max_workers=app.config['DISPATCH_MAX_WORKERS'],
+        per_domain_limit=app.config['DISPATCH_PER_DOMAIN_LIMIT']
+    )
+
+def dispatcher():
+    return _service('dispatcher', _build_dispatcher)
+
+def _build_deliveries(app):
+    from delivery import DeliveryLog
+    return DeliveryLog(
+        Delivery.__table__,
+        stale_after=app.config['DELIVERY_CLAIM_TIMEOUT'],
+        max_attempts=app.config['RETRY_MAX_ATTEMPTS'],
+        base_delay=app.config['RETRY_BASE_DELAY'],
+        max_delay=app.config['RETRY_MAX_DELAY']
+    )
+
+def deliveries():
+    return _service('deliveries', _build_deliveries)
+
+def _build_smtp_breaker(app):
+    from dispatch import CircuitBreaker
+    return CircuitBreaker(
+        threshold=app.config['BREAKER_FAILURE_THRESHOLD'],
+        window=app.config['BREAKER_WINDOW'],
+        min_volume=app.config['BREAKER_MIN_VOLUME'],
+        cooldown=app.config['BREAKER_COOLDOWN']
+    )
+
+def smtp_breaker():
+    return _service('smtp_breaker', _build_smtp_breaker)
+
+def _build_import_executor(app):
+    # Only set when gunicorn_config.py has patched for the gevent worker
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('threading'):
+        # Patched threads are greenlets, and an import's SQLite calls never
+        # yield: run it on a native thread so the worker keeps serving
+        from gevent.threadpool import ThreadPoolExecutor
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=app.config['IMPORT_WORKERS'], thread_name_prefix='csv-import')
+
+def import_executor():
+    """Runs imports when no Celery broker is configured"""
+    return _service('import_executor', _build_import_executor)
+
+def _build_celery_client(app):
+    # Sends tasks by name; importing tasks.py would build a second app
+    from celery import Celery
+    return Celery(app.import_name, broker=app.config['CELERY_BROKER_URL'],
+                  backend=app.config['CELERY_RESULT_BACKEND'])
+
+def celery_client():
+    """Producer for tasks run by the Celery workers, when a broker is configured"""
+    return _service('celery_client', _build_celery_client)
+
+def _build_profiler(app):
+    from profiling import Profiler
+    return Profiler(
+        app.config['PROFILE_DIR'],
+        enabled=app.config['PROFILE_ENABLED'],
+        sample_rate=app.config['PROFILE_SAMPLE_RATE'],
+        max_files=app.config['PROFILE_MAX_FILES'],
+        min_duration=app.config['PROFILE_MIN_DURATION']
+    )
+
+def profiler():
+    return _service('profiler', _build_profiler)
+
+def profiled(name):
+    """Decorator: sample calls into the profiler's ring as `name`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler().profile(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,5 +1,9 @@
 from celery import Celery
-from app import app, db, Reminder, send_email
+from app import create_app
+from metrics import FANOUT_BATCHES, REMINDERS_FANNED_OUT
+from models import db, Reminder
+from reminders import run_import_job, send_due_reminders
+from recurrence import is_due
 from datetime import datetime
 import logging
 
@@ -12,6 +16,18 @@ def make_celery(app):
         backend=app.config['CELERY_RESULT_BACKEND']
     )
     celery.conf.update(app.config)
+    # Old-style setting names, since the Flask config above already uses them
+    celery.conf.update(
+        CELERYBEAT_SCHEDULE={
+            'check-reminders': {
+                'task': 'tasks.check_reminders',
+                'schedule': app.config['CELERY_BEAT_INTERVAL']
+            }
+        },
+        CELERY_ROUTES={
+            'tasks.process_reminders_batch': {'queue': app.config['CELERY_REMINDER_QUEUE']}
+        }
+    )
 
     class ContextTask(celery.Task):
         def __call__(self, *args, **kwargs):
@@ -21,81 +37,91 @@ def make_celery(app):
     celery.Task = ContextTask
     return celery
 
+app = create_app()
 celery = make_celery(app)
 
 @celery.task
 def check_reminders():
-    """Check for due reminders and send notifications"""
+    """Enqueue the due reminders in batches of CELERY_REMINDER_BATCH_SIZE IDs.
+
+    Returns the tick's fan-out counts, which are also added to the
+    `reminders_fanned_out` and `reminder_fanout_batches` counters.
+    """
     try:
         now = datetime.utcnow()
-        reminders = Reminder.query.filter(
-            (Reminder.end_date.is_(None) | (Reminder.end_date >= now))
-        ).all()
+        batch_size = app.config['CELERY_REMINDER_BATCH_SIZE']
+        due_count = batches = 0
+        last_fire_at, last_id = None, 0
 
-        for reminder in reminders:
-            process_reminder.delay(reminder.id, now)
+        while True:
+            # Same (next_fire_at, id) keyset walk as the in-process scheduler,
+            # reading IDs straight from the index
+            query = db.session.query(Reminder.id, Reminder.next_fire_at).filter(Reminder.next_fire_at <= now)
+            if last_fire_at is not None:
+                query = query.filter(
+                    (Reminder.next_fire_at > last_fire_at) |
+                    ((Reminder.next_fire_at == last_fire_at) & (Reminder.id > last_id))
+                )
+            rows = query.order_by(Reminder.next_fire_at, Reminder.id).limit(batch_size).all()
+            if not rows:
+                break
+            process_reminders_batch.delay([row.id for row in rows], now.isoformat())
+            due_count += len(rows)
+            batches += 1
+            last_fire_at, last_id = rows[-1].next_fire_at, rows[-1].id
+            if len(rows) < batch_size:
+                break
+
+        REMINDERS_FANNED_OUT.inc(due_count)
+        FANOUT_BATCHES.inc(batches)
+        stats = {'due': due_count, 'batches': batches}
+        logger.info(f"Reminder fan-out: {stats}")
+        return stats
             
     except Exception as e:
         logger.error(f"Error in check_reminders: {str(e)}")
 
+@celery.task
+def process_reminders_batch(reminder_ids, current_time):
+    """Send the reminders in one fan-out batch that are still due"""
+    try:
+        current_time = datetime.fromisoformat(current_time)
+        reminders = Reminder.query.filter(
+            Reminder.id.in_(reminder_ids),
+            Reminder.next_fire_at <= current_time
+        ).order_by(Reminder.id).all()
+        if reminders:
+            send_due_reminders(reminders, current_time)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error processing reminder batch {reminder_ids[:1]}..{reminder_ids[-1:]}: {str(e)}")
+
 @celery.task
 def process_reminder(reminder_id, current_time):
     """Process individual reminder"""
     try:
-        reminder = Reminder.query.get(reminder_id)
+        if isinstance(current_time, str):
+            # The JSON serializer delivers datetimes as ISO strings
+            current_time = datetime.fromisoformat(current_time)
+        reminder = db.session.get(Reminder, reminder_id)
         if not reminder:
             return
 
         should_send = should_send_reminder(reminder, current_time)
         
         if should_send:
-            subject = f"Reminder: {reminder.description}"
-            body = create_reminder_email_body(reminder)
-            
-            if send_email(reminder.email, subject, body):
-                reminder.last_sent = current_time
-                db.session.commit()
-                logger.info(f"Reminder sent for ID: {reminder_id}")
-            else:
-                logger.error(f"Failed to send reminder for ID: {reminder_id}")
+            # Claims the occurrence, so duplicate tasks for it send nothing
+            send_due_reminders([reminder], current_time)
                 
     except Exception as e:
+        db.session.rollback()
         logger.error(f"Error processing reminder {reminder_id}: {str(e)}")
 
+@celery.task
+def import_csv(job_id):
+    """Run a queued CSV import job"""
+    run_import_job(job_id)
+
 def should_send_reminder(reminder, current_time):
     """Determine if reminder should be sent"""
-    if reminder.last_sent is None:
-        return reminder.date <= current_time
-        
-    if reminder.frequency == "once":
-        return reminder.date <= current_time and not reminder.last_sent
-        
-    time_since_last = current_time - reminder.last_sent
-    
-    if reminder.frequency == "daily":
-        return time_since_last.days >= 1
-    elif reminder.frequency == "weekly":
-        return time_since_last.days >= 7
-    elif reminder.frequency == "monthly":
-        next_date = reminder.last_sent.replace(month=reminder.last_sent.month + 1)
-        return current_time >= next_date
-    elif reminder.frequency == "yearly":
-        next_date = reminder.last_sent.replace(year=reminder.last_sent.year + 1)
-        return current_time >= next_date
-        
-    return False
-
-def create_reminder_email_body(reminder):
-    """Create email body for reminder"""
-    return f"""
-    Hello!
-
-    This is your {reminder.frequency} reminder for: {reminder.description}
-    Originally scheduled for: {reminder.date.strftime('%d-%m-%Y %H:%M')}
-
-    Frequency: {reminder.frequency.capitalize()}
-    {f"End Date: {reminder.end_date.strftime('%d-%m-%Y')}" if reminder.end_date else ""}
-
-    Best regards,
-    {app.config['SENDER_NAME']}
-    """ 
\ No newline at end of file
+    return is_due(reminder.next_fire_at, current_time)
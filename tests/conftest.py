@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app on a fresh SQLite database, inside an app context"""
+    # create_app logs to app.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    from app import create_app
+    from config import Config
+    from database import engine_options
+
+    uri = f"sqlite:///{tmp_path / 'test.db'}"
+    app = create_app(type('TestConfig', (Config,), {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options(uri),
+        'IMPORT_SPOOL_DIR': str(tmp_path / 'imports'),
+        'PROFILE_DIR': str(tmp_path / 'profiles'),
+        'CELERY_BROKER_URL': None,
+    }))
+    with app.app_context():
+        yield app
+
+class Outbox:
+    """Stands in for SMTP: records sent messages, failing addresses in `failing`"""
+
+    def __init__(self):
+        self.messages = []
+        self.failing = {}
+
+    def send(self, to_email, subject, *content):
+        if to_email in self.failing:
+            raise self.failing[to_email]
+        self.messages.append((to_email, subject))
+        return True
+
+@pytest.fixture
+def outbox(app):
+    """Route the app's reminder dispatch to an Outbox"""
+    from dispatch import ReminderDispatcher
+
+    outbox = Outbox()
+    dispatcher = ReminderDispatcher(outbox.send)
+    app.extensions.setdefault('reminder_services', {})['dispatcher'] = dispatcher
+    yield outbox
+    dispatcher.shutdown()
+
+@pytest.fixture
+def make_reminder(app):
+    """Add a reminder, due a minute ago unless `next_fire_at` is given"""
+    from datetime import datetime, timedelta
+    from models import db, Reminder
+
+    def make(email='a@example.com', frequency='once', **fields):
+        now = datetime.utcnow()
+        fields.setdefault('date', now - timedelta(days=1))
+        fields.setdefault('next_fire_at', now - timedelta(minutes=1))
+        reminder = Reminder(email=email, frequency=frequency, description=fields.pop('description', 'Test'),
+                            created_at=now, **fields)
+        db.session.add(reminder)
+        db.session.commit()
+        return reminder
+
+    return make
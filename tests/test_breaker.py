@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import dispatch
+from dispatch import CircuitBreaker
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dispatch.time, 'monotonic', clock)
+    return clock
+
+def tripped(cooldown=60):
+    breaker = CircuitBreaker(threshold=0.5, window=10, min_volume=4, cooldown=cooldown)
+    breaker.record(0, 4)
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+def test_opens_at_failure_threshold(clock):
+    breaker = CircuitBreaker(threshold=0.5, window=10, min_volume=4)
+    breaker.record(3, 0)
+    assert breaker.permits(5) == 5
+    breaker.record(0, 3)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.permits(5) == 0
+    assert breaker.trips == 1
+
+def test_half_open_probe_closes_on_success(clock):
+    breaker = tripped()
+    clock.now += 60
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.permits(5) == 1
+    assert breaker.permits(5) == 0
+    breaker.record(1, 0)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.permits(5) == 5
+
+def test_failed_probe_reopens(clock):
+    breaker = tripped()
+    clock.now += 60
+    assert breaker.permits(1) == 1
+    breaker.record(0, 1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+
+def test_asking_for_nothing_reserves_no_probe(clock):
+    breaker = tripped()
+    clock.now += 60
+    assert breaker.permits(0) == 0
+    assert breaker.permits(3) == 1
+
+def test_unreported_probe_expires_after_cooldown(clock):
+    breaker = tripped()
+    clock.now += 60
+    assert breaker.permits(3) == 1
+    clock.now += 30
+    assert breaker.permits(3) == 0
+    assert breaker.retry_after() == 30
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.permits(3) == 1
+
+def test_probe_released_when_claiming_fails(app, outbox, monkeypatch):
+    import services
+    from models import db, Reminder
+    from reminders import send_due_reminders
+
+    now = datetime.utcnow()
+    reminder = Reminder(date=now - timedelta(days=1), description='Probe', email='a@example.com',
+                        frequency='once', created_at=now, next_fire_at=now - timedelta(minutes=1))
+    db.session.add(reminder)
+    db.session.commit()
+
+    breaker = services.smtp_breaker()
+    breaker.record(0, breaker.min_volume)
+    breaker._opened_at -= breaker.cooldown
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    def claim(*args):
+        raise RuntimeError('database went away')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(services.deliveries(), 'claim', claim)
+        with pytest.raises(RuntimeError):
+            send_due_reminders([reminder], now)
+    db.session.rollback()
+
+    # The next batch gets the probe and, once it succeeds, the circuit closes
+    send_due_reminders([db.session.get(Reminder, reminder.id)], now)
+    assert [to_email for to_email, _ in outbox.messages] == ['a@example.com']
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+
+from database import database_url, engine_options
+from models import db
+
+@pytest.mark.parametrize('url, expected', [
+    ('postgres://u:p@host:5432/db', 'postgresql://u:p@host:5432/db'),
+    ('postgresql://u:p@host/db', 'postgresql://u:p@host/db'),
+    ('sqlite:///reminders.db', 'sqlite:///reminders.db'),
+    (None, None),
+])
+def test_database_url_accepts_the_postgres_alias(url, expected):
+    assert database_url(url) == expected
+
+def test_engine_options_size_the_pool_except_in_memory():
+    assert engine_options('sqlite://') == {'pool_pre_ping': True, 'pool_recycle': 1800}
+    options = engine_options('postgresql://host/db', pool_size=8, max_overflow=2, pool_timeout=5, pool_recycle=60)
+    assert options == {'pool_pre_ping': True, 'pool_recycle': 60, 'pool_size': 8, 'max_overflow': 2,
+                       'pool_timeout': 5}
+    # SQLAlchemy's own pool for in-memory databases must still work with them
+    engine = create_engine('sqlite://', **engine_options('sqlite://'))
+    assert isinstance(engine.pool, (SingletonThreadPool, StaticPool))
+
+def test_app_database_runs_in_wal_mode(app):
+    with db.engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == app.config['SQLITE_BUSY_TIMEOUT']
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+
+from dateparse import DateParser, format_day, format_minute, format_timestamp, parse_date
+
+@pytest.mark.parametrize('value, expected', [
+    ('25-03-2024', datetime(2024, 3, 25)),
+    ('25/03/2024', datetime(2024, 3, 25)),
+    ('5-3-24', datetime(2024, 3, 5)),
+    ('25-03-2024 09:30', datetime(2024, 3, 25, 9, 30)),
+    ('2024-03-25', datetime(2024, 3, 25)),
+    ('2024-03-25T09:30:00+02:00', datetime(2024, 3, 25, 7, 30)),
+    ('99-12-31', datetime(1999, 12, 31)),
+    ('25 March 2024', datetime(2024, 3, 25)),
+])
+def test_parses_known_formats(value, expected):
+    assert DateParser().parse(value) == expected
+
+@pytest.mark.parametrize('value', ['01-13-2024', '31-02-2024', '', '   ', 'not a date', None, 20240325])
+def test_rejects_invalid_values(value):
+    assert DateParser().parse(value) is None
+
+def test_ambiguous_values_read_day_first_whatever_came_before():
+    parser = DateParser()
+    assert parser.parse('10-11-12') == datetime(2012, 11, 10)
+    assert parser.parse('99-12-31') == datetime(1999, 12, 31)
+    assert parser.parse('10-11-12') == datetime(2012, 11, 10)
+
+def test_shared_parser_is_deterministic():
+    expected = parse_date('10-11-12')
+    for value in ('99-12-31', '2024-03-25', '25 March 2024', '5-3-24'):
+        parse_date(value)
+        assert parse_date('10-11-12') == expected
+
+def test_formatters_round_trip():
+    assert format_day(datetime(2024, 3, 5, 9, 7)) == '05-03-2024'
+    assert format_minute(datetime(2024, 3, 5, 9, 7)) == '05-03-2024 09:07'
+    assert format_day(None) is None
+    for value in (datetime(2024, 3, 5), datetime(2024, 3, 5, 9, 7), datetime(2024, 3, 5, 9, 7, 3)):
+        assert parse_date(format_timestamp(value)) == value
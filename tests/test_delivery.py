@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from delivery import DEAD, FAILED, SENT, DeliveryLog
+from models import db, Delivery
+
+@pytest.fixture
+def log(app):
+    return DeliveryLog(Delivery.__table__, stale_after=300, max_attempts=3, base_delay=60, max_delay=3600)
+
+def occurrence(minutes=0):
+    return datetime(2026, 3, 1, 8) + timedelta(minutes=minutes)
+
+def test_claim_is_exclusive(log):
+    now = datetime.utcnow()
+    assert log.claim(db.session, [(1, occurrence()), (2, occurrence())], now) == {
+        1: (occurrence(), 1), 2: (occurrence(), 1)}
+    # A second scheduler finds both occurrences already claimed
+    assert log.claim(db.session, [(1, occurrence()), (2, occurrence())], now) == {}
+    assert Delivery.query.count() == 2
+
+def test_racing_insert_claims_only_the_free_rows(log):
+    now = datetime.utcnow()
+    log.claim(db.session, [(1, occurrence())], now)
+    log.finish(db.session, [(1, occurrence(), True, 5.0, None, None)])
+    db.session.commit()
+
+    # Reminder 1 was delivered by someone else since its next_fire_at was read,
+    # so its insert conflicts and falls back to one insert per row
+    claimed = log.claim(db.session, [(1, occurrence()), (2, occurrence())], now)
+    assert claimed == {2: (occurrence(), 1)}
+    assert Delivery.query.filter_by(reminder_id=1).one().status == SENT
+
+def test_stale_claim_is_taken_over(log):
+    now = datetime.utcnow()
+    log.claim(db.session, [(1, occurrence())], now - timedelta(seconds=301))
+    assert log.claim(db.session, [(1, occurrence(5))], now - timedelta(seconds=10)) == {}
+    # The worker that claimed it died: the original occurrence is retried
+    assert log.claim(db.session, [(1, occurrence(5))], now) == {1: (occurrence(), 2)}
+    assert Delivery.query.one().claimed_at == now
+
+def test_failed_delivery_retries_then_dies(log):
+    now = datetime.utcnow()
+    log.claim(db.session, [(1, occurrence())], now)
+    retry_at = log.retry_time(1, now)
+    log.finish(db.session, [(1, occurrence(), False, 5.0, 'OSError: down', retry_at)])
+    db.session.commit()
+
+    assert log.claim(db.session, [(1, occurrence())], now) == {}
+    assert Delivery.query.one().status == FAILED
+    assert log.claim(db.session, [(1, occurrence())], retry_at) == {1: (occurrence(), 2)}
+
+    log.finish(db.session, [(1, occurrence(), False, 5.0, 'OSError: down', None)])
+    db.session.commit()
+    delivery = Delivery.query.one()
+    assert (delivery.status, delivery.error) == (DEAD, 'OSError: down')
+
+def test_retry_time_backs_off_with_jitter(log):
+    now = datetime.utcnow()
+    for attempts, delay in ((1, 60), (2, 120)):
+        wait = (log.retry_time(attempts, now) - now).total_seconds()
+        assert delay / 2 <= wait <= delay
+    assert log.retry_time(3, now) is None
+    capped = DeliveryLog(Delivery.__table__, max_attempts=20, base_delay=60, max_delay=100)
+    assert (capped.retry_time(10, now) - now).total_seconds() <= 100
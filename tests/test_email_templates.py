@@ -0,0 +1,62 @@
+import email
+import os
+
+from email_templates import EmailRenderer
+from reminders import reminder_email
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'email')
+
+def put_template(client, address, **fields):
+    return client.put(f"/email_templates/{address}/reminder", json=fields)
+
+def test_builtin_template_renders_the_reminder(app, make_reminder):
+    subject, text, html = reminder_email(make_reminder(description='Pay rent', frequency='monthly'))
+    assert subject == 'Reminder: Pay rent'
+    assert 'Frequency: Monthly' in text
+    assert 'Pay rent' in html
+
+def test_recipient_template_overrides_until_deleted(app, make_reminder):
+    reminder = make_reminder('Pat@Example.com', description='Pay rent')
+    client = app.test_client()
+    assert put_template(client, 'pat@example.com', subject='Due: {{ reminder.description }}',
+                        text='{{ reminder.description | upper }}').status_code == 200
+
+    assert reminder_email(reminder)[:2] == ('Due: Pay rent', 'PAY RENT')
+    put_template(client, 'pat@example.com', subject='Again: {{ reminder.description }}', text='x')
+    assert reminder_email(reminder)[0] == 'Again: Pay rent'
+
+    client.delete('/email_templates/pat@example.com/reminder')
+    assert reminder_email(reminder)[0] == 'Reminder: Pay rent'
+
+def test_invalid_templates_are_rejected(app):
+    client = app.test_client()
+    assert put_template(client, 'a@example.com', subject='{{ unclosed', text='x').status_code == 400
+    assert put_template(client, 'a@example.com', subject='Hi').status_code == 400
+    assert client.put('/email_templates/a@example.com/other', json={'subject': 'a', 'text': 'b'}).status_code == 400
+
+def test_sandbox_failure_falls_back_to_the_builtin(app, make_reminder):
+    reminder = make_reminder(description='Pay rent')
+    put_template(app.test_client(), reminder.email, subject="{{ reminder.__class__.__mro__ }}", text='x')
+    assert reminder_email(reminder)[0] == 'Reminder: Pay rent'
+
+def test_html_templates_escape_reminder_text(app, make_reminder):
+    reminder = make_reminder(description='<script>alert(1)</script>')
+    put_template(app.test_client(), reminder.email, subject='s', text='t', html='<p>{{ reminder.description }}</p>')
+    assert reminder_email(reminder).html == '<p>&lt;script&gt;alert(1)&lt;/script&gt;</p>'
+
+def test_built_message_headers_cannot_be_injected():
+    renderer = EmailRenderer(TEMPLATE_DIR, 'Réminders', 'app@example.com')
+    rendered = renderer.render('reminder', {'reminder': {
+        'description': 'Hi\r\nBcc: victim@example.com', 'frequency': 'once', 'date': '01-01-2026 09:00'}})
+    message = email.message_from_bytes(renderer.build('to@example.com', rendered))
+
+    assert message['Bcc'] is None
+    assert 'Bcc: victim@example.com' in str(email.header.make_header(email.header.decode_header(message['Subject'])))
+    assert message['To'] == 'to@example.com'
+    assert message.get_content_type() == 'multipart/alternative'
+    assert message['Message-ID'].endswith('@example.com>')
+
+def test_renderer_starts_without_a_sender_email():
+    renderer = EmailRenderer(TEMPLATE_DIR, 'Reminders', None)
+    rendered = renderer.render('digest', {'reminders': []})
+    assert renderer.build('to@example.com', rendered).startswith(b'From: Reminders')
@@ -0,0 +1,54 @@
+from models import db, TableVersion
+
+def get(client, path, etag=None):
+    return client.get(path, headers={'If-None-Match': etag} if etag else {})
+
+def test_unchanged_listing_is_not_modified(app, make_reminder):
+    make_reminder()
+    client = app.test_client()
+    first = get(client, '/get_reminders')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    again = get(client, '/get_reminders', first.headers['ETag'])
+    assert (again.status_code, again.data) == (304, b'')
+    assert again.headers['ETag'] == first.headers['ETag']
+    # Same table version, different query: a different ETag
+    assert get(client, '/get_reminders/count').headers['ETag'] != first.headers['ETag']
+
+def test_writes_change_the_etag(app):
+    client = app.test_client()
+    etag = get(client, '/get_reminders').headers['ETag']
+    client.post('/add_reminder', json={'date': '01-05-2026', 'description': 'New', 'email': 'a@example.com'})
+
+    response = get(client, '/get_reminders', etag)
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert [reminder['description'] for reminder in response.get_json()['reminders']] == ['New']
+
+def test_settings_etag_follows_settings_writes(app):
+    client = app.test_client()
+    etag = get(client, '/settings').headers['ETag']
+    assert get(client, '/settings', etag).status_code == 304
+    client.post('/settings', json={'default_email': 'me@example.com', 'sender_name': 'Me'})
+    response = get(client, '/settings', etag)
+    assert response.status_code == 200
+    assert response.get_json()['settings']['sender_name'] == 'Me'
+
+def test_other_processes_writes_show_after_the_version_ttl(app, make_reminder):
+    import services
+
+    services.response_cache().version_ttl = 60
+    client = app.test_client()
+    etag = get(client, '/get_reminders').headers['ETag']
+    # Another process writes a reminder and bumps the version in the database
+    make_reminder()
+    db.session.execute(TableVersion.__table__.update().where(TableVersion.name == 'reminder')
+                       .values(version=TableVersion.version + 1))
+    db.session.commit()
+    assert get(client, '/get_reminders', etag).status_code == 304
+
+    services.response_cache().expire_versions()  # as if CACHE_VERSION_TTL had passed
+    response = get(client, '/get_reminders', etag)
+    assert response.status_code == 200
+    assert len(response.get_json()['reminders']) == 1
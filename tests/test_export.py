@@ -0,0 +1,67 @@
+import io
+import json
+import time
+from datetime import datetime, timedelta
+
+from models import db, Reminder
+
+def export(client, export_format='csv', query=''):
+    response = client.get(f"/export?format={export_format}{query}", buffered=False)
+    assert response.status_code == 200
+    body = b''.join(response.response)
+    response.close()
+    return response, body
+
+def restore(client, body):
+    client.post('/reset_database')
+    response = client.post('/upload_csv', data={'file': (io.BytesIO(body), 'backup.csv')},
+                           content_type='multipart/form-data')
+    status_url = response.get_json()['status_url']
+    for _ in range(200):
+        job = client.get(status_url).get_json()['import']
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('import did not finish')
+
+def test_csv_export_round_trips_with_its_schedule(app, make_reminder):
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    sent = now - timedelta(days=10)
+    make_reminder('once@example.com', date=sent, last_sent=sent, next_fire_at=None)
+    make_reminder('daily@example.com', frequency='daily', date=now - timedelta(days=30, hours=2),
+                  last_sent=now - timedelta(hours=2), next_fire_at=now + timedelta(hours=22))
+    make_reminder('later@example.com', date=now + timedelta(days=3), next_fire_at=now + timedelta(days=3))
+    client = app.test_client()
+
+    response, backup = export(client)
+    assert response.mimetype == 'text/csv'
+    assert 'attachment; filename=reminders-' in response.headers['Content-Disposition']
+    assert backup.splitlines()[0] == b'date,description,email,frequency,end_date,last_sent,next_fire_at'
+
+    job = restore(client, backup)
+    assert (job['status'], job['rows_inserted']) == ('completed', 3)
+    # Nothing that had already gone out is due again
+    assert Reminder.query.filter(Reminder.next_fire_at <= datetime.utcnow()).count() == 0
+    assert db.session.execute(db.select(Reminder.email, Reminder.last_sent).order_by(Reminder.id)).all() == [
+        ('once@example.com', sent), ('daily@example.com', now - timedelta(hours=2)), ('later@example.com', None)]
+    assert export(client)[1] == backup
+
+def test_csv_without_schedule_columns_is_scheduled_from_its_dates(app):
+    client = app.test_client()
+    job = restore(client, b'date,description,email,frequency\n01-01-2020 09:00,Rent,a@example.com,once\n')
+    assert job['rows_inserted'] == 1
+    assert Reminder.query.one().next_fire_at == datetime(2020, 1, 1, 9)
+
+def test_ndjson_export_is_filtered_one_reminder_per_line(app, make_reminder):
+    make_reminder('a@example.com', date=datetime(2026, 1, 5, 8, 30), next_fire_at=datetime(2026, 1, 5, 8, 30))
+    make_reminder('b@example.com')
+
+    response, body = export(app.test_client(), 'ndjson', '&email=a@example.com')
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line) for line in body.splitlines()] == [{
+        'date': '05-01-2026 08:30', 'description': 'Test', 'email': 'a@example.com', 'frequency': 'once',
+        'end_date': None, 'last_sent': None, 'next_fire_at': '05-01-2026 08:30'}]
+
+def test_export_rejects_unknown_formats(app):
+    assert app.test_client().get('/export?format=xml').status_code == 400
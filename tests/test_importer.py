@@ -0,0 +1,64 @@
+import io
+
+import pytest
+from sqlalchemy import (CheckConstraint, Column, DateTime, Integer, MetaData, String, Table, create_engine,
+                        event, func, select)
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from importer import CSVImporter
+from recurrence import next_fire_times
+
+@pytest.fixture
+def table():
+    # Stands in for a database that enforces String(500), which SQLite does not
+    metadata = MetaData()
+    table = Table(
+        'reminder', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('date', DateTime, nullable=False),
+        Column('description', String(20), CheckConstraint('length(description) <= 20'), nullable=False),
+        Column('email', String(120), nullable=False),
+        Column('frequency', String(20), nullable=False),
+        Column('created_at', DateTime),
+        Column('end_date', DateTime),
+        Column('next_fire_at', DateTime),
+    )
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session, table
+
+def run(session, table, body, chunk_size=5000):
+    importer = CSVImporter(session, table, next_fire_times, chunk_size=chunk_size)
+    return importer.run(io.BytesIO(body.encode()))
+
+def test_rows_are_parsed_and_inserted(table):
+    session, reminders = table
+    stats = run(session, reminders, 'date,description,email,frequency\n'
+                                    '25-03-2024,Pay rent, A@Example.com ,Monthly\n'
+                                    'someday,Call,b@example.com,once\n')
+    assert (stats.rows_parsed, stats.rows_inserted, stats.rows_rejected) == (2, 1, 1)
+    assert stats.errors == ['Line 3: Invalid date format: someday']
+    assert session.execute(select(reminders.c.email, reminders.c.frequency)).one() == ('a@example.com', 'monthly')
+
+def test_rejected_rows_do_not_reject_their_chunk(table):
+    session, reminders = table
+    lines = [f"25-03-2024,{'x' * 30 if i in (3, 17) else f'Row {i}'},a@example.com,daily" for i in range(40)]
+    stats = run(session, reminders, 'date,description,email,frequency\n' + '\n'.join(lines) + '\n', chunk_size=25)
+
+    assert (stats.rows_inserted, stats.rows_rejected) == (38, 2)
+    assert [error.split(':')[0] for error in stats.errors] == ['Line 5', 'Line 19']
+    assert 'CHECK constraint failed' in stats.errors[0]
+    assert session.execute(select(func.count()).select_from(reminders)).scalar() == 38
+
+def test_database_errors_fail_the_import(table):
+    session, reminders = table
+    reminders.drop(session.connection())
+    session.commit()
+    statements = []
+    event.listen(session.get_bind(), 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    with pytest.raises(OperationalError):
+        run(session, reminders, 'date,description,email,frequency\n' + '25-03-2024,Row,a@example.com,daily\n' * 50)
+    assert len(statements) == 1
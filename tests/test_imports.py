@@ -0,0 +1,91 @@
+import io
+import sys
+import time
+from datetime import datetime, timedelta
+
+import reminders
+import services
+from models import db, ImportJob, ImportUploadChunk, Reminder
+from reminders import run_import_job
+
+CSV = b"date,description,email,frequency\n25-03-2024,Pay rent,a@example.com,monthly\n26-03-2024,Call,b@example.com,once\n"
+
+def upload(client, content=CSV):
+    return client.post('/upload_csv', data={'file': (io.BytesIO(content), 'reminders.csv')},
+                       content_type='multipart/form-data')
+
+def wait_for(client, status_url):
+    for _ in range(200):
+        job = client.get(status_url).get_json()['import']
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('import did not finish')
+
+def test_upload_imports_in_the_background(app):
+    client = app.test_client()
+    response = upload(client)
+    assert response.status_code == 202
+    job = wait_for(client, response.get_json()['status_url'])
+    assert job['status'] == 'completed'
+    assert job['rows_inserted'] == 2
+    assert Reminder.query.count() == 2
+
+def test_same_file_is_not_imported_twice(app):
+    client = app.test_client()
+    wait_for(client, upload(client).get_json()['status_url'])
+    response = upload(client)
+    assert response.status_code == 200
+    assert response.get_json()['skipped'] is True
+    assert Reminder.query.count() == 2
+
+def test_abandoned_job_does_not_block_reupload(app):
+    import hashlib
+    stuck = ImportJob(filename='reminders.csv', content_hash=hashlib.sha256(CSV).hexdigest(),
+                      spool_path='/nonexistent.csv', status='running')
+    db.session.add(stuck)
+    db.session.commit()
+    client = app.test_client()
+    assert upload(client).get_json()['skipped'] is True
+
+    # Direct UPDATE, since the ORM would stamp updated_at with the current time
+    db.session.execute(ImportJob.__table__.update().where(ImportJob.id == stuck.id).values(
+        updated_at=datetime.utcnow() - timedelta(seconds=app.config['IMPORT_STALE_AFTER'] + 1)))
+    db.session.commit()
+    response = upload(client)
+    assert response.status_code == 202
+    assert wait_for(client, response.get_json()['status_url'])['status'] == 'completed'
+    db.session.refresh(stuck)
+    assert stuck.status == 'failed'
+
+class FakeCelery:
+    def __init__(self):
+        self.sent = []
+
+    def send_task(self, name, args):
+        self.sent.append((name, args))
+
+def test_celery_imports_read_the_upload_from_the_database(app, tmp_path, monkeypatch):
+    celery = FakeCelery()
+    app.config['CELERY_BROKER_URL'] = 'redis://broker'
+    monkeypatch.setattr(services, 'celery_client', lambda: celery)
+    monkeypatch.setattr(reminders, 'UPLOAD_CHUNK_BYTES', 16)
+    modules_before = set(sys.modules)
+
+    response = upload(app.test_client())
+    assert response.status_code == 202
+    job_id = response.get_json()['job']['id']
+    assert celery.sent == [('tasks.import_csv', [job_id])]
+    assert 'tasks' not in set(sys.modules) - modules_before
+    job = db.session.get(ImportJob, job_id)
+    assert job.spool_path is None
+    assert ImportUploadChunk.query.filter_by(job_id=job_id).count() == -(-len(CSV) // 16)
+
+    # The worker has its own spool directory
+    app.config['IMPORT_SPOOL_DIR'] = str(tmp_path / 'worker')
+    db.session.remove()
+    run_import_job(job_id)
+    job = db.session.get(ImportJob, job_id)
+    assert job.status == 'completed'
+    assert job.rows_inserted == 2
+    assert ImportUploadChunk.query.count() == 0
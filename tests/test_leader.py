@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from leader import LeaderElection
+from models import db, SchedulerLease
+
+@pytest.fixture
+def candidate(app):
+    def make(**options):
+        return LeaderElection(db.engine, SchedulerLease.__table__, **options)
+    return make
+
+def test_only_one_candidate_holds_the_lease(candidate):
+    first, second = candidate(), candidate()
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+def test_follower_takes_over_an_expired_lease(candidate):
+    first, second = candidate(ttl=0.1), candidate(ttl=0.1)
+    assert first.try_acquire()
+    time.sleep(0.15)
+    assert second.try_acquire()
+    # The old holder finds the lease taken and cannot renew it
+    assert not first.try_acquire()
+
+def test_stopping_hands_over_immediately(candidate):
+    events = []
+    elected = threading.Event()
+
+    def on_elected():
+        events.append('elected')
+        elected.set()
+
+    first = candidate(ttl=30, renew_interval=0.01, on_elected=on_elected,
+                      on_demoted=lambda: events.append('demoted'))
+    first.start()
+    assert elected.wait(2)
+    assert not candidate().try_acquire()
+
+    first.stop()
+    assert events == ['elected', 'demoted']
+    assert candidate().try_acquire()
+
+def test_database_errors_demote_the_leader(candidate, monkeypatch):
+    leader = candidate(renew_interval=0.01)
+    leader._set_leader(leader.try_acquire())
+
+    def fail():
+        raise RuntimeError('database unreachable')
+
+    monkeypatch.setattr(leader, 'try_acquire', fail)
+    leader.start()
+    time.sleep(0.05)
+    leader.stop()
+    assert not leader.is_leader
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+
+import pytest
+
+@pytest.fixture
+def reminders(app, make_reminder):
+    """Five reminders; two share a date so date order falls back to id"""
+    dates = [datetime(2026, 3, day) for day in (5, 1, 3, 3, 2)]
+    emails = ['a@example.com', 'b@example.com', 'a@example.com', 'a@example.com', 'b@example.com']
+    frequencies = ['once', 'daily', 'weekly', 'daily', 'once']
+    return [make_reminder(email, frequency, date=date, description=f"R{i}").id
+            for i, (date, email, frequency) in enumerate(zip(dates, emails, frequencies))]
+
+def walk(client, query):
+    """IDs of every page of `query`, following next_after_id"""
+    pages, after = [], ''
+    while True:
+        page = client.get(f"/get_reminders?{query}{after}").get_json()
+        pages.append([reminder['id'] for reminder in page['reminders']])
+        if not page['has_more']:
+            assert page['next_after_id'] is None
+            return pages
+        after = f"&after_id={page['next_after_id']}"
+
+def test_pages_follow_the_keyset_cursor(app, reminders):
+    client = app.test_client()
+    assert walk(client, 'limit=2') == [reminders[0:2], reminders[2:4], reminders[4:]]
+
+def test_date_order_breaks_ties_by_id(app, reminders):
+    client = app.test_client()
+    by_date = [reminders[i] for i in (1, 4, 2, 3, 0)]
+    assert walk(client, 'sort=date&limit=2') == [by_date[0:2], by_date[2:4], by_date[4:]]
+
+def test_filters_and_count_agree(app, reminders):
+    client = app.test_client()
+    query = 'email=A@Example.com&frequency=daily&date_from=02-03-2026'
+    page = client.get(f"/get_reminders?{query}").get_json()
+    assert [reminder['id'] for reminder in page['reminders']] == [reminders[3]]
+    assert page['reminders'][0]['date'] == '03-03-2026'
+    assert client.get(f"/get_reminders/count?{query}").get_json() == {'count': 1}
+    assert client.get('/get_reminders/count?date_to=03-03-2026').get_json() == {'count': 4}
+
+@pytest.mark.parametrize('query', ['sort=email', 'limit=0', 'sort=date&after_id=999', 'date_from=someday'])
+def test_bad_arguments_are_rejected(app, reminders, query):
+    assert app.test_client().get(f"/get_reminders?{query}").status_code == 400
+
+def ndjson(client, query):
+    response = client.get(f"/get_reminders?format=ndjson{query}", buffered=False)
+    assert (response.status_code, response.mimetype) == (200, 'application/x-ndjson')
+    body = b''.join(response.response)
+    response.close()
+    return [json.loads(line) for line in body.splitlines()]
+
+def test_ndjson_streams_every_match_one_per_line(app, reminders):
+    app.config['STREAM_CHUNK_SIZE'] = 2
+    client = app.test_client()
+    lines = ndjson(client, '&email=a@example.com')
+    assert [line['id'] for line in lines] == [reminders[0], reminders[2], reminders[3]]
+    # Each line is the item /get_reminders pages return
+    assert lines[0] == client.get("/get_reminders?limit=1").get_json()['reminders'][0]
+    assert [line['id'] for line in ndjson(client, f"&after_id={reminders[1]}&limit=2")] == reminders[2:4]
+
+def test_ndjson_rejects_a_bad_limit(app, reminders):
+    assert app.test_client().get('/get_reminders?format=ndjson&limit=0').status_code == 400
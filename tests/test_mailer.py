@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from benchmarks.smtp_sink import SMTPSink
+from mailer import SMTPConnectionPool
+
+MESSAGE = 'Subject: Test\r\n\r\nHello'
+
+@pytest.fixture
+def sink():
+    with SMTPSink() as sink:
+        yield sink
+
+def make_pool(sink, **options):
+    return SMTPConnectionPool(sink.host, sink.port, use_tls=False, **options)
+
+def send(pool, count=1):
+    for _ in range(count):
+        pool.sendmail('from@example.com', ['to@example.com'], MESSAGE)
+
+def wait_for_messages(sink, count):
+    # The sink counts a message just before replying to it
+    for _ in range(100):
+        if sink.messages >= count:
+            return
+        time.sleep(0.01)
+
+def test_connection_is_reused(sink):
+    pool = make_pool(sink)
+    send(pool, 5)
+    assert (sink.connections, sink.messages) == (1, 5)
+    pool.close()
+
+def test_reconnects_when_the_server_drops_the_connection(sink):
+    sink.close_after = 2
+    pool = make_pool(sink)
+    send(pool, 3)
+    wait_for_messages(sink, 3)
+    assert (sink.connections, sink.messages) == (2, 3)
+    pool.close()
+
+def test_connection_recycled_after_max_messages(sink):
+    pool = make_pool(sink, max_messages=2)
+    send(pool, 5)
+    assert (sink.connections, sink.messages) == (3, 5)
+    pool.close()
+
+def test_idle_connection_is_evicted(sink):
+    pool = make_pool(sink, idle_timeout=0.05)
+    send(pool)
+    time.sleep(0.1)
+    send(pool)
+    assert sink.connections == 2
+    assert len(pool._idle) == 1
+    pool.close()
+
+def test_forked_child_opens_its_own_connections(sink):
+    pool = make_pool(sink)
+    send(pool)
+    inherited = pool._idle[0]
+    pool._pid = -1  # as if this were a child forked after the send
+
+    send(pool)
+    assert sink.connections == 2
+    assert inherited not in pool._idle
+    # The parent's socket is left for the parent, not closed by the child
+    assert inherited.server.sock is not None
+    inherited.server.close()
+    pool.close()
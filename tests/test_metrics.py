@@ -0,0 +1,16 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from metrics import instrument_engine
+
+def test_failing_statements_do_not_leak_timers():
+    engine = create_engine('sqlite://')
+    instrument_engine(engine)
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM missing'))
+        assert conn.info['query_start'] == []
+        assert conn.execute(text('SELECT 1')).scalar() == 1
+        assert conn.info['query_start'] == []
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+from models import db
+
+# The schema before versioned migrations: no next_fire_at, no tables added since
+PRE_MIGRATIONS = (
+    'CREATE TABLE settings (id INTEGER PRIMARY KEY, default_email VARCHAR(120) NOT NULL, '
+    'sender_name VARCHAR(120) NOT NULL)',
+    'CREATE TABLE reminder (id INTEGER PRIMARY KEY, date DATETIME NOT NULL, description VARCHAR(500) NOT NULL, '
+    'email VARCHAR(120) NOT NULL, frequency VARCHAR(50), created_at DATETIME, last_sent DATETIME, end_date DATETIME)',
+    "INSERT INTO reminder (date, description, email, frequency, created_at, last_sent) VALUES "
+    "('2020-01-15 09:00:00.000000', 'Rent', ' Ann@Example.com', 'monthly', '2020-01-01 00:00:00.000000', "
+    "'2020-03-15 09:00:00.000000'), "
+    "('2099-01-01 09:00:00.000000', 'Future', 'b@example.com', 'once', '2020-01-01 00:00:00.000000', NULL)",
+)
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in PRE_MIGRATIONS:
+            conn.exec_driver_sql(statement)
+    yield engine
+    engine.dispose()
+
+def columns(engine, table):
+    return {column['name'] for column in inspect(engine).get_columns(table)}
+
+def test_upgrade_keeps_and_schedules_existing_reminders(engine):
+    assert migrations.upgrade(engine) == [1, 2, 3, 4, 5]
+
+    with engine.connect() as conn:
+        rows = conn.execute(text('SELECT description, email, next_fire_at FROM reminder ORDER BY id')).all()
+    assert [(description, email, str(fire_at)) for description, email, fire_at in rows] == [
+        ('Rent', 'ann@example.com', '2020-04-15 09:00:00.000000'),
+        ('Future', 'b@example.com', '2099-01-01 09:00:00.000000')]
+    assert migrations.upgrade(engine) == []
+
+def test_upgraded_schema_matches_the_models(engine, tmp_path):
+    fresh = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    migrations.upgrade(engine)
+    migrations.upgrade(fresh)
+    for table in db.metadata.sorted_tables:
+        expected = {column.name for column in table.columns}
+        assert columns(engine, table.name) == expected
+        assert columns(fresh, table.name) == expected
+        indexes = {index.name for index in table.indexes}
+        assert indexes <= {index['name'] for index in inspect(engine).get_indexes(table.name)}
+    fresh.dispose()
+
+def test_failed_migration_leaves_no_trace(engine, monkeypatch):
+    def fail(conn):
+        raise RuntimeError('backfill failed')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(migrations, '_backfill_next_fire_at', fail)
+        with pytest.raises(RuntimeError):
+            migrations.upgrade(engine)
+    assert 'next_fire_at' not in columns(engine, 'reminder')
+    assert not inspect(engine).has_table('delivery')
+
+    # The next boot runs the baseline, backfill included, from the start
+    assert migrations.upgrade(engine) == [1, 2, 3, 4, 5]
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM reminder WHERE next_fire_at IS NULL')).scalar() == 0
+
+def test_app_boots_on_a_pre_migration_database(engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from app import create_app
+    from config import Config
+    from database import engine_options
+    from models import Reminder
+
+    uri = str(engine.url)
+    app = create_app(type('TestConfig', (Config,), {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options(uri),
+        'CELERY_BROKER_URL': None,
+    }))
+    with app.app_context():
+        assert Reminder.query.filter(Reminder.next_fire_at <= datetime(2021, 1, 1)).count() == 1
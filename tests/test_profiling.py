@@ -0,0 +1,92 @@
+import os
+import re
+import time
+
+import pytest
+
+from profiling import CONTROL_FILE, Profiler
+
+@pytest.fixture
+def profiler(tmp_path):
+    return Profiler(str(tmp_path / 'profiles'), enabled=True, sample_rate=1, reload_interval=0)
+
+def work(seconds=0):
+    time.sleep(seconds)
+    return sum(range(1000))
+
+def test_sampled_blocks_are_saved(profiler):
+    with profiler.profile('tick'):
+        work()
+    [name] = profiler.profiles()
+    assert re.fullmatch(r'tick-\d{8}T\d{12}-\d+-\d+ms\.pstats', name)
+
+def test_nothing_is_saved_unless_sampled(profiler):
+    profiler.configure(sample_rate=0)
+    with profiler.profile('tick'):
+        work()
+    profiler.configure(enabled=False, sample_rate=1)
+    with profiler.profile('tick'):
+        work()
+    assert profiler.profiles() == []
+
+def test_fast_blocks_are_dropped(profiler):
+    profiler.configure(min_duration=0.05)
+    with profiler.profile('fast'):
+        work()
+    with profiler.profile('slow'):
+        work(0.06)
+    assert [name.split('-')[0] for name in profiler.profiles()] == ['slow']
+
+def test_nested_blocks_are_part_of_the_outer_profile(profiler):
+    with profiler.profile('outer'):
+        with profiler.profile('inner'):
+            work()
+    assert [name.split('-')[0] for name in profiler.profiles()] == ['outer']
+
+def test_only_the_newest_profiles_are_kept(profiler):
+    profiler.max_files = 2
+    for i in range(4):
+        with profiler.profile(f"tick{i}"):
+            work()
+        # Profiles are ordered by mtime
+        time.sleep(0.01)
+    assert [name.split('-')[0] for name in profiler.profiles()] == ['tick3', 'tick2']
+
+def test_configure_reaches_other_processes(profiler):
+    other = Profiler(profiler.directory, reload_interval=0)
+    profiler.configure(enabled=True, sample_rate=0.5, min_duration=0.2)
+    assert os.path.exists(os.path.join(profiler.directory, CONTROL_FILE))
+
+    with other.profile('tick'):
+        pass
+    state = other.state()
+    assert (state['enabled'], state['sample_rate'], state['min_duration']) == (True, 0.5, 0.2)
+
+def test_sample_rate_must_be_a_probability(profiler):
+    with pytest.raises(ValueError):
+        profiler.configure(sample_rate=2)
+    assert profiler.state()['sample_rate'] == 1
+
+def test_admin_routes_switch_and_serve_profiles(app):
+    from services import profiler
+
+    client = app.test_client()
+    response = client.post('/admin/profiling', json={'enabled': True, 'sample_rate': 1})
+    assert response.get_json()['profiling']['enabled'] is True
+    assert client.post('/admin/profiling', json={'sample_rate': 'often'}).status_code == 400
+
+    with profiler().profile('route'):
+        work()
+    [name] = client.get('/admin/profiling').get_json()['profiles']
+    response = client.get(f"/admin/profiling/{name}")
+    assert response.status_code == 200
+    assert 'attachment' in response.headers['Content-Disposition']
+    response.close()
+    assert client.get('/admin/profiling/missing.pstats').status_code == 404
+    assert client.get(f"/admin/profiling/{CONTROL_FILE}").status_code == 404
+
+def test_admin_routes_require_the_token(app):
+    app.config['ADMIN_TOKEN'] = 'secret'
+    client = app.test_client()
+    assert client.get('/admin/profiling').status_code == 401
+    assert client.get('/admin/profiling', headers={'Authorization': 'Bearer secret'}).status_code == 200
@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from recurrence import FrequencyType, add_months, next_fire_time, next_fire_times, occurrences
+
+def test_month_end_clamps_and_returns():
+    anchor = datetime(2024, 1, 31, 9)
+    assert add_months(anchor, 1) == datetime(2024, 2, 29, 9)
+    assert add_months(anchor, 13) == datetime(2025, 2, 28, 9)
+    assert occurrences(anchor, 'monthly', after=anchor, count=3) == [
+        datetime(2024, 2, 29, 9), datetime(2024, 3, 31, 9), datetime(2024, 4, 30, 9)]
+
+def test_december_rolls_over_to_january():
+    assert add_months(datetime(2025, 12, 15), 1) == datetime(2026, 1, 15)
+    assert next_fire_time(datetime(2025, 12, 15), 'monthly', after=datetime(2025, 12, 20)) == datetime(2026, 1, 15)
+
+@pytest.mark.parametrize('frequency, expected', [
+    ('daily', datetime(2026, 3, 11, 8)),
+    ('weekly', datetime(2026, 3, 15, 8)),
+    ('monthly', datetime(2026, 4, 1, 8)),
+    ('yearly', datetime(2027, 3, 1, 8)),
+])
+def test_next_fire_time_is_strictly_after(frequency, expected):
+    assert next_fire_time(datetime(2026, 3, 1, 8), frequency, after=datetime(2026, 3, 10, 8)) == expected
+
+def test_leap_day_yearly():
+    anchor = datetime(2024, 2, 29)
+    assert next_fire_time(anchor, 'yearly', after=anchor) == datetime(2025, 2, 28)
+    assert next_fire_time(anchor, 'yearly', after=datetime(2027, 3, 1)) == datetime(2028, 2, 29)
+
+def test_once_fires_only_before_its_date():
+    anchor = datetime(2026, 3, 1, 8)
+    assert next_fire_time(anchor, 'once', after=datetime(2026, 2, 1)) == anchor
+    assert next_fire_time(anchor, 'once', after=anchor) is None
+
+def test_end_date_is_inclusive_of_the_day():
+    anchor = datetime(2026, 3, 1, 8)
+    assert next_fire_time(anchor, 'daily', datetime(2026, 3, 5), after=datetime(2026, 3, 4, 9)) == datetime(2026, 3, 5, 8)
+    assert next_fire_time(anchor, 'daily', datetime(2026, 3, 5), after=datetime(2026, 3, 5, 9)) is None
+
+def test_vectorized_matches_scalar():
+    rng = random.Random(7)
+    frequencies = [f.value for f in FrequencyType]
+    dates = [datetime(2020, 1, 31) + timedelta(days=rng.randint(0, 2500), minutes=rng.randint(0, 1439))
+             for _ in range(2000)]
+    freqs = [rng.choice(frequencies) for _ in dates]
+    end_dates = [None if rng.random() < 0.5 else d + timedelta(days=rng.randint(0, 900)) for d in dates]
+    after = datetime(2024, 2, 29, 12)
+
+    expected = [next_fire_time(d, f, e, after=after) for d, f, e in zip(dates, freqs, end_dates)]
+    assert next_fire_times(dates, freqs, end_dates, after=after) == expected
+    assert next_fire_times(dates, freqs) == dates
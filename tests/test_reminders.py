@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from models import db, DeadLetter, Delivery
+from reminders import send_due_reminders
+
+def test_failed_send_records_the_smtp_error(app, outbox, make_reminder):
+    app.config['RETRY_MAX_ATTEMPTS'] = 1
+    reminder = make_reminder('down@example.com')
+    outbox.failing['down@example.com'] = ConnectionRefusedError(111, 'Connection refused')
+
+    scheduled, failed = send_due_reminders([reminder], datetime.utcnow())
+
+    assert failed == [reminder.id]
+    delivery = Delivery.query.filter_by(reminder_id=reminder.id).one()
+    letter = DeadLetter.query.filter_by(reminder_id=reminder.id).one()
+    assert delivery.status == 'dead'
+    assert delivery.error == 'ConnectionRefusedError: [Errno 111] Connection refused'
+    assert letter.error == delivery.error
+
+def test_sent_reminder_moves_on(app, outbox, make_reminder):
+    reminder = make_reminder('ok@example.com', frequency='daily')
+    due_at = reminder.next_fire_at
+
+    scheduled, failed = send_due_reminders([reminder], datetime.utcnow())
+
+    assert failed == []
+    assert [to_email for to_email, _ in outbox.messages] == ['ok@example.com']
+    assert Delivery.query.filter_by(reminder_id=reminder.id).one().status == 'sent'
+    db.session.refresh(reminder)
+    assert reminder.next_fire_at > due_at
+
+def test_digest_collects_reminders_whatever_the_casing(app, outbox, make_reminder):
+    app.config['DIGEST_MODE'] = True
+    app.config['DIGEST_WINDOW'] = 0
+    first = make_reminder('Pat@Example.com', description='One')
+    second = make_reminder(' pat@example.com', description='Two')
+    # Stored normalised, so the digest finds both on the email index
+    assert first.email == second.email == 'pat@example.com'
+
+    scheduled, failed = send_due_reminders([first], datetime.utcnow())
+
+    assert failed == []
+    assert len(outbox.messages) == 1
+    assert {delivery.reminder_id for delivery in Delivery.query.filter_by(status='sent')} == {first.id, second.id}
+
+def test_edited_dead_reminder_fires_again(app, outbox, make_reminder):
+    app.config['RETRY_MAX_ATTEMPTS'] = 1
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(days=3)
+    reminder = make_reminder('typo@example', frequency='daily', date=start, next_fire_at=start + timedelta(days=2))
+    dead_at = reminder.next_fire_at
+    outbox.failing['typo@example'] = OSError('bad address')
+    send_due_reminders([reminder], datetime.utcnow())
+    assert Delivery.query.filter_by(reminder_id=reminder.id).one().status == 'dead'
+
+    response = app.test_client().put(f"/edit_reminder/{reminder.id}", json={
+        'date': start.strftime('%Y-%m-%d %H:%M:%S'), 'email': 'fixed@example.com'})
+    assert response.status_code == 200
+    db.session.refresh(reminder)
+    assert reminder.next_fire_at == dead_at + timedelta(days=1)
+
+    send_due_reminders([reminder], reminder.next_fire_at)
+    assert [to_email for to_email, _ in outbox.messages] == ['fixed@example.com']
+
+def test_replay_goes_to_the_corrected_address(app, outbox, make_reminder):
+    app.config['RETRY_MAX_ATTEMPTS'] = 1
+    reminder = make_reminder('typo@example')
+    outbox.failing['typo@example'] = OSError('bad address')
+    send_due_reminders([reminder], datetime.utcnow())
+    letter = DeadLetter.query.filter_by(reminder_id=reminder.id).one()
+
+    reminder.email = 'fixed@example.com'
+    db.session.commit()
+    response = app.test_client().post(f"/dead_letters/{letter.id}/replay")
+
+    assert response.get_json()['replayed'] == [letter.id]
+    assert [to_email for to_email, _ in outbox.messages] == ['fixed@example.com']
+    delivery = Delivery.query.filter_by(reminder_id=reminder.id).one()
+    assert (delivery.status, delivery.error) == ('sent', None)
@@ -0,0 +1,33 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, timezone
+
+from flask.json.provider import DefaultJSONProvider
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+VALUES = {
+    'naive': datetime(2026, 3, 5, 9, 7, 1),
+    'aware': datetime(2026, 3, 5, 9, 7, tzinfo=timezone.utc),
+    'day': date(2026, 3, 5),
+    'amount': decimal.Decimal('1.50'),
+    'id': uuid.UUID(int=1),
+    'point': Point(1, 2),
+    'text': 'naïve ✓',
+    'items': [1, 2.5, None, True],
+}
+
+def test_responses_keep_flasks_format(app):
+    flask_json = DefaultJSONProvider(app)
+    assert app.json.loads(app.json.dumps(VALUES)) == flask_json.loads(flask_json.dumps(VALUES))
+    assert app.json.dumps({'b': 1, 'a': 2}) == '{"a":2,"b":1}'
+
+def test_response_is_json(app):
+    with app.test_request_context():
+        response = app.json.response(VALUES)
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['naive'] == 'Thu, 05 Mar 2026 09:07:01 GMT'
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from prometheus_client import REGISTRY
+
+@pytest.fixture
+def tasks(app, monkeypatch):
+    """tasks.py bound to the test app, with enqueued batches recorded instead of sent"""
+    import tasks
+
+    monkeypatch.setattr(tasks, 'app', app)
+    queued = []
+    monkeypatch.setattr(tasks.process_reminders_batch, 'delay', lambda *args: queued.append(args))
+    tasks.queued = queued
+    return tasks
+
+def counter(name):
+    return REGISTRY.get_sample_value(f"{name}_total") or 0
+
+def test_check_reminders_fans_out_due_ids_in_batches(app, tasks, make_reminder):
+    app.config['CELERY_REMINDER_BATCH_SIZE'] = 2
+    now = datetime.utcnow()
+    due = [make_reminder(next_fire_at=now - timedelta(minutes=minutes)).id for minutes in (5, 4, 3, 2, 1)]
+    make_reminder(next_fire_at=now + timedelta(hours=1))
+    make_reminder(next_fire_at=None)
+    fanned_out, batches = counter('reminders_fanned_out'), counter('reminder_fanout_batches')
+
+    assert tasks.check_reminders.run() == {'due': 5, 'batches': 3}
+    assert [ids for ids, _ in tasks.queued] == [due[0:2], due[2:4], due[4:]]
+    assert counter('reminders_fanned_out') - fanned_out == 5
+    assert counter('reminder_fanout_batches') - batches == 3
+
+def test_batch_sends_only_reminders_still_due(app, tasks, outbox, make_reminder):
+    now = datetime.utcnow()
+    due = make_reminder('due@example.com')
+    moved = make_reminder('moved@example.com', next_fire_at=now + timedelta(hours=1))
+
+    tasks.process_reminders_batch.run([due.id, moved.id], now.isoformat())
+
+    assert [to_email for to_email, _ in outbox.messages] == ['due@example.com']
@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from timer_scheduler import TimerScheduler
+
+class FakeTable:
+    """Reminder fire times with a version counter and per-row write times"""
+
+    def __init__(self, rows):
+        self.version = 1
+        self.rows = {reminder_id: (fire_at, datetime.utcnow()) for reminder_id, fire_at in rows.items()}
+        self.loads = 0
+        self.fired = []
+        self.event = threading.Event()
+
+    def write(self, reminder_id, fire_at):
+        self.rows[reminder_id] = (fire_at, datetime.utcnow())
+        self.version += 1
+
+    def load_upcoming(self, until):
+        self.loads += 1
+        return [(reminder_id, fire_at) for reminder_id, (fire_at, _) in self.rows.items() if fire_at is not None and fire_at <= until]
+
+    def load_changed(self, since):
+        return [(reminder_id, fire_at) for reminder_id, (fire_at, written) in self.rows.items() if written >= since]
+
+    def fire(self, ids, now):
+        # Like sending a one-off reminder: it has no next occurrence
+        for reminder_id in ids:
+            self.rows[reminder_id] = (None, datetime.utcnow())
+        self.fired.extend(ids)
+        self.event.set()
+        return [(reminder_id, None) for reminder_id in ids]
+
+def timer(table, **kwargs):
+    return TimerScheduler(table.load_upcoming, table.fire, version=lambda: table.version,
+                          load_changed=table.load_changed, poll_interval=0.02, **kwargs)
+
+def test_fires_due_reminders_in_order():
+    now = datetime.utcnow()
+    table = FakeTable({1: now - timedelta(seconds=2), 2: now - timedelta(seconds=3), 3: now + timedelta(hours=2)})
+    scheduler = timer(table)
+    scheduler.start()
+    try:
+        assert table.event.wait(2)
+    finally:
+        scheduler.stop()
+    assert table.fired == [2, 1]
+
+def test_other_process_writes_update_the_heap_without_reloading():
+    table = FakeTable({1: datetime.utcnow() + timedelta(minutes=30)})
+    scheduler = timer(table)
+    scheduler.start()
+    try:
+        time.sleep(0.1)
+        table.write(2, datetime.utcnow() - timedelta(seconds=1))
+        assert table.event.wait(2)
+        # Moving a reminder out of the horizon drops it from the heap
+        table.write(1, datetime.utcnow() + timedelta(days=2))
+        time.sleep(0.1)
+    finally:
+        scheduler.stop()
+    assert table.fired == [2]
+    assert table.loads == 1
+    assert 1 not in scheduler._current
+
+def test_without_load_changed_writes_reload_the_heap():
+    table = FakeTable({})
+    scheduler = TimerScheduler(table.load_upcoming, table.fire, version=lambda: table.version, poll_interval=0.02)
+    scheduler.start()
+    try:
+        time.sleep(0.1)
+        table.write(7, datetime.utcnow() - timedelta(seconds=1))
+        assert table.event.wait(2)
+    finally:
+        scheduler.stop()
+    assert table.fired == [7]
+    assert table.loads == 2
+
+def test_edits_reach_the_timer_through_updated_at(app, outbox, make_reminder):
+    from reminders import fire_reminders, load_changed_reminders, load_upcoming_reminders, reminder_table_version
+    from scheduler import in_app_context
+
+    later = make_reminder('later@example.com', next_fire_at=datetime.utcnow() + timedelta(minutes=30))
+    loads = []
+
+    def load_upcoming(until):
+        loads.append(until)
+        return load_upcoming_reminders(until)
+
+    scheduler = TimerScheduler(in_app_context(app, load_upcoming), in_app_context(app, fire_reminders),
+                               version=in_app_context(app, reminder_table_version),
+                               load_changed=in_app_context(app, load_changed_reminders), poll_interval=0.02)
+    scheduler.start()
+    try:
+        time.sleep(0.1)
+        assert scheduler._current == {later.id: later.next_fire_at}
+        past = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+        response = app.test_client().put(f"/edit_reminder/{later.id}", json={
+            'date': past.strftime('%Y-%m-%d %H:%M:%S')})
+        assert response.status_code == 200
+        for _ in range(100):
+            if outbox.messages:
+                break
+            time.sleep(0.02)
+    finally:
+        scheduler.stop()
+    assert [to_email for to_email, _ in outbox.messages] == ['later@example.com']
+    assert len(loads) == 1
@@ -0,0 +1,155 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+class TimerScheduler:
+    """Fire reminders at their due time from an in-memory min-heap.
+
+    The heap holds `(fire_at, reminder_id)` for every reminder due within
+    `horizon` seconds, loaded from the database by `load_upcoming(until)`.
+    The thread sleeps until the earliest entry is due (or it is woken by a
+    change) and passes due IDs to `fire(ids, now)`, which returns the
+    `(reminder_id, fire_at)` pairs to schedule next.
+
+    Writes from other processes are noticed by polling `version()` every
+    `poll_interval` seconds. When it changes, `load_changed(since)` returns
+    the `(reminder_id, fire_at)` of just the rows written since the last
+    sync (less `sync_overlap` seconds, for late commits and clock skew
+    between hosts), and the heap is updated in place. Without
+    `load_changed` the heap is reloaded instead. Deleted reminders stay in
+    the heap; `fire` finds nothing to send for them. A full reload every
+    `reconcile_interval` seconds is the safety net for anything missed.
+    """
+
+    def __init__(self, load_upcoming, fire, version=None, load_changed=None, horizon=3600,
+                 reconcile_interval=300, poll_interval=1.0, sync_overlap=5.0):
+        self.load_upcoming = load_upcoming
+        self.fire = fire
+        self.version = version
+        self.load_changed = load_changed
+        self.horizon = horizon
+        self.reconcile_interval = reconcile_interval
+        self.poll_interval = poll_interval
+        self.sync_overlap = sync_overlap
+
+        self._cond = threading.Condition()
+        self._heap = []
+        self._current = {}
+        self._reload_requested = True
+        self._sync_requested = False
+        self._synced_at = None
+        self._stopped = False
+        self._thread = None
+        self._seen_version = None
+        self._next_reconcile = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stopped = False
+        self._reload_requested = True
+        self._thread = threading.Thread(target=self._run, name='reminder-timer', daemon=True)
+        self._thread.start()
+        logger.info("Timer scheduler started")
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+
+    def _push(self, reminder_id, fire_at):
+        # Entries are never removed from the heap; superseded ones are
+        # recognised on pop because they no longer match _current
+        if fire_at is None or fire_at > datetime.utcnow() + timedelta(seconds=self.horizon):
+            self._current.pop(reminder_id, None)
+            return
+        self._current[reminder_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, reminder_id))
+
+    def _load(self):
+        started = datetime.utcnow()
+        upcoming = self.load_upcoming(started + timedelta(seconds=self.horizon))
+        with self._cond:
+            self._heap = [(fire_at, reminder_id) for reminder_id, fire_at in upcoming]
+            heapq.heapify(self._heap)
+            self._current = {reminder_id: fire_at for fire_at, reminder_id in self._heap}
+        self._synced_at = started
+        self._sync_requested = False
+        self._next_reconcile = time.monotonic() + self.reconcile_interval
+        logger.debug(f"Timer scheduler loaded {len(self._heap)} upcoming reminders")
+
+    def _sync(self):
+        started = datetime.utcnow()
+        changed = self.load_changed(self._synced_at - timedelta(seconds=self.sync_overlap))
+        with self._cond:
+            for reminder_id, fire_at in changed:
+                if self._current.get(reminder_id) != fire_at:
+                    self._push(reminder_id, fire_at)
+        self._synced_at = started
+        logger.debug(f"Timer scheduler updated {len(changed)} changed reminders")
+
+    def _check_version(self):
+        if self.version is None:
+            return
+        current = self.version()
+        if self._seen_version is not None and current != self._seen_version:
+            if self.load_changed is not None and self._synced_at is not None:
+                self._sync_requested = True
+            else:
+                self._reload_requested = True
+        self._seen_version = current
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, reminder_id = heapq.heappop(self._heap)
+            if self._current.get(reminder_id) == fire_at:
+                del self._current[reminder_id]
+                due.append(reminder_id)
+        return due
+
+    def _run(self):
+        next_poll = 0.0
+        while not self._stopped:
+            try:
+                if time.monotonic() >= next_poll:
+                    self._check_version()
+                    next_poll = time.monotonic() + self.poll_interval
+                if self._reload_requested or time.monotonic() >= self._next_reconcile:
+                    self._reload_requested = False
+                    self._load()
+                elif self._sync_requested:
+                    self._sync_requested = False
+                    self._sync()
+
+                now = datetime.utcnow()
+                with self._cond:
+                    due = self._pop_due(now)
+                if due:
+                    for reminder_id, fire_at in self.fire(due, now):
+                        with self._cond:
+                            self._push(reminder_id, fire_at)
+                    continue
+
+                with self._cond:
+                    if self._stopped or self._reload_requested:
+                        continue
+                    deadline = self._next_reconcile
+                    if self.version:
+                        deadline = min(deadline, next_poll)
+                    wait = deadline - time.monotonic()
+                    if self._heap:
+                        wait = min(wait, (self._heap[0][0] - datetime.utcnow()).total_seconds())
+                    if wait > 0:
+                        self._cond.wait(wait)
+            except Exception as e:
+                logger.error(f"Error in timer scheduler: {str(e)}")
+                time.sleep(self.poll_interval)